@@ -1,9 +1,21 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, exc, text
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
 load_dotenv()
 
 # Use SQLite for local development if PostgreSQL is not available
@@ -15,11 +27,78 @@ if not DATABASE_URL:
 else:
     print(f"Using database: {DATABASE_URL}")
 
+USE_SQLITE = DATABASE_URL.startswith("sqlite")
+
+class PoolWaitStats:
+    """Thread-safe counters for how long requests wait to check out a pooled connection"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.total_wait = 0.0
+            self.max_wait = 0.0
+
+    def record(self, wait: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.timeouts,
+                "avg_checkout_wait_ms": round(self.total_wait / attempts * 1000, 3) if attempts else 0.0,
+                "max_checkout_wait_ms": round(self.max_wait * 1000, 3),
+            }
+
+pool_wait_stats = PoolWaitStats()
+
+class _TimedCheckoutMixin:
+    """Times every checkout, including the time spent queued behind a full pool"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            pool_wait_stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        pool_wait_stats.record(time.perf_counter() - start)
+        return conn
+
+class TimedQueuePool(_TimedCheckoutMixin, QueuePool):
+    pass
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+def pool_options() -> Dict[str, Any]:
+    """Pool sizing for PostgreSQL, overridable per deployment through DB_POOL_* variables"""
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        # Recycle before Railway/PgBouncer idle timeouts drop the connection under us
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() in ("true", "1", "t"),
+    }
+
 # Configure engine based on database type
-if DATABASE_URL.startswith("sqlite"):
+if USE_SQLITE:
     engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
 else:
-    engine = create_engine(DATABASE_URL)
+    engine = create_engine(DATABASE_URL, poolclass=TimedQueuePool, **pool_options())
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -30,4 +109,179 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+# Async database path (asyncpg on PostgreSQL, aiosqlite on SQLite).
+# Enabled with ASYNC_DB=true, which also switches main.py to the async routers.
+ASYNC_DB = os.getenv("ASYNC_DB", "false").lower() in ("true", "1", "t")
+
+def get_async_database_url(url: str) -> str:
+    """Map a sync DATABASE_URL onto the matching async driver"""
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    return url
+
+async_engine = None
+AsyncSessionLocal = None
+if ASYNC_DB:
+    if USE_SQLITE:
+        async_engine = create_async_engine(get_async_database_url(DATABASE_URL))
+    else:
+        async_engine = create_async_engine(
+            get_async_database_url(DATABASE_URL), poolclass=TimedAsyncAdaptedQueuePool, **pool_options()
+        )
+    # expire_on_commit=False: attributes can't be lazily reloaded after commit in async code
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def pool_status() -> Dict[str, Any]:
+    """Live connection pool figures for the engine serving requests"""
+    pool = (async_engine.sync_engine if async_engine is not None else engine).pool
+    stats: Dict[str, Any] = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            # QueuePool.overflow() starts at -pool_size; only positive values are real overflow connections
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+        })
+    stats.update(pool_wait_stats.snapshot())
+    return stats
+
+# Per-request query counting. QUERY_BUDGET > 0 turns on a hard assertion in main.py
+# (meant for tests and local profiling) that no request runs more statements than that.
+QUERY_BUDGET = int(os.getenv("QUERY_BUDGET", "0"))
+
+_query_counter: ContextVar[Optional[List[int]]] = ContextVar("query_counter", default=None)
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    counter = _query_counter.get()
+    if counter is not None:
+        counter[0] += 1
+
+if async_engine is not None:
+    event.listen(async_engine.sync_engine, "before_cursor_execute", _count_query)
+
+@contextmanager
+def count_queries():
+    """Count SQL statements executed inside the block; yields a one-item list holding the count"""
+    counter = [0]
+    token = _query_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _query_counter.reset(token)
+
+# Schema migrations (backend/migrations). With AUTO_MIGRATE=false the app starts on
+# whatever schema it finds and `alembic upgrade head` is run as a separate deploy step.
+AUTO_MIGRATE = os.getenv("AUTO_MIGRATE", "true").lower() in ("true", "1", "t")
+MIGRATIONS_LOCK_ID = 720531
+# Only one process delivers the notification outbox, so the Telegram rate limits hold across workers
+OUTBOX_LOCK_ID = 720532
+# Only one process runs the maintenance job, so runs never race each other over the same rows
+MAINTENANCE_LOCK_ID = 720533
+
+def run_migrations():
+    """Upgrade the database to the latest Alembic revision"""
+    from alembic import command
+    from alembic.config import Config
+    from sqlalchemy import inspect, text
+
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    config = Config(os.path.join(backend_dir, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(backend_dir, "migrations"))
+
+    with engine.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            # Several workers may boot at once; the others wait and then find nothing to do
+            connection.execute(text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": MIGRATIONS_LOCK_ID})
+        config.attributes["connection"] = connection
+        tables = inspect(connection).get_table_names()
+        if "users" in tables and "alembic_version" not in tables:
+            # Created by Base.metadata.create_all before migrations existed
+            command.stamp(config, "0001")
+        command.upgrade(config, "head")
+
+class LeaderLock:
+    """Non-blocking lock held by at most one process, for background work that must not run in every worker.
+
+    PostgreSQL: a session-level advisory lock on a connection kept checked out while held.
+    SQLite: flock() on a file next to the database, which covers the workers of one host.
+    """
+
+    def __init__(self, name: str, lock_id: int, bind=None):
+        self.name = name
+        self.lock_id = lock_id
+        self.bind = bind if bind is not None else engine
+        self._lock = threading.Lock()
+        self._connection = None
+        self._file = None
+
+    def acquire(self) -> bool:
+        """True if this process holds the lock, taking it if it's free"""
+        with self._lock:
+            if self.bind.dialect.name == "postgresql":
+                return self._acquire_advisory()
+            return self._acquire_file()
+
+    def _acquire_advisory(self) -> bool:
+        if self._connection is not None:
+            try:
+                self._connection.exec_driver_sql("SELECT 1")
+                self._connection.commit()
+                return True
+            except exc.DBAPIError:
+                # The session ended, and the lock with it; compete for it again
+                self._connection.invalidate()
+                self._connection.close()
+                self._connection = None
+        connection = self.bind.connect()
+        try:
+            held = connection.execute(text("SELECT pg_try_advisory_lock(:lock_id)"), {"lock_id": self.lock_id}).scalar()
+            connection.commit()
+        except Exception:
+            connection.close()
+            raise
+        if not held:
+            connection.close()
+            return False
+        self._connection = connection
+        return True
+
+    def _acquire_file(self) -> bool:
+        if self._file is not None:
+            return True
+        database = self.bind.url.database
+        if fcntl is None or not database or database == ":memory:":
+            # No file to coordinate on; only this process can reach the database anyway
+            return True
+        handle = open(f"{database}.{self.name}.lock", "a")
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+        self._file = handle
+        return True
+
+    def release(self):
+        with self._lock:
+            if self._connection is not None:
+                try:
+                    self._connection.execute(text("SELECT pg_advisory_unlock(:lock_id)"), {"lock_id": self.lock_id})
+                    self._connection.commit()
+                finally:
+                    self._connection.close()
+                    self._connection = None
+            if self._file is not None:
+                self._file.close()
+                self._file = None
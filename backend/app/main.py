@@ -1,10 +1,17 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
-from app.routers import users, events, responses
-from app.database import engine
-from app.models.models import Base
-from app.services.telegram_bot import run_bot
+from app.database import engine, ASYNC_DB, AUTO_MIGRATE, QUERY_BUDGET, count_queries, pool_status, run_migrations
+from app.services.telegram_bot import run_bot, setup_bot_handlers, setup_webhook, TELEGRAM_WEBHOOK_URL
+from app.routers import telegram, stream, admin
+from app.services.locations import setup_location_search
+from app.services.notifications import start_outbox_worker
+from app.services.reminders import start_reminder_scheduler
+from app.services.maintenance import maintenance_job, start_maintenance
+from app.services.cache import event_cache
+from app.services.realtime import hub
+from app.services.serialization import FastJSONResponse
+from app.services.sessions import admin_access
 import threading
 import os
 from dotenv import load_dotenv
@@ -12,14 +19,27 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Pick the router implementation matching the database path
+if ASYNC_DB:
+    from app.routers import users_async as users, events_async as events, responses_async as responses
+else:
+    from app.routers import users, events, responses
+
+# Bring the database schema up to date
+if AUTO_MIGRATE:
+    run_migrations()
+setup_location_search(engine)
+# Webhook updates can arrive as soon as the app serves, before the startup thread runs
+if TELEGRAM_WEBHOOK_URL:
+    setup_bot_handlers()
 
 # Initialize FastAPI app
 app = FastAPI(
     title="LinkUp API",
     description="API for LinkUp - Telegram Web App for organizing events and meetings",
-    version="1.0.0"
+    version="1.0.0",
+    # Same bytes as JSONResponse; goes through orjson when FAST_JSON is on
+    default_response_class=FastJSONResponse
 )
 
 # Configure CORS
@@ -44,12 +64,28 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Query budget check for tests/profiling: fail loudly on N+1 regressions
+if QUERY_BUDGET > 0:
+    @app.middleware("http")
+    async def enforce_query_budget(request: Request, call_next):
+        with count_queries() as counter:
+            response = await call_next(request)
+        response.headers["X-Query-Count"] = str(counter[0])
+        assert counter[0] <= QUERY_BUDGET, (
+            f"{request.method} {request.url.path} ran {counter[0]} queries (budget {QUERY_BUDGET})"
+        )
+        return response
+
 # Include routers
 app.include_router(users.router)
 app.include_router(events.router)
 app.include_router(responses.router)
+app.include_router(telegram.router)
+app.include_router(stream.router)
+app.include_router(admin.router)
 
 # Bot thread
 bot_thread = None
@@ -58,10 +94,20 @@ bot_thread = None
 async def startup_event():
     """Start the Telegram bot when the FastAPI server starts"""
     global bot_thread
-    print("Starting Telegram bot via startup event...")
-    bot_thread = threading.Thread(target=run_bot)
+    if TELEGRAM_WEBHOOK_URL:
+        # Updates arrive on /telegram/webhook, so any number of workers can run side by side
+        print("Starting Telegram bot in webhook mode...")
+        bot_thread = threading.Thread(target=setup_webhook)
+    else:
+        # Long polling for local development; only one process may poll a bot at a time
+        print("Starting Telegram bot via startup event...")
+        bot_thread = threading.Thread(target=run_bot)
     bot_thread.daemon = True
     bot_thread.start()
+    # Deliver queued notifications, schedule event reminders and close/archive past events in the background
+    start_outbox_worker()
+    start_reminder_scheduler()
+    start_maintenance()
 
 @app.get("/")
 def read_root():
@@ -71,6 +117,26 @@ def read_root():
         "redoc": "/redoc"
     }
 
+@app.get("/internal/db-pool", dependencies=[Depends(admin_access)])
+def db_pool_status():
+    """Connection pool usage and checkout wait times, for sizing DB_POOL_* against real traffic"""
+    return pool_status()
+
+@app.get("/internal/event-cache", dependencies=[Depends(admin_access)])
+def event_cache_status():
+    """Hit/miss/eviction counters of the events read-through cache"""
+    return event_cache.stats()
+
+@app.get("/internal/realtime", dependencies=[Depends(admin_access)])
+def realtime_status():
+    """Open event streams on this worker"""
+    return hub.stats()
+
+@app.get("/internal/maintenance", dependencies=[Depends(admin_access)])
+def maintenance_status():
+    """Rows closed, archived and purged by the last maintenance run and since startup"""
+    return maintenance_job.stats()
+
 def start_bot():
     run_bot()
 
@@ -1,7 +1,7 @@
 import uuid
 import json
 from datetime import datetime as dt
-from sqlalchemy import Column, String, Boolean, ForeignKey, ARRAY, DateTime, Integer, Text
+from sqlalchemy import Column, String, Boolean, ForeignKey, ARRAY, DateTime, Integer, BigInteger, Text, Index, Float
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
@@ -28,6 +28,22 @@ else:
     ARRAY_TYPE = ARRAY(String)
     generate_uuid = uuid.uuid4
 
+def _json_list(instance, column_attr):
+    """Decode a JSON list column once per raw value and reuse the result on later accesses"""
+    raw = getattr(instance, column_attr)
+    if not raw or not isinstance(raw, str):
+        return []
+    cache = instance.__dict__.setdefault("_json_cache", {})
+    cached = cache.get(column_attr)
+    if cached is None or cached[0] is not raw:
+        try:
+            parsed = json.loads(raw)
+        except json.JSONDecodeError:
+            parsed = []
+        cached = cache[column_attr] = (raw, parsed if isinstance(parsed, list) else [])
+    # Copy so callers mutating the list can't corrupt the cache
+    return list(cached[1])
+
 class User(Base):
     __tablename__ = "users"
     
@@ -48,10 +64,7 @@ class User(Base):
     @hybrid_property
     def interests(self):
         if USE_SQLITE:
-            try:
-                return json.loads(self._interests) if self._interests else []
-            except (json.JSONDecodeError, TypeError):
-                return []
+            return _json_list(self, "_interests")
         return self._interests or []
     
     @interests.setter
@@ -64,10 +77,7 @@ class User(Base):
     @hybrid_property
     def photos(self):
         if USE_SQLITE:
-            try:
-                return json.loads(self._photos) if self._photos else []
-            except (json.JSONDecodeError, TypeError):
-                return []
+            return _json_list(self, "_photos")
         return self._photos or []
     
     @photos.setter
@@ -77,6 +87,25 @@ class User(Base):
         else:
             self._photos = value or []
 
+class Interest(Base):
+    """Vocabulary of normalized interest names"""
+    __tablename__ = "interests"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String, unique=True, nullable=False)
+
+class UserInterest(Base):
+    """Indexed copy of User.interests, maintained by services/interests.py"""
+    __tablename__ = "user_interests"
+    
+    # interest_id first, so "users with interest X" is a range scan on the primary key
+    interest_id = Column(Integer, ForeignKey("interests.id"), primary_key=True)
+    user_id = Column(ID_TYPE, ForeignKey("users.id"), primary_key=True)
+    
+    __table_args__ = (
+        Index("ix_user_interests_user_id", "user_id"),
+    )
+
 class Event(Base):
     __tablename__ = "events"
     
@@ -85,14 +114,47 @@ class Event(Base):
     title = Column(String, nullable=False)
     description = Column(String, nullable=False)
     location = Column(String, nullable=False)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    geohash = Column(String(12), nullable=True)  # cell derived from latitude/longitude, see services/geo.py
     datetime = Column(DateTime, nullable=False)
     is_open = Column(Boolean, default=True)
     type = Column(String, nullable=False)
     created_at = Column(DateTime, default=dt.utcnow)
     updated_at = Column(DateTime, default=dt.utcnow, onupdate=dt.utcnow)
+    # Responses by status, maintained by the response writes (see services/counters.py)
+    pending_count = Column(Integer, nullable=False, default=0, server_default="0")
+    accepted_count = Column(Integer, nullable=False, default=0, server_default="0")
     
     creator = relationship("User", back_populates="events")
-    responses = relationship("EventResponse", back_populates="event")
+    # Responses are deleted explicitly before their event, so don't load them just to unlink them
+    responses = relationship("EventResponse", back_populates="event", passive_deletes=True)
+    
+    __table_args__ = (
+        # Matches the feed ordering used for keyset pagination in GET /events/
+        Index("ix_events_created_at_id", "created_at", "id"),
+        # GET /events/user/{user_id}
+        Index("ix_events_creator_id", "creator_id"),
+        # Filtered feed: GET /events/?is_open=&event_type= ordered by created_at
+        Index("ix_events_is_open_type_created_at", "is_open", "type", "created_at"),
+        # Upcoming-event scans ordered by start time (feed candidates)
+        Index("ix_events_datetime", "datetime"),
+        # /events/nearby: one seek per covering geohash cell, bounded by the start-time window.
+        # The trailing columns make it covering, so candidates are filtered without touching rows.
+        Index("ix_events_geohash_datetime", "geohash", "datetime", "latitude", "longitude", "is_open", "id"),
+    )
+
+class EventLocation(Base):
+    """Distinct event locations with how many events use them, for location autocomplete"""
+    __tablename__ = "event_locations"
+    
+    normalized = Column(String, primary_key=True)
+    name = Column(String, nullable=False)
+    event_count = Column(Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        Index("ix_event_locations_count", "event_count"),
+    )
 
 class EventResponse(Base):
     __tablename__ = "event_responses"
@@ -105,6 +167,15 @@ class EventResponse(Base):
     
     event = relationship("Event", back_populates="responses")
     user = relationship("User", back_populates="responses")
+    
+    __table_args__ = (
+        # One response per user per event; also serves the duplicate check in create_response
+        Index("uq_event_responses_event_id_user_id", "event_id", "user_id", unique=True),
+        # GET /responses/user/{user_id}
+        Index("ix_event_responses_user_id", "user_id"),
+        # Respondent queue: one status of one event in (responded_at, id) keyset order
+        Index("ix_event_responses_event_id_status_responded_at", "event_id", "status", "responded_at", "id"),
+    )
 
 class Badge(Base):
     __tablename__ = "badges"
@@ -114,4 +185,84 @@ class Badge(Base):
     badge_type = Column(String, nullable=False)
     awarded_at = Column(DateTime, default=dt.utcnow)
     
-    user = relationship("User", back_populates="badges") 
\ No newline at end of file
+    user = relationship("User", back_populates="badges")
+
+
+class Notification(Base):
+    """A Telegram message waiting to be delivered by the outbox worker.
+
+    Routers add rows in the same transaction as the change they announce;
+    app.services.notifications sends them and records the outcome.
+    """
+    __tablename__ = "notification_outbox"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    chat_id = Column(BigInteger, nullable=False)
+    kind = Column(String, nullable=False)
+    text = Column(Text, nullable=False)
+    button_text = Column(String, nullable=True)
+    button_url = Column(String, nullable=True)
+    status = Column(String, nullable=False, default="pending")  # pending, sent, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=dt.utcnow)
+    last_error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=dt.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+    
+    __table_args__ = (
+        # The worker's poll: pending rows that are due, oldest first
+        Index("ix_notification_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+class EventReminder(Base):
+    """Reminders already queued, so each (event, lead time, start time) is sent once across workers and restarts.
+
+    No foreign key: rows may outlive a deleted event and are only ever looked up by key.
+    """
+    __tablename__ = "event_reminders"
+    
+    event_id = Column(ID_TYPE, primary_key=True)
+    lead_minutes = Column(Integer, primary_key=True)
+    event_datetime = Column(DateTime, primary_key=True)
+    queued_at = Column(DateTime, default=dt.utcnow)
+
+class EventArchive(Base):
+    """Events moved out of the events table once past the retention window, see services/maintenance.py"""
+    __tablename__ = "events_archive"
+    
+    id = Column(ID_TYPE, primary_key=True)
+    creator_id = Column(ID_TYPE, nullable=False)
+    title = Column(String, nullable=False)
+    description = Column(String, nullable=False)
+    location = Column(String, nullable=False)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    geohash = Column(String(12), nullable=True)
+    datetime = Column(DateTime, nullable=False)
+    is_open = Column(Boolean, nullable=True)
+    type = Column(String, nullable=False)
+    created_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, nullable=True)
+    pending_count = Column(Integer, nullable=False, default=0, server_default="0")
+    accepted_count = Column(Integer, nullable=False, default=0, server_default="0")
+    archived_at = Column(DateTime, nullable=False, default=dt.utcnow)
+    
+    __table_args__ = (
+        Index("ix_events_archive_creator_id", "creator_id"),
+        Index("ix_events_archive_datetime", "datetime"),
+    )
+
+class EventResponseArchive(Base):
+    """Responses of archived events, keyed like event_responses but without foreign keys"""
+    __tablename__ = "event_responses_archive"
+    
+    id = Column(ID_TYPE, primary_key=True)
+    event_id = Column(ID_TYPE, nullable=False)
+    user_id = Column(ID_TYPE, nullable=False)
+    status = Column(String, nullable=False)
+    responded_at = Column(DateTime, nullable=True)
+    
+    __table_args__ = (
+        Index("ix_event_responses_archive_event_id", "event_id"),
+        Index("ix_event_responses_archive_user_id", "user_id"),
+    )
@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
+from app.database import ASYNC_DB, async_engine, engine
+from app.services.export import EXPORT_FORMATS, EXPORT_TABLES, export_chunks, export_chunks_async
+from app.services.sessions import admin_access
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+    dependencies=[Depends(admin_access)]
+)
+
+@router.get("/export/{table}")
+async def export_table(
+    table: str,
+    export_format: str = Query("ndjson", alias="format"),
+    gzip: bool = False
+):
+    """Stream every row of events, responses or users as NDJSON or CSV, in primary key order.
+
+    Rows are read through a server-side cursor in batches and written out as
+    they arrive, so memory use doesn't grow with the table. gzip=true
+    compresses on the fly (Content-Encoding: gzip; use curl --compressed).
+    """
+    if table not in EXPORT_TABLES:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown table {table}; use one of {', '.join(EXPORT_TABLES)}"
+        )
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown format {export_format}; use one of {', '.join(EXPORT_FORMATS)}"
+        )
+    if ASYNC_DB:
+        chunks = export_chunks_async(async_engine, table, export_format, gzip)
+    else:
+        # Starlette runs the generator in the threadpool, one batch per step
+        chunks = export_chunks(engine, table, export_format, gzip)
+    headers = {
+        "Content-Disposition": f'attachment; filename="{table}.{export_format}"',
+        "Cache-Control": "no-store",
+        "X-Accel-Buffering": "no",
+    }
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(chunks, media_type=EXPORT_FORMATS[export_format], headers=headers)
@@ -1,10 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
 from datetime import datetime
 from app.database import get_db
 from app.models.models import Event, User, EventResponse as EventResponseModel
-from app.schemas.schemas import EventCreate, EventResponse, EventUpdate
+from app.schemas.schemas import EventCreate, EventResponse, EventUpdate, LocationSuggestion, NearbyEventResponse, FeedEventResponse
+from app.services.interests import user_ids_with_interest
+from app.services.feed import feed_candidates_query, type_affinity_query, score_events, rank_events
+from app.services.cache import CachedPage, event_cache
+from app.services.serialization import json_response, render_json
+from app.services.fieldsets import EVENT_FIELDS, fieldset_key, fieldset_options, fieldset_schema, parse_fieldset
+from app.services.http_cache import (
+    event_list_validators, event_validator_columns, event_validator_query, event_validators,
+    is_conditional, is_not_modified, loaded_event_list_validators, loaded_event_validators,
+    not_modified, variant_etag
+)
+from app.services.geo import nearby_candidates_columns, nearby_candidates_filter, rank_by_distance
+from app.services.locations import location_filter, location_suggestions_query
+from app.services.notifications import accepted_chat_ids_query, queue_event_updated
+from app.services.pagination import encode_cursor, decode_cursor
+from app.services.realtime import publish_event_change
+from app.services.reminders import reminder_scheduler
+from app.services.sessions import current_user_id
 import logging
 
 # Updated: 2025-05-24T12:00:00Z - Force Railway deploy for Query parameter fix
@@ -15,7 +33,7 @@ router = APIRouter(
 )
 
 @router.post("/", response_model=EventResponse)
-def create_event(event_data: EventCreate, user_id: str = Query(...), db: Session = Depends(get_db)):
+def create_event(event_data: EventCreate, user_id: str = Depends(current_user_id), db: Session = Depends(get_db)):
     logger = logging.getLogger(__name__)
     logger.info(f"Creating event for user_id: {user_id}")
     logger.info(f"Event data: {event_data}")
@@ -35,6 +53,8 @@ def create_event(event_data: EventCreate, user_id: str = Query(...), db: Session
         title=event_data.title,
         description=event_data.description,
         location=event_data.location,
+        latitude=event_data.latitude,
+        longitude=event_data.longitude,
         datetime=event_data.datetime,
         type=event_data.type,
         is_open=event_data.is_open
@@ -44,42 +64,194 @@ def create_event(event_data: EventCreate, user_id: str = Query(...), db: Session
     db.commit()
     db.refresh(db_event)
     
+    reminder_scheduler.schedule(db_event.id, db_event.datetime)
+    event_cache.invalidate_event(db_event.id, (db_event.type, db_event.is_open))
+    publish_event_change("event_created", db_event)
+    
     return db_event
 
+def filter_events_page(query, skip, limit, event_type, location, interest, is_open, cursor):
+    """Filters, ordering and pagination of the events list, for a legacy Query or a select()"""
+    # Apply filters
+    if event_type:
+        query = query.filter(Event.type == event_type)
+    if location:
+        query = query.filter(location_filter(location))
+    if interest:
+        query = query.filter(Event.creator_id.in_(user_ids_with_interest(interest)))
+    if is_open is not None:
+        query = query.filter(Event.is_open == is_open)
+    
+    query = query.order_by(Event.created_at.desc(), Event.id.desc())
+    
+    # Keyset pagination: continue strictly after the last item of the previous page,
+    # served by the (created_at, id) index instead of scanning `skip` rows
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        query = query.filter(tuple_(Event.created_at, Event.id) < (cursor_created_at, cursor_id))
+    else:
+        query = query.offset(skip)
+    
+    return query.limit(limit)
+
+def events_page(events, limit: int, fieldset=None) -> CachedPage:
+    """Serialized page of events with its validators, as served and cached by get_events"""
+    # A full page means there may be more; hand out the position of its last item
+    next_cursor = None
+    if events and len(events) == limit:
+        last = events[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    etag, last_modified = loaded_event_list_validators(events)
+    body = render_json(List[fieldset_schema(EVENT_FIELDS, fieldset)], events)
+    return CachedPage(body, variant_etag(etag, fieldset_key(fieldset)), last_modified, is_list=True, next_cursor=next_cursor)
+
+def event_page(event, fieldset=None) -> CachedPage:
+    etag, last_modified = loaded_event_validators(event)
+    body = render_json(fieldset_schema(EVENT_FIELDS, fieldset), event)
+    return CachedPage(body, variant_etag(etag, fieldset_key(fieldset)), last_modified)
+
 @router.get("/", response_model=List[EventResponse])
 def get_events(
+    request: Request,
     skip: int = 0, 
     limit: int = 100, 
     event_type: Optional[str] = None, 
     location: Optional[str] = None,
+    interest: Optional[str] = None,
     is_open: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    embed: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    query = db.query(Event)
+    filters = (skip, limit, event_type, location, interest, is_open, cursor)
+    # ?fields=title,datetime,creator.name&embed=creator: only those columns are loaded and sent
+    fieldset = parse_fieldset(EVENT_FIELDS, fields, embed)
     
-    # Apply filters
+    # The key is taken before reading the database, so a write committed meanwhile can't be masked
+    cache_key = event_cache.list_key(*filters, variant=fieldset_key(fieldset))
+    cached = event_cache.get(cache_key)
+    if cached:
+        return cached.to_response(request)
+    
+    # Revalidation compares the page's ids and updated_at values, without loading the events
+    if is_conditional(request):
+        rows = filter_events_page(
+            db.query(*event_validator_columns()).outerjoin(User, User.id == Event.creator_id), *filters
+        ).all()
+        etag, last_modified = event_list_validators(rows)
+        etag = variant_etag(etag, fieldset_key(fieldset))
+        if is_not_modified(request, etag):
+            return not_modified(etag, last_modified)
+    
+    # creator is embedded in every item; load it in the same query instead of one lazy load per event
+    events = filter_events_page(db.query(Event).options(*fieldset_options(EVENT_FIELDS, fieldset)), *filters).all()
+    
+    page = events_page(events, limit, fieldset)
+    event_cache.put(cache_key, page)
+    return page.to_response(request)
+
+@router.get("/feed", response_model=List[FeedEventResponse])
+def get_feed(
+    user_id: str = Depends(current_user_id),
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lon: Optional[float] = Query(None, ge=-180, le=180),
+    skip: int = 0,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """Open upcoming events ranked for the user by shared interests, type affinity, recency and distance"""
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"User with id {user_id} not found"
+        )
+    
+    now = datetime.utcnow()
+    events = db.execute(feed_candidates_query(user_id, now)).scalars().all()
+    type_counts = db.execute(type_affinity_query(user_id)).all()
+    
+    scores = score_events(user, events, type_counts, now, lat, lon)
+    return [
+        FeedEventResponse(**EventResponse.model_validate(event).model_dump(), score=round(score, 4))
+        for event, score in rank_events(events, scores, skip, limit)
+    ]
+
+@router.get("/nearby", response_model=List[NearbyEventResponse])
+def get_nearby_events(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(3.0, gt=0, le=50),
+    starts_after: Optional[datetime] = None,
+    starts_before: Optional[datetime] = None,
+    event_type: Optional[str] = None,
+    is_open: Optional[bool] = True,
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db)
+):
+    """Events within radius_km of (lat, lon), starting inside the time window, nearest first"""
+    query = db.query(*nearby_candidates_columns()).filter(
+        nearby_candidates_filter(lat, lon, radius_km, starts_after or datetime.utcnow(), starts_before)
+    )
     if event_type:
         query = query.filter(Event.type == event_type)
-    if location:
-        query = query.filter(Event.location.ilike(f"%{location}%"))
     if is_open is not None:
         query = query.filter(Event.is_open == is_open)
     
-    events = query.order_by(Event.created_at.desc()).offset(skip).limit(limit).all()
-    return events
+    ranked = rank_by_distance(query.all(), lat, lon, radius_km, limit)
+    if not ranked:
+        return []
+    
+    events = db.query(Event).options(joinedload(Event.creator)).filter(
+        Event.id.in_([event_id for event_id, _ in ranked])
+    ).all()
+    by_id = {event.id: event for event in events}
+    return [
+        NearbyEventResponse(**EventResponse.model_validate(by_id[event_id]).model_dump(), distance_km=round(distance, 3))
+        for event_id, distance in ranked if event_id in by_id
+    ]
+
+@router.get("/locations", response_model=List[LocationSuggestion])
+def get_location_suggestions(q: str = "", limit: int = Query(10, ge=1, le=50), db: Session = Depends(get_db)):
+    """Distinct event locations starting with q, most used first"""
+    rows = db.execute(location_suggestions_query(q, limit)).all()
+    return [LocationSuggestion(name=name, event_count=count) for name, count in rows]
 
 @router.get("/{event_id}", response_model=EventResponse)
-def get_event(event_id: str, db: Session = Depends(get_db)):
-    event = db.query(Event).filter(Event.id == event_id).first()
+def get_event(
+    event_id: str,
+    request: Request,
+    fields: Optional[str] = None,
+    embed: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    fieldset = parse_fieldset(EVENT_FIELDS, fields, embed)
+    cache_key = event_cache.event_key(event_id, variant=fieldset_key(fieldset))
+    cached = event_cache.get(cache_key)
+    if cached:
+        return cached.to_response(request)
+    
+    if is_conditional(request):
+        row = db.execute(event_validator_query(event_id)).first()
+        if row:
+            etag, last_modified = event_validators(*row)
+            etag = variant_etag(etag, fieldset_key(fieldset))
+            if is_not_modified(request, etag, last_modified):
+                return not_modified(etag, last_modified)
+    
+    event = db.query(Event).options(*fieldset_options(EVENT_FIELDS, fieldset)).filter(Event.id == event_id).first()
     if not event:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Event with id {event_id} not found"
         )
-    return event
+    page = event_page(event, fieldset)
+    event_cache.put(cache_key, page)
+    return page.to_response(request)
 
 @router.put("/{event_id}", response_model=EventResponse)
-def update_event(event_id: str, event_data: EventUpdate, user_id: str = Query(...), db: Session = Depends(get_db)):
+def update_event(event_id: str, event_data: EventUpdate, user_id: str = Depends(current_user_id), db: Session = Depends(get_db)):
     event = db.query(Event).filter(Event.id == event_id).first()
     if not event:
         raise HTTPException(
@@ -94,6 +266,9 @@ def update_event(event_id: str, event_data: EventUpdate, user_id: str = Query(..
             detail="Only the creator can update the event"
         )
     
+    rescheduled = event_data.datetime is not None and event_data.datetime != event.datetime
+    previous_state = (event.type, event.is_open)
+    
     # Update fields
     for key, value in event_data.dict(exclude_unset=True).items():
         if value is not None:
@@ -101,13 +276,21 @@ def update_event(event_id: str, event_data: EventUpdate, user_id: str = Query(..
     
     event.updated_at = datetime.utcnow()
     
+    # Let accepted participants know; sent by the outbox worker after commit
+    queue_event_updated(db, db.execute(accepted_chat_ids_query(event.id)).scalars().all(), event)
+    
     db.commit()
     db.refresh(event)
     
+    if rescheduled:
+        reminder_scheduler.schedule(event.id, event.datetime)
+    event_cache.invalidate_event(event.id, previous_state, (event.type, event.is_open))
+    publish_event_change("event_updated", event)
+    
     return event
 
 @router.delete("/{event_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_event(event_id: str, user_id: str = Query(...), db: Session = Depends(get_db)):
+def delete_event(event_id: str, user_id: str = Depends(current_user_id), db: Session = Depends(get_db)):
     event = db.query(Event).filter(Event.id == event_id).first()
     if not event:
         raise HTTPException(
@@ -129,9 +312,14 @@ def delete_event(event_id: str, user_id: str = Query(...), db: Session = Depends
     db.delete(event)
     db.commit()
     
+    reminder_scheduler.cancel(event.id)
+    event_cache.invalidate_event(event.id, (event.type, event.is_open))
+    publish_event_change("event_deleted", event)
+    
     return None
 
 @router.get("/user/{user_id}", response_model=List[EventResponse])
-def get_user_events(user_id: str, db: Session = Depends(get_db)):
-    events = db.query(Event).filter(Event.creator_id == user_id).all()
-    return events 
\ No newline at end of file
+def get_user_events(user_id: str, fields: Optional[str] = None, embed: Optional[str] = None, db: Session = Depends(get_db)):
+    fieldset = parse_fieldset(EVENT_FIELDS, fields, embed)
+    events = db.query(Event).options(*fieldset_options(EVENT_FIELDS, fieldset)).filter(Event.creator_id == user_id).all()
+    return json_response(List[fieldset_schema(EVENT_FIELDS, fieldset)], events)
@@ -0,0 +1,280 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from typing import List, Optional
+from datetime import datetime
+from app.database import get_async_db
+from app.models.models import Event, User, EventResponse as EventResponseModel
+from app.schemas.schemas import EventCreate, EventResponse, EventUpdate, LocationSuggestion, NearbyEventResponse, FeedEventResponse
+from app.services.feed import feed_candidates_query, type_affinity_query, score_events, rank_events
+from app.services.cache import event_cache
+from app.services.serialization import json_response
+from app.services.fieldsets import EVENT_FIELDS, fieldset_key, fieldset_options, fieldset_schema, parse_fieldset
+from app.services.http_cache import (
+    event_list_validators, event_validator_columns, event_validator_query, event_validators,
+    is_conditional, is_not_modified, not_modified, variant_etag
+)
+from app.services.geo import nearby_candidates_columns, nearby_candidates_filter, rank_by_distance
+from app.services.locations import location_suggestions_query
+from app.services.notifications import accepted_chat_ids_query, queue_event_updated
+from app.services.realtime import publish_event_change
+from app.services.reminders import reminder_scheduler
+from app.services.sessions import current_user_id
+from app.routers.events import event_page, events_page, filter_events_page
+import logging
+
+# Async counterpart of app.routers.events, mounted instead of it when ASYNC_DB=true.
+# Relationships can't be lazy-loaded under AsyncSession, so creator is always eager-loaded.
+
+router = APIRouter(
+    prefix="/events",
+    tags=["events"]
+)
+
+async def get_event_or_404(db: AsyncSession, event_id: str, fieldset=None) -> Event:
+    result = await db.execute(
+        select(Event).options(*fieldset_options(EVENT_FIELDS, fieldset)).where(Event.id == event_id)
+    )
+    event = result.scalars().first()
+    if not event:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Event with id {event_id} not found"
+        )
+    return event
+
+@router.post("/", response_model=EventResponse)
+async def create_event(event_data: EventCreate, user_id: str = Depends(current_user_id), db: AsyncSession = Depends(get_async_db)):
+    logger = logging.getLogger(__name__)
+    logger.info(f"Creating event for user_id: {user_id}")
+
+    # Check if user exists
+    user = await db.get(User, user_id)
+    if not user:
+        logger.error(f"User not found: {user_id}")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"User with id {user_id} not found"
+        )
+
+    # Create event; assigning the relationship keeps creator available for serialization
+    db_event = Event(
+        creator=user,
+        title=event_data.title,
+        description=event_data.description,
+        location=event_data.location,
+        latitude=event_data.latitude,
+        longitude=event_data.longitude,
+        datetime=event_data.datetime,
+        type=event_data.type,
+        is_open=event_data.is_open
+    )
+
+    db.add(db_event)
+    await db.commit()
+
+    reminder_scheduler.schedule(db_event.id, db_event.datetime)
+    await event_cache.offload(event_cache.invalidate_event, db_event.id, (db_event.type, db_event.is_open))
+    publish_event_change("event_created", db_event)
+
+    return db_event
+
+@router.get("/", response_model=List[EventResponse])
+async def get_events(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    event_type: Optional[str] = None,
+    location: Optional[str] = None,
+    interest: Optional[str] = None,
+    is_open: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    embed: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    filters = (skip, limit, event_type, location, interest, is_open, cursor)
+    fieldset = parse_fieldset(EVENT_FIELDS, fields, embed)
+
+    cache_key = await event_cache.offload(event_cache.list_key, *filters, variant=fieldset_key(fieldset))
+    cached = await event_cache.offload(event_cache.get, cache_key)
+    if cached:
+        return cached.to_response(request)
+
+    if is_conditional(request):
+        result = await db.execute(filter_events_page(
+            select(*event_validator_columns()).outerjoin(User, User.id == Event.creator_id), *filters
+        ))
+        etag, last_modified = event_list_validators(result.all())
+        etag = variant_etag(etag, fieldset_key(fieldset))
+        if is_not_modified(request, etag):
+            return not_modified(etag, last_modified)
+
+    result = await db.execute(filter_events_page(select(Event).options(*fieldset_options(EVENT_FIELDS, fieldset)), *filters))
+    events = result.scalars().all()
+
+    page = events_page(events, limit, fieldset)
+    await event_cache.offload(event_cache.put, cache_key, page)
+    return page.to_response(request)
+
+@router.get("/feed", response_model=List[FeedEventResponse])
+async def get_feed(
+    user_id: str = Depends(current_user_id),
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lon: Optional[float] = Query(None, ge=-180, le=180),
+    skip: int = 0,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Open upcoming events ranked for the user by shared interests, type affinity, recency and distance"""
+    user = await db.get(User, user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"User with id {user_id} not found"
+        )
+
+    now = datetime.utcnow()
+    events = (await db.execute(feed_candidates_query(user_id, now))).scalars().all()
+    type_counts = (await db.execute(type_affinity_query(user_id))).all()
+
+    scores = score_events(user, events, type_counts, now, lat, lon)
+    return [
+        FeedEventResponse(**EventResponse.model_validate(event).model_dump(), score=round(score, 4))
+        for event, score in rank_events(events, scores, skip, limit)
+    ]
+
+@router.get("/nearby", response_model=List[NearbyEventResponse])
+async def get_nearby_events(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(3.0, gt=0, le=50),
+    starts_after: Optional[datetime] = None,
+    starts_before: Optional[datetime] = None,
+    event_type: Optional[str] = None,
+    is_open: Optional[bool] = True,
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Events within radius_km of (lat, lon), starting inside the time window, nearest first"""
+    query = select(*nearby_candidates_columns()).where(
+        nearby_candidates_filter(lat, lon, radius_km, starts_after or datetime.utcnow(), starts_before)
+    )
+    if event_type:
+        query = query.where(Event.type == event_type)
+    if is_open is not None:
+        query = query.where(Event.is_open == is_open)
+
+    result = await db.execute(query)
+    ranked = rank_by_distance(result.all(), lat, lon, radius_km, limit)
+    if not ranked:
+        return []
+
+    result = await db.execute(
+        select(Event).options(joinedload(Event.creator)).where(Event.id.in_([event_id for event_id, _ in ranked]))
+    )
+    by_id = {event.id: event for event in result.scalars().all()}
+    return [
+        NearbyEventResponse(**EventResponse.model_validate(by_id[event_id]).model_dump(), distance_km=round(distance, 3))
+        for event_id, distance in ranked if event_id in by_id
+    ]
+
+@router.get("/locations", response_model=List[LocationSuggestion])
+async def get_location_suggestions(q: str = "", limit: int = Query(10, ge=1, le=50), db: AsyncSession = Depends(get_async_db)):
+    """Distinct event locations starting with q, most used first"""
+    result = await db.execute(location_suggestions_query(q, limit))
+    return [LocationSuggestion(name=name, event_count=count) for name, count in result.all()]
+
+@router.get("/{event_id}", response_model=EventResponse)
+async def get_event(
+    event_id: str,
+    request: Request,
+    fields: Optional[str] = None,
+    embed: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    fieldset = parse_fieldset(EVENT_FIELDS, fields, embed)
+    cache_key = await event_cache.offload(event_cache.event_key, event_id, variant=fieldset_key(fieldset))
+    cached = await event_cache.offload(event_cache.get, cache_key)
+    if cached:
+        return cached.to_response(request)
+
+    if is_conditional(request):
+        row = (await db.execute(event_validator_query(event_id))).first()
+        if row:
+            etag, last_modified = event_validators(*row)
+            etag = variant_etag(etag, fieldset_key(fieldset))
+            if is_not_modified(request, etag, last_modified):
+                return not_modified(etag, last_modified)
+
+    event = await get_event_or_404(db, event_id, fieldset)
+    page = event_page(event, fieldset)
+    await event_cache.offload(event_cache.put, cache_key, page)
+    return page.to_response(request)
+
+@router.put("/{event_id}", response_model=EventResponse)
+async def update_event(event_id: str, event_data: EventUpdate, user_id: str = Depends(current_user_id), db: AsyncSession = Depends(get_async_db)):
+    event = await get_event_or_404(db, event_id)
+
+    # Check if user is the creator
+    if str(event.creator_id) != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only the creator can update the event"
+        )
+
+    rescheduled = event_data.datetime is not None and event_data.datetime != event.datetime
+    previous_state = (event.type, event.is_open)
+
+    # Update fields
+    for key, value in event_data.dict(exclude_unset=True).items():
+        if value is not None:
+            setattr(event, key, value)
+
+    event.updated_at = datetime.utcnow()
+
+    # Let accepted participants know; sent by the outbox worker after commit
+    result = await db.execute(accepted_chat_ids_query(event.id))
+    queue_event_updated(db, result.scalars().all(), event)
+
+    await db.commit()
+
+    if rescheduled:
+        reminder_scheduler.schedule(event.id, event.datetime)
+    await event_cache.offload(event_cache.invalidate_event, event.id, previous_state, (event.type, event.is_open))
+    publish_event_change("event_updated", event)
+
+    return event
+
+@router.delete("/{event_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_event(event_id: str, user_id: str = Depends(current_user_id), db: AsyncSession = Depends(get_async_db)):
+    event = await get_event_or_404(db, event_id)
+
+    # Check if user is the creator
+    if str(event.creator_id) != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only the creator can delete the event"
+        )
+
+    # Delete event responses first
+    await db.execute(delete(EventResponseModel).where(EventResponseModel.event_id == event_id))
+
+    # Delete event
+    await db.delete(event)
+    await db.commit()
+
+    reminder_scheduler.cancel(event.id)
+    await event_cache.offload(event_cache.invalidate_event, event.id, (event.type, event.is_open))
+    publish_event_change("event_deleted", event)
+
+    return None
+
+@router.get("/user/{user_id}", response_model=List[EventResponse])
+async def get_user_events(user_id: str, fields: Optional[str] = None, embed: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    fieldset = parse_fieldset(EVENT_FIELDS, fields, embed)
+    result = await db.execute(
+        select(Event).options(*fieldset_options(EVENT_FIELDS, fieldset)).where(Event.creator_id == user_id)
+    )
+    return json_response(List[fieldset_schema(EVENT_FIELDS, fieldset)], result.scalars().all())
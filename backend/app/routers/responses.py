@@ -1,9 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import insert, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
+from typing import Dict, List, Optional, Tuple
 from app.database import get_db
-from app.models.models import EventResponse, Event, User
-from app.schemas.schemas import EventResponseCreate, EventResponseOut, EventResponseUpdate
+from app.models.models import EventResponse, Event, Notification, User
+from app.schemas.schemas import (
+    EventResponseCreate, EventResponseOut, EventResponseUpdate, EventResponseBatchUpdate, EventResponseBatchResult,
+    ResponseDecisionResult, RespondentCard
+)
+from app.services.pagination import encode_cursor, decode_cursor
+from app.services.notifications import event_invitation_rows, queue_event_invitation, queue_response_notification
+from app.services.sessions import current_user_id
+from app.services.cache import event_cache
+from app.services.fieldsets import RESPONSE_FIELDS, fieldset_options, fieldset_schema, parse_fieldset
+from app.services.serialization import json_response
+from app.services.counters import event_counters_update
+from app.services.realtime import publish_response_change
 
 router = APIRouter(
     prefix="/responses",
@@ -11,7 +24,7 @@ router = APIRouter(
 )
 
 @router.post("/", response_model=EventResponseOut)
-def create_response(response_data: EventResponseCreate, user_id: str, db: Session = Depends(get_db)):
+def create_response(response_data: EventResponseCreate, user_id: str = Depends(current_user_id), db: Session = Depends(get_db)):
     # Check if user exists
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
@@ -62,39 +75,236 @@ def create_response(response_data: EventResponseCreate, user_id: str, db: Sessio
     )
     
     db.add(db_response)
+    db.execute(event_counters_update(event.id, [(None, db_response.status)]))
+    queue_response_notification(db, event.creator, user, event)
+    try:
+        db.flush()
+    except IntegrityError:
+        # A concurrent request got past the check above; uq_event_responses_event_id_user_id caught it
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="You have already responded to this event"
+        )
+    # Read before commit expires the rows; the responder is already in the session
+    response = EventResponseOut.model_validate(db_response)
+    event_state = (event.type, event.is_open)
     db.commit()
-    db.refresh(db_response)
     
-    return db_response
+    # Event pages are cached; drop the ones showing this event
+    event_cache.invalidate_event(response_data.event_id, event_state)
+    publish_response_change("response_created", response.id, response.event_id, user_id, response.status)
+    
+    return response
+
+def respondent_queue_query(event_id: str, response_status: Optional[str], limit: int, cursor: Optional[str]):
+    """Respondent cards of one event, oldest response first, continuing after cursor.
+
+    With a status this is a single range read of the (event_id, status,
+    responded_at, id) index; only name and avatar are taken from users.
+    """
+    query = (
+        select(
+            EventResponse.id, EventResponse.user_id, EventResponse.status, EventResponse.responded_at,
+            User.name, User.avatar_url
+        )
+        .join(User, User.id == EventResponse.user_id)
+        .where(EventResponse.event_id == event_id)
+    )
+    if response_status:
+        query = query.where(EventResponse.status == response_status)
+    if cursor:
+        cursor_responded_at, cursor_id = decode_cursor(cursor)
+        query = query.where(tuple_(EventResponse.responded_at, EventResponse.id) > (cursor_responded_at, cursor_id))
+    return query.order_by(EventResponse.responded_at, EventResponse.id).limit(limit)
+
+def queue_next_cursor(cards, limit: int) -> Optional[str]:
+    # A full page means there may be more; hand out the position of its last item
+    if cards and len(cards) == limit:
+        return encode_cursor(cards[-1].responded_at, cards[-1].id)
+    return None
+
+def check_event_creator(event_row, event_id: str, user_id: str):
+    """404/403 unless the (creator_id,) row exists and belongs to the user"""
+    if not event_row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Event with id {event_id} not found"
+        )
+    if str(event_row.creator_id) != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only the creator can see event responses"
+        )
 
 @router.get("/event/{event_id}", response_model=List[EventResponseOut])
-def get_event_responses(event_id: str, user_id: str, db: Session = Depends(get_db)):
+def get_event_responses(
+    event_id: str,
+    response_status: Optional[str] = Query(None, alias="status"),
+    fields: Optional[str] = None,
+    embed: Optional[str] = None,
+    user_id: str = Depends(current_user_id),
+    db: Session = Depends(get_db)
+):
+    fieldset = parse_fieldset(RESPONSE_FIELDS, fields, embed)
+    # Check if event exists and the user is its creator
+    check_event_creator(db.query(Event.creator_id).filter(Event.id == event_id).first(), event_id, user_id)
+    
+    # Get responses, with respondents fetched in one extra IN query rather than one per response
+    query = db.query(EventResponse).options(*fieldset_options(RESPONSE_FIELDS, fieldset, selectinload)).filter(
+        EventResponse.event_id == event_id
+    )
+    if response_status:
+        query = query.filter(EventResponse.status == response_status)
+    responses = query.order_by(EventResponse.responded_at, EventResponse.id).all()
+    return json_response(List[fieldset_schema(RESPONSE_FIELDS, fieldset)], responses)
+
+@router.get("/event/{event_id}/queue", response_model=List[RespondentCard])
+def get_respondent_queue(
+    event_id: str,
+    response_status: Optional[str] = Query(None, alias="status"),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    user_id: str = Depends(current_user_id),
+    db: Session = Depends(get_db)
+):
+    """The creator's review screen: one page of compact respondent cards, next page via X-Next-Cursor"""
+    check_event_creator(db.query(Event.creator_id).filter(Event.id == event_id).first(), event_id, user_id)
+    
+    cards = db.execute(respondent_queue_query(event_id, response_status, limit, cursor)).all()
+    next_cursor = queue_next_cursor(cards, limit)
+    return json_response(List[RespondentCard], cards, {"X-Next-Cursor": next_cursor} if next_cursor else None)
+
+@router.get("/user/{user_id}", response_model=List[EventResponseOut])
+def get_user_responses(user_id: str, fields: Optional[str] = None, embed: Optional[str] = None, db: Session = Depends(get_db)):
+    fieldset = parse_fieldset(RESPONSE_FIELDS, fields, embed)
+    # Every row points at the same user, so a single join is cheaper than a second query
+    responses = db.query(EventResponse).options(*fieldset_options(RESPONSE_FIELDS, fieldset)).filter(
+        EventResponse.user_id == user_id
+    ).all()
+    return json_response(List[fieldset_schema(RESPONSE_FIELDS, fieldset)], responses)
+
+def check_batch_decisions(batch: EventResponseBatchUpdate):
+    ids = [decision.id for decision in batch.decisions]
+    if len(set(ids)) != len(ids):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Each response may appear only once in a batch"
+        )
+
+def decision_rows_query(batch: EventResponseBatchUpdate):
+    """Current status and responder chat id of every response in the batch that belongs to its event"""
+    return (
+        select(EventResponse.id, EventResponse.user_id, EventResponse.status, User.telegram_id)
+        .join(User, User.id == EventResponse.user_id)
+        .where(
+            EventResponse.event_id == batch.event_id,
+            EventResponse.id.in_([decision.id for decision in batch.decisions])
+        )
+    )
+
+def plan_decisions(batch: EventResponseBatchUpdate, rows) -> Tuple[List[ResponseDecisionResult], list]:
+    """Per-item results, and the (row, new status) pairs that actually change"""
+    current = {str(row.id): row for row in rows}
+    results, changes = [], []
+    for decision in batch.decisions:
+        row = current.get(decision.id)
+        if row is None:
+            results.append(ResponseDecisionResult(id=decision.id, result="not_found"))
+        elif row.status == decision.status:
+            results.append(ResponseDecisionResult(id=decision.id, result="unchanged", status=row.status))
+        else:
+            results.append(ResponseDecisionResult(id=decision.id, result="updated", status=decision.status))
+            changes.append((row, decision.status))
+    return results, changes
+
+def decision_updates(event_id: str, changes):
+    """One UPDATE per (old status, new status) pair instead of one per response.
+
+    Each only matches responses still in the status plan_decisions read and
+    returns their ids: a response another request moved in the meantime is
+    left alone, and only rows actually updated count towards the counters.
+    """
+    ids_by_transition: Dict[Tuple[str, str], List] = {}
+    for row, new_status in changes:
+        ids_by_transition.setdefault((row.status, new_status), []).append(row.id)
+    return [
+        update(EventResponse)
+        .where(EventResponse.event_id == event_id, EventResponse.id.in_(ids), EventResponse.status == old_status)
+        .values(status=new_status)
+        .returning(EventResponse.id)
+        .execution_options(synchronize_session=False)
+        for (old_status, new_status), ids in ids_by_transition.items()
+    ]
+
+def settle_decisions(results: List[ResponseDecisionResult], changes, updated_ids) -> Tuple[List[ResponseDecisionResult], list]:
+    """Keep the changes decision_updates applied; the rest lost a race and are reported as conflicts"""
+    applied = [(row, new_status) for row, new_status in changes if row.id in updated_ids]
+    lost = {str(row.id) for row, new_status in changes if row.id not in updated_ids}
+    results = [ResponseDecisionResult(id=result.id, result="conflict") if result.id in lost else result for result in results]
+    return results, applied
+
+def status_update(response_id, old_status: str, new_status: str):
+    """UPDATE moving one response from old_status; matches no row if another request moved it first"""
+    return (
+        update(EventResponse)
+        .where(EventResponse.id == response_id, EventResponse.status == old_status)
+        .values(status=new_status)
+        .execution_options(synchronize_session=False)
+    )
+
+def status_conflict() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="The response status was changed by another request; reload and try again"
+    )
+
+@router.put("/batch", response_model=EventResponseBatchResult)
+def update_responses(batch: EventResponseBatchUpdate, user_id: str = Depends(current_user_id), db: Session = Depends(get_db)):
+    """Accept or reject many responses to one event in a single transaction"""
+    check_batch_decisions(batch)
+    
     # Check if event exists
-    event = db.query(Event).filter(Event.id == event_id).first()
+    event = db.query(Event).filter(Event.id == batch.event_id).first()
     if not event:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Event with id {event_id} not found"
+            detail=f"Event with id {batch.event_id} not found"
         )
     
-    # Check if user is the creator
+    # One ownership check covers every response, since all must belong to this event
     if str(event.creator_id) != user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only the creator can see event responses"
+            detail="Only the event creator can update response status"
         )
     
-    # Get responses
-    responses = db.query(EventResponse).filter(EventResponse.event_id == event_id).all()
-    return responses
-
-@router.get("/user/{user_id}", response_model=List[EventResponseOut])
-def get_user_responses(user_id: str, db: Session = Depends(get_db)):
-    responses = db.query(EventResponse).filter(EventResponse.user_id == user_id).all()
-    return responses
+    results, changes = plan_decisions(batch, db.execute(decision_rows_query(batch)).all())
+    updated_ids = set()
+    for statement in decision_updates(batch.event_id, changes):
+        updated_ids.update(db.scalars(statement))
+    results, changes = settle_decisions(results, changes, updated_ids)
+    counters = event_counters_update(event.id, [(row.status, new_status) for row, new_status in changes])
+    if counters is not None:
+        db.execute(counters)
+    
+    # Invite the responders who are newly accepted
+    invited = [row for row, new_status in changes if new_status == "accepted"]
+    if invited:
+        db.execute(insert(Notification), event_invitation_rows(invited, event))
+    
+    event_state = (event.type, event.is_open)
+    db.commit()
+    
+    if changes:
+        event_cache.invalidate_event(batch.event_id, event_state)
+    for row, new_status in changes:
+        publish_response_change("response_updated", row.id, batch.event_id, row.user_id, new_status)
+    
+    return EventResponseBatchResult(event_id=batch.event_id, results=results)
 
 @router.put("/{response_id}", response_model=EventResponseOut)
-def update_response(response_id: str, response_data: EventResponseUpdate, user_id: str, db: Session = Depends(get_db)):
+def update_response(response_id: str, response_data: EventResponseUpdate, user_id: str = Depends(current_user_id), db: Session = Depends(get_db)):
     # Check if response exists
     response = db.query(EventResponse).filter(EventResponse.id == response_id).first()
     if not response:
@@ -118,10 +328,31 @@ def update_response(response_id: str, response_data: EventResponseUpdate, user_i
             detail="Only the event creator can update response status"
         )
     
-    # Update response status
-    response.status = response_data.status
+    # Update response status, only if it is still the one read above: concurrent updates
+    # can't both apply the same transition to the counters
+    old_status = response.status
+    moved = db.execute(status_update(response.id, old_status, response_data.status)).rowcount == 1
+    counters = event_counters_update(event.id, [(old_status, response_data.status)]) if moved else None
+    if counters is not None:
+        db.execute(counters)
+    
+    # Invite the responder once they are accepted
+    if moved and response_data.status == "accepted" and old_status != "accepted":
+        queue_event_invitation(db, response.user, event)
     
+    # Read before commit expires the event
+    event_state = (event.type, event.is_open)
     db.commit()
     db.refresh(response)
+    if not moved:
+        # Another request got there first; fine if it left the status asked for
+        if response.status != response_data.status:
+            raise status_conflict()
+        return response
+    
+    # The counts on cached event pages changed
+    if counters is not None:
+        event_cache.invalidate_event(event.id, event_state)
+    publish_response_change("response_updated", response.id, response.event_id, response.user_id, response.status)
     
     return response 
\ No newline at end of file
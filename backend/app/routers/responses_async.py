@@ -0,0 +1,237 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+from typing import List, Optional
+from app.database import get_async_db
+from app.models.models import EventResponse, Event, Notification, User
+from app.schemas.schemas import (
+    EventResponseCreate, EventResponseOut, EventResponseUpdate, EventResponseBatchUpdate, EventResponseBatchResult, RespondentCard
+)
+from app.services.notifications import event_invitation_rows, queue_event_invitation, queue_response_notification
+from app.services.sessions import current_user_id
+from app.services.cache import event_cache
+from app.services.fieldsets import RESPONSE_FIELDS, fieldset_options, fieldset_schema, parse_fieldset
+from app.services.serialization import json_response
+from app.services.counters import event_counters_update
+from app.services.realtime import publish_response_change
+from app.routers.responses import (
+    check_batch_decisions, check_event_creator, decision_rows_query, decision_updates, plan_decisions,
+    queue_next_cursor, respondent_queue_query, settle_decisions, status_conflict, status_update
+)
+
+# Async counterpart of app.routers.responses, mounted instead of it when ASYNC_DB=true
+
+router = APIRouter(
+    prefix="/responses",
+    tags=["responses"]
+)
+
+async def get_event_or_404(db: AsyncSession, event_id: str) -> Event:
+    event = await db.get(Event, event_id)
+    if not event:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Event with id {event_id} not found"
+        )
+    return event
+
+@router.post("/", response_model=EventResponseOut)
+async def create_response(response_data: EventResponseCreate, user_id: str = Depends(current_user_id), db: AsyncSession = Depends(get_async_db)):
+    # Check if user exists
+    user = await db.get(User, user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"User with id {user_id} not found"
+        )
+
+    # Check if event exists
+    event = await get_event_or_404(db, response_data.event_id)
+
+    # Check if event is open
+    if not event.is_open:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="This event is not open for responses"
+        )
+
+    # Check if user is not the creator
+    if str(event.creator_id) == user_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="You cannot respond to your own event"
+        )
+
+    # Check if user has already responded
+    result = await db.execute(
+        select(EventResponse.id).where(
+            EventResponse.event_id == response_data.event_id,
+            EventResponse.user_id == user_id
+        ).limit(1)
+    )
+    if result.first():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="You have already responded to this event"
+        )
+
+    # Create response
+    db_response = EventResponse(
+        event_id=response_data.event_id,
+        user=user,
+        status="pending"
+    )
+
+    db.add(db_response)
+    await db.execute(event_counters_update(event.id, [(None, db_response.status)]))
+    queue_response_notification(db, await db.get(User, event.creator_id), user, event)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # A concurrent request got past the check above; uq_event_responses_event_id_user_id caught it
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="You have already responded to this event"
+        )
+
+    await event_cache.offload(event_cache.invalidate_event, event.id, (event.type, event.is_open))
+    publish_response_change("response_created", db_response.id, event.id, user_id, db_response.status)
+
+    return db_response
+
+@router.get("/event/{event_id}", response_model=List[EventResponseOut])
+async def get_event_responses(
+    event_id: str,
+    response_status: Optional[str] = Query(None, alias="status"),
+    fields: Optional[str] = None,
+    embed: Optional[str] = None,
+    user_id: str = Depends(current_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    fieldset = parse_fieldset(RESPONSE_FIELDS, fields, embed)
+    # Check if event exists and the user is its creator
+    event = (await db.execute(select(Event.creator_id).where(Event.id == event_id))).first()
+    check_event_creator(event, event_id, user_id)
+
+    # Get responses
+    query = select(EventResponse).options(*fieldset_options(RESPONSE_FIELDS, fieldset, selectinload)).where(
+        EventResponse.event_id == event_id
+    )
+    if response_status:
+        query = query.where(EventResponse.status == response_status)
+    result = await db.execute(query.order_by(EventResponse.responded_at, EventResponse.id))
+    return json_response(List[fieldset_schema(RESPONSE_FIELDS, fieldset)], result.scalars().all())
+
+@router.get("/event/{event_id}/queue", response_model=List[RespondentCard])
+async def get_respondent_queue(
+    event_id: str,
+    response_status: Optional[str] = Query(None, alias="status"),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    user_id: str = Depends(current_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """The creator's review screen: one page of compact respondent cards, next page via X-Next-Cursor"""
+    event = (await db.execute(select(Event.creator_id).where(Event.id == event_id))).first()
+    check_event_creator(event, event_id, user_id)
+
+    cards = (await db.execute(respondent_queue_query(event_id, response_status, limit, cursor))).all()
+    next_cursor = queue_next_cursor(cards, limit)
+    return json_response(List[RespondentCard], cards, {"X-Next-Cursor": next_cursor} if next_cursor else None)
+
+@router.get("/user/{user_id}", response_model=List[EventResponseOut])
+async def get_user_responses(user_id: str, fields: Optional[str] = None, embed: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    fieldset = parse_fieldset(RESPONSE_FIELDS, fields, embed)
+    result = await db.execute(
+        select(EventResponse).options(*fieldset_options(RESPONSE_FIELDS, fieldset)).where(EventResponse.user_id == user_id)
+    )
+    return json_response(List[fieldset_schema(RESPONSE_FIELDS, fieldset)], result.scalars().all())
+
+@router.put("/batch", response_model=EventResponseBatchResult)
+async def update_responses(batch: EventResponseBatchUpdate, user_id: str = Depends(current_user_id), db: AsyncSession = Depends(get_async_db)):
+    """Accept or reject many responses to one event in a single transaction"""
+    check_batch_decisions(batch)
+
+    # Check if event exists
+    event = await get_event_or_404(db, batch.event_id)
+
+    # One ownership check covers every response, since all must belong to this event
+    if str(event.creator_id) != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only the event creator can update response status"
+        )
+
+    results, changes = plan_decisions(batch, (await db.execute(decision_rows_query(batch))).all())
+    updated_ids = set()
+    for statement in decision_updates(batch.event_id, changes):
+        updated_ids.update(await db.scalars(statement))
+    results, changes = settle_decisions(results, changes, updated_ids)
+    counters = event_counters_update(event.id, [(row.status, new_status) for row, new_status in changes])
+    if counters is not None:
+        await db.execute(counters)
+
+    # Invite the responders who are newly accepted
+    invited = [row for row, new_status in changes if new_status == "accepted"]
+    if invited:
+        await db.execute(insert(Notification), event_invitation_rows(invited, event))
+
+    await db.commit()
+
+    if changes:
+        await event_cache.offload(event_cache.invalidate_event, event.id, (event.type, event.is_open))
+    for row, new_status in changes:
+        publish_response_change("response_updated", row.id, batch.event_id, row.user_id, new_status)
+
+    return EventResponseBatchResult(event_id=batch.event_id, results=results)
+
+@router.put("/{response_id}", response_model=EventResponseOut)
+async def update_response(response_id: str, response_data: EventResponseUpdate, user_id: str = Depends(current_user_id), db: AsyncSession = Depends(get_async_db)):
+    # Check if response exists
+    result = await db.execute(
+        select(EventResponse).options(joinedload(EventResponse.user)).where(EventResponse.id == response_id)
+    )
+    response = result.scalars().first()
+    if not response:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Response with id {response_id} not found"
+        )
+
+    # Check if event exists
+    event = await get_event_or_404(db, response.event_id)
+
+    # Check if user is the creator of the event
+    if str(event.creator_id) != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only the event creator can update response status"
+        )
+
+    # Update response status, only if it is still the one read above
+    old_status = response.status
+    moved = (await db.execute(status_update(response.id, old_status, response_data.status))).rowcount == 1
+    counters = event_counters_update(event.id, [(old_status, response_data.status)]) if moved else None
+    if counters is not None:
+        await db.execute(counters)
+
+    # Invite the responder once they are accepted
+    if moved and response_data.status == "accepted" and old_status != "accepted":
+        queue_event_invitation(db, response.user, event)
+
+    await db.commit()
+    await db.refresh(response, ["status"])
+    if not moved:
+        if response.status != response_data.status:
+            raise status_conflict()
+        return response
+
+    # The counts on cached event pages changed
+    if counters is not None:
+        await event_cache.offload(event_cache.invalidate_event, event.id, (event.type, event.is_open))
+    publish_response_change("response_updated", response.id, response.event_id, response.user_id, response.status)
+
+    return response
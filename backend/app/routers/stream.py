@@ -0,0 +1,103 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from typing import Optional
+from app.database import ASYNC_DB, AsyncSessionLocal, SessionLocal
+from app.models.models import Event
+from app.services.realtime import (
+    FEED_TOPIC, REALTIME, REALTIME_HEARTBEAT, event_responses_topic, hub, user_responses_topic
+)
+from app.services.sessions import stream_user_id
+
+router = APIRouter(
+    prefix="/stream",
+    tags=["stream"]
+)
+
+def _event_creator_id(event_id: str):
+    db = SessionLocal()
+    try:
+        return db.execute(select(Event.creator_id).where(Event.id == event_id)).first()
+    finally:
+        db.close()
+
+async def event_creator_id(event_id: str):
+    """Row with the event's creator_id, or None. Uses its own short-lived session:
+    a dependency's session would stay checked out for as long as the stream is open."""
+    if ASYNC_DB:
+        async with AsyncSessionLocal() as db:
+            return (await db.execute(select(Event.creator_id).where(Event.id == event_id))).first()
+    return await run_in_threadpool(_event_creator_id, event_id)
+
+async def stream_messages(topics):
+    """Subscribes once the response starts, so a stream that never starts leaves nothing behind"""
+    subscription = None
+    try:
+        subscription = hub.subscribe(topics)
+        # Reconnect delay for EventSource
+        yield b"retry: 5000\n\n"
+        while True:
+            chunk = await subscription.next_chunk(REALTIME_HEARTBEAT)
+            yield chunk if chunk is not None else b": keep-alive\n\n"
+    finally:
+        # Runs when the client disconnects and the response task is cancelled
+        if subscription is not None:
+            hub.unsubscribe(subscription)
+
+@router.get("/")
+async def stream(
+    feed: bool = False,
+    event_id: Optional[str] = Query(None),
+    mine: bool = False,
+    user_id: Optional[str] = Depends(stream_user_id)
+):
+    """Server-sent events for the Web App.
+
+    feed: events created, updated or deleted. event_id: responses to that
+    event, for its creator. mine: status changes of the caller's own
+    responses. Messages carry ids and the changed fields only; on a resync
+    message the client should refetch what it shows.
+    """
+    if not REALTIME:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Streaming is not enabled"
+        )
+    if not (feed or event_id or mine):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Subscribe to at least one of feed, event_id or mine"
+        )
+    if (event_id or mine) and not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+    topics = []
+    if feed:
+        topics.append(FEED_TOPIC)
+    if event_id:
+        event = await event_creator_id(event_id)
+        if not event:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Event with id {event_id} not found"
+            )
+        if str(event.creator_id) != user_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only the creator can see event responses"
+            )
+        topics.append(event_responses_topic(event_id))
+    if mine:
+        topics.append(user_responses_topic(user_id))
+
+    return StreamingResponse(
+        stream_messages(topics),
+        media_type="text/event-stream",
+        # Keep proxies (nginx) from buffering or caching the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,43 @@
+from fastapi import APIRouter, HTTPException, status, Request, Header
+from typing import Optional
+import hmac
+import logging
+from app.services import telegram_bot
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/telegram",
+    tags=["telegram"]
+)
+
+@router.post("/webhook")
+async def telegram_webhook(
+    request: Request,
+    x_telegram_bot_api_secret_token: Optional[str] = Header(None)
+):
+    """Receive an Update from Telegram and hand it to the bot's handlers"""
+    if not telegram_bot.TELEGRAM_WEBHOOK_URL or not telegram_bot.bot:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Telegram webhook is not enabled"
+        )
+    
+    # Only Telegram knows the secret set with setWebhook
+    if not x_telegram_bot_api_secret_token or not hmac.compare_digest(
+        x_telegram_bot_api_secret_token, telegram_bot.TELEGRAM_WEBHOOK_SECRET
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid secret token"
+        )
+    
+    # Telegram redelivers an update until it gets a 2xx, so one it can't be processed is
+    # acknowledged and logged rather than retried forever
+    try:
+        payload = await request.json()
+        # Handlers run on the bot's worker threads; answer Telegram right away
+        telegram_bot.process_update(payload)
+    except Exception as e:
+        logger.warning(f"Dropped malformed Telegram update: {str(e)}")
+    return {"ok": True}
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Body, Depends, HTTPException, status, Request, Response, Query
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any, Optional
 import hashlib
@@ -8,11 +9,19 @@ import json
 import logging
 from app.database import get_db
 from app.models.models import User
-from app.schemas.schemas import UserCreate, UserResponse, UserUpdate, TelegramAuth
+from app.schemas.schemas import UserCreate, UserResponse, UserUpdate, TelegramAuth, AuthResponse
+from app.services.feed import interest_index
+from app.services.interests import sync_user_interests, user_ids_with_interest
+from app.services.sessions import issue_session_token, verified_init_data
+from app.services.users import UPSERT_ATTEMPTS, retryable_write_error, upsert_retry_delay, upsert_user_statement
+from app.services.http_cache import is_conditional, is_not_modified, not_modified, set_validators, user_validator_query, user_validators
+from app.services.cache import event_cache
+from app.services.serialization import json_response
 import os
 from dotenv import load_dotenv
 from pydantic import BaseModel
-from urllib.parse import unquote
+from urllib.parse import parse_qsl, unquote
+from datetime import datetime
 
 # Настройка логирования
 logging.basicConfig(level=logging.INFO)
@@ -20,8 +29,12 @@ logger = logging.getLogger(__name__)
 
 load_dotenv()
 BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
-# Изменяем DEBUG_MODE на True по умолчанию для тестирования
-DEBUG_MODE = os.getenv("DEBUG_MODE", "True").lower() in ("true", "1", "t")
+# Debug sign-in (shared test user, createNewUser) hands out sessions without initData: off unless asked for
+DEBUG_MODE = os.getenv("DEBUG_MODE", "False").lower() in ("true", "1", "t")
+# Mini App initData key (HMAC-SHA256 of the bot token keyed with "WebAppData"), derived once
+TELEGRAM_AUTH_KEY = hmac.new(b"WebAppData", BOT_TOKEN.encode(), hashlib.sha256).digest() if BOT_TOKEN else None
+# initData older than this (seconds since its auth_date) no longer signs anyone in
+INIT_DATA_MAX_AGE = 86400
 
 router = APIRouter(
     prefix="/users",
@@ -32,26 +45,74 @@ router = APIRouter(
 class InitDataAuth(BaseModel):
     initData: str
 
-def verify_telegram_auth(auth_data: TelegramAuth) -> bool:
+def init_data_signature_valid(init_data: str, key: bytes) -> bool:
+    """Check the hash of Telegram.WebApp.initData the way Telegram signs Mini App data.
+
+    The data-check-string is every received pair except hash, URL-decoded,
+    sorted by key and joined with newlines; the hash is its HMAC-SHA256 under key.
+    """
+    try:
+        pairs = dict(parse_qsl(init_data, keep_blank_values=True, strict_parsing=True))
+    except ValueError:
+        return False
+    received_hash = pairs.pop('hash', '')
+    data_check_string = '\n'.join(f"{key}={value}" for key, value in sorted(pairs.items()))
+    computed_hash = hmac.new(key, data_check_string.encode(), hashlib.sha256).hexdigest()
+    return hmac.compare_digest(computed_hash, received_hash)
+
+def verify_telegram_auth(init_data: str, auth_data: TelegramAuth) -> bool:
+    # Without a bot token nothing can be verified
+    if TELEGRAM_AUTH_KEY is None:
+        return False
+
     # Check if auth data is recent (1 day)
-    if time.time() - auth_data.auth_date > 86400:
+    if time.time() - auth_data.auth_date > INIT_DATA_MAX_AGE:
         return False
-        
-    # Create data string
-    data_check_string = '\n'.join([
-        f"{key}={value}" for key, value in auth_data.dict().items() 
-        if key != 'hash' and value is not None
-    ])
     
-    # Create hash
-    secret_key = hashlib.sha256(BOT_TOKEN.encode()).digest()
-    computed_hash = hmac.new(
-        secret_key,
-        data_check_string.encode(),
-        hashlib.sha256
-    ).hexdigest()
-    
-    return computed_hash == auth_data.hash
+    return init_data_signature_valid(init_data, TELEGRAM_AUTH_KEY)
+
+def session_response(user: User) -> AuthResponse:
+    """The user plus a fresh session token"""
+    token, expires_at = issue_session_token(user.id)
+    return AuthResponse(
+        **UserResponse.model_validate(user).model_dump(),
+        session_token=token,
+        session_expires_at=datetime.utcfromtimestamp(expires_at)
+    )
+
+def auth_failed(detail: str) -> HTTPException:
+    """401 for initData that does not prove who the caller is; no session is issued"""
+    return HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=detail)
+
+def upsert_user(db: Session, **fields) -> User:
+    """Create the user, or fetch the one with the same telegram_id, in one round trip"""
+    for attempt in range(UPSERT_ATTEMPTS):
+        try:
+            statement, new_id = upsert_user_statement(db.bind.dialect.name, **fields)
+            user = db.execute(statement, execution_options={"populate_existing": True}).scalar_one()
+            if user.id == new_id and user.interests:
+                # Mapper events don't fire for INSERT statements, so index the interests here
+                sync_user_interests(db.connection(), user.id, user.interests)
+            break
+        except DBAPIError as e:
+            # Lock or serialization failure from a concurrent login: retry in a fresh transaction
+            db.rollback()
+            if attempt == UPSERT_ATTEMPTS - 1 or not retryable_write_error(e):
+                raise
+            logger.warning(f"Retrying user upsert after {str(e.orig)}")
+            time.sleep(upsert_retry_delay(attempt))
+    return user
+
+def user_not_modified(db: Session, request: Request, *criteria) -> Optional[Response]:
+    """304 response if the client's copy of the user is current, checked without loading the user"""
+    if not is_conditional(request):
+        return None
+    row = db.execute(user_validator_query(*criteria)).first()
+    if row:
+        etag, last_modified = user_validators(*row)
+        if is_not_modified(request, etag, last_modified):
+            return not_modified(etag, last_modified)
+    return None
 
 # Парсер данных из Telegram initData
 def parse_init_data(init_data_str: str) -> Dict[str, Any]:
@@ -67,11 +128,11 @@ def parse_init_data(init_data_str: str) -> Dict[str, Any]:
                 # Дополнительное декодирование для значений
                 params[key] = unquote(value)
 
-        logger.info(f"Parsed params: {params}")
+        logger.debug(f"Parsed params: {params}")
         
         # Создаем соответствующий объект auth_data
         user_data = json.loads(params.get('user', '{}'))
-        logger.info(f"Parsed user_data: {user_data}")
+        logger.debug(f"Parsed user_data: {user_data}")
         
         auth_data = {
             'id': int(user_data.get('id', 0)),
@@ -82,7 +143,7 @@ def parse_init_data(init_data_str: str) -> Dict[str, Any]:
             'hash': params.get('hash', '')
         }
         
-        logger.info(f"Created auth_data: {auth_data}")
+        logger.debug(f"Created auth_data: {auth_data}")
         return auth_data
     except Exception as e:
         logger.error(f"Error parsing init data: {str(e)}")
@@ -90,13 +151,9 @@ def parse_init_data(init_data_str: str) -> Dict[str, Any]:
 
 @router.post("/", response_model=UserResponse)
 def create_user(user_data: UserCreate, db: Session = Depends(get_db)):
-    # Check if user already exists
-    existing_user = db.query(User).filter(User.telegram_id == user_data.telegram_id).first()
-    if existing_user:
-        return existing_user
-        
-    # Create new user
-    db_user = User(
+    # Returns the existing user unchanged if the telegram_id is taken
+    db_user = upsert_user(
+        db,
         telegram_id=user_data.telegram_id,
         name=user_data.name,
         avatar_url=user_data.avatar_url,
@@ -104,31 +161,69 @@ def create_user(user_data: UserCreate, db: Session = Depends(get_db)):
         interests=user_data.interests,
         photos=user_data.photos
     )
-    
-    db.add(db_user)
+    # Serialize before committing, which would expire the row and cost a reload
+    response = UserResponse.model_validate(db_user)
     db.commit()
-    db.refresh(db_user)
     
-    return db_user
+    return response
+
+@router.get("/by-interest", response_model=List[UserResponse])
+def get_users_by_interest(interest: str, skip: int = 0, limit: int = Query(50, ge=1, le=200), db: Session = Depends(get_db)):
+    """Users who listed the interest, looked up through the user_interests index"""
+    users = db.query(User).filter(User.id.in_(user_ids_with_interest(interest))).order_by(User.created_at.desc()).offset(skip).limit(limit).all()
+    return json_response(List[UserResponse], users)
+
+MAX_BATCH_IDS = 100
+
+def parse_batch_ids(ids: List[str]) -> List[str]:
+    """Ids from ?ids=a,b and/or ?ids=a&ids=b, deduplicated in request order"""
+    parsed = list(dict.fromkeys(part.strip() for value in ids for part in value.split(",") if part.strip()))
+    if not parsed or len(parsed) > MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Pass between 1 and {MAX_BATCH_IDS} user ids"
+        )
+    return parsed
+
+def in_request_order(ids: List[str], users) -> List[User]:
+    """Unknown ids are left out"""
+    by_id = {str(user.id): user for user in users}
+    return [by_id[user_id] for user_id in ids if user_id in by_id]
+
+@router.get("/batch", response_model=List[UserResponse])
+def get_users_batch(ids: List[str] = Query([]), db: Session = Depends(get_db)):
+    """Several profiles in one query, e.g. everyone who responded to an event"""
+    ids = parse_batch_ids(ids)
+    return json_response(List[UserResponse], in_request_order(ids, db.query(User).filter(User.id.in_(ids)).all()))
 
 @router.get("/{user_id}", response_model=UserResponse)
-def get_user(user_id: str, db: Session = Depends(get_db)):
+def get_user(user_id: str, request: Request, response: Response, db: Session = Depends(get_db)):
+    cached = user_not_modified(db, request, User.id == user_id)
+    if cached:
+        return cached
+    
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"User with id {user_id} not found"
         )
+    set_validators(response, *user_validators(user.id, user.updated_at))
     return user
 
 @router.get("/telegram/{telegram_id}", response_model=UserResponse)
-def get_user_by_telegram_id(telegram_id: int, db: Session = Depends(get_db)):
+def get_user_by_telegram_id(telegram_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    cached = user_not_modified(db, request, User.telegram_id == telegram_id)
+    if cached:
+        return cached
+    
     user = db.query(User).filter(User.telegram_id == telegram_id).first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"User with Telegram ID {telegram_id} not found"
         )
+    set_validators(response, *user_validators(user.id, user.updated_at))
     return user
 
 @router.put("/{user_id}", response_model=UserResponse)
@@ -147,27 +242,33 @@ def update_user(user_id: str, user_data: UserUpdate, db: Session = Depends(get_d
     db.commit()
     db.refresh(user)
     
+    # Keep the feed's interest bitset in step with the profile
+    if "interests" in user_data.model_fields_set:
+        interest_index.refresh_user(user)
+    
+    # Cached event pages embed the creator's profile
+    event_cache.invalidate_all()
+    
     return user
 
-@router.post("/auth", response_model=UserResponse)
-async def authenticate_user(request: Request, db: Session = Depends(get_db)):
+@router.post("/auth", response_model=AuthResponse)
+def authenticate_user(body: Dict[str, Any] = Body(...), db: Session = Depends(get_db)):
+    # A plain def runs in the threadpool: blocking Session calls in an async def would stall
+    # the event loop, and under load deadlock it waiting for pooled connections
     try:
-        # Получаем тело запроса
-        body = await request.json()
         init_data = body.get('initData', '')
         
         logger.info(f"Authentication request. DEBUG_MODE: {DEBUG_MODE}, initData length: {len(init_data)}")
-        logger.info(f"Received initData first 50 chars: {init_data[:50]}...")
+        logger.debug(f"Received initData first 50 chars: {init_data[:50]}...")
         
-        # Если DEBUG_MODE включен ИЛИ передан параметр createNewUser, создаем уникального тестового пользователя
+        # Тестовые пользователи (createNewUser или общий тестовый) только при явно включенном DEBUG_MODE
         create_new = body.get('createNewUser', False)
         
-        if DEBUG_MODE or create_new:
-            logger.info("Creating test user (DEBUG_MODE or createNewUser=true)")
+        if DEBUG_MODE:
+            logger.info("Creating test user (DEBUG_MODE)")
             
             if create_new:
                 # Создаем нового уникального пользователя
-                import time
                 import random
                 timestamp = int(time.time())
                 random_id = random.randint(1000, 9999)
@@ -183,42 +284,32 @@ async def authenticate_user(request: Request, db: Session = Depends(get_db)):
                 db.commit()
                 db.refresh(new_user)
                 logger.info(f"Created new test user with telegram_id: {unique_telegram_id}")
-                return new_user
-            elif DEBUG_MODE:
-                # Возвращаем существующего тестового пользователя только в DEBUG_MODE
-                test_user = db.query(User).filter(User.telegram_id == 12345).first()
-                
-                if not test_user:
-                    test_user = User(
-                        telegram_id=12345,
-                        name="Test User (Default)",
-                        avatar_url="https://via.placeholder.com/100",
-                        bio="This is the default test user for development"
-                    )
-                    db.add(test_user)
-                    db.commit()
-                    db.refresh(test_user)
-                
-                return test_user
-        
-        # В production режиме обязательно создаем реального пользователя
-        # Если initData пустой, создаем случайного пользователя
-        if not init_data:
-            logger.warning("Empty initData received in production mode, creating random user")
-            # Создаем уникального пользователя с timestamp
-            import time
-            timestamp = int(time.time())
-            random_user = User(
-                telegram_id=timestamp,  # Используем timestamp как ID
-                name=f"User_{timestamp}",
+                return session_response(new_user)
+            
+            # Возвращаем существующего тестового пользователя
+            test_user = upsert_user(
+                db,
+                telegram_id=12345,
+                name="Test User (Default)",
                 avatar_url="https://via.placeholder.com/100",
-                bio="User created without initData"
+                bio="This is the default test user for development"
             )
-            db.add(random_user)
+            response = session_response(test_user)
             db.commit()
-            db.refresh(random_user)
-            logger.info(f"Created random user with ID: {random_user.telegram_id}")
-            return random_user
+            
+            return response
+        
+        # Вне DEBUG_MODE сессию выдаем только по initData с верной подписью Telegram
+        if not init_data:
+            logger.warning("Empty initData received, refusing to sign in")
+            raise auth_failed("Telegram initData is required")
+        
+        # The Mini App sends the same initData on every open; skip parsing and verification for repeats
+        cached_auth = verified_init_data.get(init_data)
+        if cached_auth is not None:
+            user = db.query(User).filter(User.telegram_id == cached_auth.id).first()
+            if user:
+                return session_response(user)
         
         # Парсим initData
         logger.info("Attempting to parse initData...")
@@ -226,20 +317,7 @@ async def authenticate_user(request: Request, db: Session = Depends(get_db)):
         
         if not auth_data_dict or not auth_data_dict.get('id'):
             logger.error(f"Failed to parse initData or no user ID found. Parsed data: {auth_data_dict}")
-            # Создаем пользователя с данными из raw initData если возможно
-            import time
-            timestamp = int(time.time())
-            fallback_user = User(
-                telegram_id=timestamp + 1000,  # Добавляем 1000 чтобы не конфликтовать
-                name=f"ParsedUser_{timestamp}",
-                avatar_url="https://via.placeholder.com/100",
-                bio="User created from unparseable initData"
-            )
-            db.add(fallback_user)
-            db.commit()
-            db.refresh(fallback_user)
-            logger.info(f"Created fallback user with ID: {fallback_user.telegram_id}")
-            return fallback_user
+            raise auth_failed("Malformed initData")
         
         # Создаем объект TelegramAuth из распарсенных данных
         try:
@@ -247,67 +325,40 @@ async def authenticate_user(request: Request, db: Session = Depends(get_db)):
             logger.info(f"Successfully created TelegramAuth object for user {auth_data.id} ({auth_data.first_name})")
         except Exception as e:
             logger.error(f"Failed to create TelegramAuth object: {str(e)}")
-            # Попробуем создать пользователя с минимальными данными
-            user_id = auth_data_dict.get('id', int(time.time()))
-            user_name = auth_data_dict.get('first_name', f"User_{user_id}")
-            
-            minimal_user = User(
-                telegram_id=user_id,
-                name=user_name,
-                avatar_url="https://via.placeholder.com/100",
-                bio="User created with minimal data"
-            )
-            db.add(minimal_user)
-            db.commit()
-            db.refresh(minimal_user)
-            logger.info(f"Created minimal user with ID: {minimal_user.telegram_id}")
-            return minimal_user
+            raise auth_failed("Malformed initData")
         
-        # Проверяем аутентификацию (но не блокируем на ней)
+        # Проверяем подпись initData
         logger.info("Verifying Telegram authentication...")
-        auth_valid = verify_telegram_auth(auth_data)
+        auth_valid = verify_telegram_auth(init_data, auth_data)
         logger.info(f"Authentication verification result: {auth_valid}")
         
         if not auth_valid:
-            logger.warning("Telegram authentication failed, but creating user anyway")
-        
-        # Ищем пользователя в базе
-        logger.info(f"Looking for existing user with telegram_id: {auth_data.id}")
-        user = db.query(User).filter(User.telegram_id == auth_data.id).first()
+            logger.warning(f"Telegram authentication failed for telegram_id {auth_data.id}")
+            raise auth_failed("Invalid initData signature")
+        verified_init_data.put(init_data, auth_data)
         
-        # Если пользователя нет, создаем нового
-        if not user:
-            logger.info(f"Creating new user: {auth_data.first_name} (ID: {auth_data.id})")
-            user = User(
-                telegram_id=auth_data.id,
-                name=auth_data.first_name,
-                avatar_url=auth_data.photo_url
-            )
-            db.add(user)
-            db.commit()
-            db.refresh(user)
-            logger.info(f"Successfully created user with ID: {user.id}")
-        else:
-            logger.info(f"Found existing user: {user.name} (ID: {user.id})")
+        # Создаем пользователя или находим существующего одним запросом
+        user = upsert_user(
+            db,
+            telegram_id=auth_data.id,
+            name=auth_data.first_name,
+            avatar_url=auth_data.photo_url
+        )
+        response = session_response(user)
+        db.commit()
+        logger.info(f"Signed in user: {user.name} (ID: {user.id})")
         
-        return user
+        return response
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Unexpected authentication error: {str(e)}", exc_info=True)
-        # В крайнем случае создаем пользователя с timestamp
-        import time
-        timestamp = int(time.time())
-        error_user = User(
-            telegram_id=timestamp + 2000,  # Добавляем 2000 для отличия
-            name=f"ErrorUser_{timestamp}",
-            avatar_url="https://via.placeholder.com/100",
-            bio="User created due to error"
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Authentication failed"
         )
-        db.add(error_user)
-        db.commit()
-        db.refresh(error_user)
-        logger.info(f"Created error user with ID: {error_user.telegram_id}")
-        return error_user
 
 @router.get("/debug/environment")
 def debug_environment():
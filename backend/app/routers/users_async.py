@@ -0,0 +1,244 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response, Query
+from sqlalchemy import select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
+import random
+import time
+from typing import List, Optional
+import logging
+from app.database import get_async_db
+from app.models.models import User
+from app.schemas.schemas import UserCreate, UserResponse, UserUpdate, TelegramAuth, AuthResponse
+from app.services.feed import interest_index
+from app.services.interests import sync_user_interests, user_ids_with_interest
+from app.services.sessions import verified_init_data
+from app.services.users import UPSERT_ATTEMPTS, retryable_write_error, upsert_retry_delay, upsert_user_statement
+from app.services.http_cache import is_conditional, is_not_modified, not_modified, set_validators, user_validator_query, user_validators
+from app.services.cache import event_cache
+from app.services.serialization import json_response
+from app.routers.users import (
+    BOT_TOKEN, DEBUG_MODE, verify_telegram_auth, parse_init_data, session_response, auth_failed, parse_batch_ids,
+    in_request_order
+)
+import os
+
+# Async counterpart of app.routers.users, mounted instead of it when ASYNC_DB=true.
+# initData parsing and verification are CPU-only and shared with the sync router.
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/users",
+    tags=["users"]
+)
+
+async def add_user(db: AsyncSession, **fields) -> User:
+    user = User(**fields)
+    db.add(user)
+    await db.commit()
+    return user
+
+async def upsert_user(db: AsyncSession, **fields) -> User:
+    # Concurrent first logins contend for the SQLite write lock (or hit serialization
+    # failures on PostgreSQL); those are retried in a fresh transaction
+    for attempt in range(UPSERT_ATTEMPTS):
+        try:
+            statement, new_id = upsert_user_statement(db.bind.dialect.name, **fields)
+            result = await db.execute(statement, execution_options={"populate_existing": True})
+            user = result.scalar_one()
+            if user.id == new_id and user.interests:
+                # Mapper events don't fire for INSERT statements, so index the interests here
+                await db.run_sync(lambda session: sync_user_interests(session.connection(), user.id, user.interests))
+            await db.commit()
+            return user
+        except DBAPIError as e:
+            await db.rollback()
+            if attempt == UPSERT_ATTEMPTS - 1 or not retryable_write_error(e):
+                raise
+            logger.warning(f"Retrying user upsert after {str(e.orig)}")
+            await asyncio.sleep(upsert_retry_delay(attempt))
+
+async def user_not_modified(db: AsyncSession, request: Request, *criteria) -> Optional[Response]:
+    if not is_conditional(request):
+        return None
+    row = (await db.execute(user_validator_query(*criteria))).first()
+    if row:
+        etag, last_modified = user_validators(*row)
+        if is_not_modified(request, etag, last_modified):
+            return not_modified(etag, last_modified)
+    return None
+
+async def get_user_or_404(db: AsyncSession, user_id: str) -> User:
+    user = await db.get(User, user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"User with id {user_id} not found"
+        )
+    return user
+
+async def find_by_telegram_id(db: AsyncSession, telegram_id: int):
+    result = await db.execute(select(User).where(User.telegram_id == telegram_id))
+    return result.scalars().first()
+
+@router.post("/", response_model=UserResponse)
+async def create_user(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    # Returns the existing user unchanged if the telegram_id is taken
+    return await upsert_user(
+        db,
+        telegram_id=user_data.telegram_id,
+        name=user_data.name,
+        avatar_url=user_data.avatar_url,
+        bio=user_data.bio,
+        interests=user_data.interests,
+        photos=user_data.photos
+    )
+
+@router.get("/by-interest", response_model=List[UserResponse])
+async def get_users_by_interest(interest: str, skip: int = 0, limit: int = Query(50, ge=1, le=200), db: AsyncSession = Depends(get_async_db)):
+    """Users who listed the interest, looked up through the user_interests index"""
+    result = await db.execute(
+        select(User).where(User.id.in_(user_ids_with_interest(interest))).order_by(User.created_at.desc()).offset(skip).limit(limit)
+    )
+    return json_response(List[UserResponse], result.scalars().all())
+
+@router.get("/batch", response_model=List[UserResponse])
+async def get_users_batch(ids: List[str] = Query([]), db: AsyncSession = Depends(get_async_db)):
+    """Several profiles in one query, e.g. everyone who responded to an event"""
+    ids = parse_batch_ids(ids)
+    result = await db.execute(select(User).where(User.id.in_(ids)))
+    return json_response(List[UserResponse], in_request_order(ids, result.scalars().all()))
+
+@router.get("/{user_id}", response_model=UserResponse)
+async def get_user(user_id: str, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    cached = await user_not_modified(db, request, User.id == user_id)
+    if cached:
+        return cached
+    user = await get_user_or_404(db, user_id)
+    set_validators(response, *user_validators(user.id, user.updated_at))
+    return user
+
+@router.get("/telegram/{telegram_id}", response_model=UserResponse)
+async def get_user_by_telegram_id(telegram_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    cached = await user_not_modified(db, request, User.telegram_id == telegram_id)
+    if cached:
+        return cached
+    user = await find_by_telegram_id(db, telegram_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"User with Telegram ID {telegram_id} not found"
+        )
+    set_validators(response, *user_validators(user.id, user.updated_at))
+    return user
+
+@router.put("/{user_id}", response_model=UserResponse)
+async def update_user(user_id: str, user_data: UserUpdate, db: AsyncSession = Depends(get_async_db)):
+    user = await get_user_or_404(db, user_id)
+
+    # Update fields
+    for key, value in user_data.dict(exclude_unset=True).items():
+        setattr(user, key, value)
+
+    await db.commit()
+    await db.refresh(user)
+
+    # Keep the feed's interest bitset in step with the profile
+    if "interests" in user_data.model_fields_set:
+        interest_index.refresh_user(user)
+
+    # Cached event pages embed the creator's profile
+    await event_cache.offload(event_cache.invalidate_all)
+
+    return user
+
+@router.post("/auth", response_model=AuthResponse)
+async def authenticate_user(request: Request, db: AsyncSession = Depends(get_async_db)):
+    # Same flow and fallbacks as app.routers.users.authenticate_user
+    try:
+        body = await request.json()
+        init_data = body.get('initData', '')
+
+        logger.info(f"Authentication request. DEBUG_MODE: {DEBUG_MODE}, initData length: {len(init_data)}")
+
+        create_new = body.get('createNewUser', False)
+
+        if DEBUG_MODE and create_new:
+            timestamp = int(time.time())
+            random_id = random.randint(1000, 9999)
+            new_user = await add_user(
+                db,
+                telegram_id=timestamp + random_id,
+                name=f"Test User {random_id}",
+                avatar_url="https://via.placeholder.com/100",
+                bio=f"Test user created at {timestamp}"
+            )
+            logger.info(f"Created new test user with telegram_id: {new_user.telegram_id}")
+            return session_response(new_user)
+
+        if DEBUG_MODE:
+            test_user = await upsert_user(
+                db,
+                telegram_id=12345,
+                name="Test User (Default)",
+                avatar_url="https://via.placeholder.com/100",
+                bio="This is the default test user for development"
+            )
+            return session_response(test_user)
+
+        if not init_data:
+            logger.warning("Empty initData received, refusing to sign in")
+            raise auth_failed("Telegram initData is required")
+
+        cached_auth = verified_init_data.get(init_data)
+        if cached_auth is not None:
+            user = await find_by_telegram_id(db, cached_auth.id)
+            if user:
+                return session_response(user)
+
+        auth_data_dict = parse_init_data(init_data)
+
+        if not auth_data_dict or not auth_data_dict.get('id'):
+            logger.error(f"Failed to parse initData or no user ID found. Parsed data: {auth_data_dict}")
+            raise auth_failed("Malformed initData")
+
+        try:
+            auth_data = TelegramAuth(**auth_data_dict)
+        except Exception as e:
+            logger.error(f"Failed to create TelegramAuth object: {str(e)}")
+            raise auth_failed("Malformed initData")
+
+        if not verify_telegram_auth(init_data, auth_data):
+            logger.warning(f"Telegram authentication failed for telegram_id {auth_data.id}")
+            raise auth_failed("Invalid initData signature")
+        verified_init_data.put(init_data, auth_data)
+
+        user = await upsert_user(
+            db,
+            telegram_id=auth_data.id,
+            name=auth_data.first_name,
+            avatar_url=auth_data.photo_url
+        )
+        return session_response(user)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected authentication error: {str(e)}", exc_info=True)
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Authentication failed"
+        )
+
+@router.get("/debug/environment")
+async def debug_environment():
+    """Временный endpoint для отладки переменных окружения"""
+    return {
+        "DEBUG_MODE": DEBUG_MODE,
+        "DEBUG_MODE_env": os.getenv("DEBUG_MODE", "not set"),
+        "BOT_TOKEN_exists": bool(BOT_TOKEN),
+        "ASYNC_DB": True,
+        "python_version": "3.x"
+    }
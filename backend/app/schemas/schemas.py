@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
 from typing import List, Optional, Union
 from datetime import datetime
+import datetime as dt
 
 class UserBase(BaseModel):
     name: str
@@ -24,6 +25,11 @@ class UserResponse(UserBase):
     class Config:
         from_attributes = True
 
+class AuthResponse(UserResponse):
+    # Send as "Authorization: Bearer <token>" until session_expires_at, then authenticate again
+    session_token: str
+    session_expires_at: datetime
+
 class EventBase(BaseModel):
     title: str
     description: str
@@ -31,6 +37,8 @@ class EventBase(BaseModel):
     datetime: datetime
     type: str = "custom"
     is_open: bool = True
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
 
 class EventCreate(EventBase):
     pass
@@ -39,20 +47,35 @@ class EventUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
     location: Optional[str] = None
-    datetime: Optional[datetime] = None
+    # The field shadows the datetime type inside the class body, so name it through the module
+    datetime: Optional[dt.datetime] = None
     is_open: Optional[bool] = None
     type: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
 
 class EventResponse(EventBase):
     id: str
     creator_id: str
     created_at: datetime
     updated_at: datetime
+    pending_count: int = 0
+    accepted_count: int = 0
     creator: Optional[UserResponse] = None
     
     class Config:
         from_attributes = True
 
+class NearbyEventResponse(EventResponse):
+    distance_km: float
+
+class FeedEventResponse(EventResponse):
+    score: float
+
+class LocationSuggestion(BaseModel):
+    name: str
+    event_count: int
+
 class EventResponseBase(BaseModel):
     event_id: str
     status: str = "pending"
@@ -72,6 +95,37 @@ class EventResponseOut(EventResponseBase):
     class Config:
         from_attributes = True
 
+class RespondentCard(BaseModel):
+    """A response with just enough of the respondent to list it"""
+    id: str
+    user_id: str
+    status: str
+    responded_at: datetime
+    name: str
+    avatar_url: Optional[str] = None
+    
+    class Config:
+        from_attributes = True
+
+class ResponseDecision(BaseModel):
+    id: str
+    status: str
+
+class EventResponseBatchUpdate(BaseModel):
+    # Every response must belong to this event
+    event_id: str
+    decisions: List[ResponseDecision] = Field(..., min_length=1, max_length=200)
+
+class ResponseDecisionResult(BaseModel):
+    id: str
+    # "updated", "unchanged", "not_found", or "conflict" when another request changed it first
+    result: str
+    status: Optional[str] = None
+
+class EventResponseBatchResult(BaseModel):
+    event_id: str
+    results: List[ResponseDecisionResult]
+
 class BadgeBase(BaseModel):
     user_id: str
     badge_type: str
@@ -0,0 +1,294 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+from app.services.http_cache import is_not_modified, not_modified, validator_headers
+
+logger = logging.getLogger(__name__)
+
+# Read-through cache for GET /events/ (first page, type/open filters only) and GET /events/{id}
+EVENT_CACHE = os.getenv("EVENT_CACHE", "true").lower() in ("true", "1", "t")
+EVENT_CACHE_TTL = float(os.getenv("EVENT_CACHE_TTL", "15"))
+EVENT_CACHE_SIZE = int(os.getenv("EVENT_CACHE_SIZE", "1024"))
+# Shares the cache between workers; without it each worker caches on its own and
+# writes handled by another worker show up once the TTL runs out
+EVENT_CACHE_REDIS_URL = os.getenv("EVENT_CACHE_REDIS_URL")
+
+class CachedPage(NamedTuple):
+    """A serialized response body with the validators it was sent with"""
+    body: bytes
+    etag: str
+    last_modified: Optional[datetime]
+    # Lists revalidate by ETag only, see is_not_modified
+    is_list: bool = False
+    next_cursor: Optional[str] = None
+
+    def dumps(self) -> bytes:
+        meta = {
+            "etag": self.etag,
+            "last_modified": self.last_modified.isoformat() if self.last_modified else None,
+            "is_list": self.is_list,
+            "next_cursor": self.next_cursor,
+        }
+        return json.dumps(meta).encode() + b"\n" + self.body
+
+    @classmethod
+    def loads(cls, data: bytes) -> "CachedPage":
+        meta, body = data.split(b"\n", 1)
+        meta = json.loads(meta)
+        last_modified = meta["last_modified"]
+        return cls(
+            body=body,
+            etag=meta["etag"],
+            last_modified=datetime.fromisoformat(last_modified) if last_modified else None,
+            is_list=meta["is_list"],
+            next_cursor=meta["next_cursor"],
+        )
+
+    def to_response(self, request: Request) -> Response:
+        if is_not_modified(request, self.etag, None if self.is_list else self.last_modified):
+            return not_modified(self.etag, self.last_modified)
+        headers = validator_headers(self.etag, self.last_modified)
+        if self.next_cursor:
+            headers["X-Next-Cursor"] = self.next_cursor
+        return Response(content=self.body, media_type="application/json", headers=headers)
+
+class LocalBackend:
+    """Bounded LRU with per-entry expiry, private to this process"""
+
+    name = "local"
+    # In-process and lock-protected only: cheap enough to call on the event loop
+    blocking = False
+
+    def __init__(self, max_entries: int = EVENT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._versions: Dict[str, Tuple[int, float]] = {}
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def versions(self, names: List[str]) -> List[int]:
+        with self._lock:
+            return [self._versions.get(name, (0, 0.0))[0] for name in names]
+
+    def bump(self, names: Iterable[str], keep_for: float):
+        now = time.monotonic()
+        with self._lock:
+            for name in names:
+                self._versions[name] = (self._versions.get(name, (0, 0.0))[0] + 1, now)
+            # A version can be forgotten once every entry keyed by an older one has expired
+            if len(self._versions) > self.max_entries * 4:
+                self._versions = {
+                    name: version for name, version in self._versions.items() if version[1] > now - keep_for
+                }
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "max_entries": self.max_entries, "evictions": self.evictions}
+
+class RedisBackend:
+    """Stores entries and versions in Redis (or anything speaking its protocol), shared by all workers.
+
+    Takes a redis-py style client, so tests can hand in a stand-in. Redis
+    errors are logged and treated as misses; the database stays the source of truth.
+    Calls block on the network, so async code goes through EventCache.offload.
+    """
+
+    name = "redis"
+    blocking = True
+
+    def __init__(self, client, prefix: str = "linkup:"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisBackend":
+        import redis
+        return cls(redis.Redis.from_url(url, socket_timeout=0.25, socket_connect_timeout=0.25))
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes, ttl: float):
+        self.client.set(self.prefix + key, value, px=int(ttl * 1000))
+
+    def versions(self, names: List[str]) -> List[int]:
+        return [int(value or 0) for value in self.client.mget([self.prefix + name for name in names])]
+
+    def bump(self, names: Iterable[str], keep_for: float):
+        pipe = self.client.pipeline()
+        for name in names:
+            pipe.incr(self.prefix + name)
+            pipe.pexpire(self.prefix + name, int(keep_for * 1000))
+        pipe.execute()
+
+    def stats(self) -> dict:
+        try:
+            return {"evictions": self.client.info("stats").get("evicted_keys")}
+        except Exception:
+            return {}
+
+class EventCache:
+    """Serialized event pages keyed by version counters.
+
+    Every key embeds the current version of what it depends on: a global
+    version, plus the event's own version or the version of the list's filter
+    group. Writes bump those versions instead of deleting keys, so a request
+    that read the database before a write can only store its result under the
+    old, now unreachable key.
+    """
+
+    def __init__(self, backend, ttl: float = EVENT_CACHE_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self.counters = {"hits": 0, "misses": 0, "stores": 0, "invalidations": 0, "errors": 0}
+
+    def _versions(self, names: List[str]) -> Optional[List[int]]:
+        try:
+            return self.backend.versions(names)
+        except Exception as e:
+            self._error("read versions", e)
+            return None
+
+    def _error(self, action: str, error: Exception):
+        self.counters["errors"] += 1
+        logger.warning(f"Event cache could not {action}: {str(error)}")
+
+    @staticmethod
+    def _group(event_type: Optional[str], is_open: Optional[bool]) -> str:
+        return f"events:group:{event_type or '*'}:{'*' if is_open is None else int(is_open)}"
+
+    def list_key(self, skip, limit, event_type, location, interest, is_open, cursor, variant: str = "") -> Optional[str]:
+        """Key for a GET /events/ page, or None when it isn't cached.
+
+        Only first pages filtered by type and/or open state are cached: those are
+        the hot combinations, and a location or interest search would mostly
+        fill the cache with entries nobody asks for again. variant tells
+        representations of the same page apart (sparse fieldsets).
+        """
+        if skip or cursor or location or interest:
+            return None
+        versions = self._versions(["events:all", self._group(event_type, is_open)])
+        if versions is None:
+            return None
+        return f"events:list:{versions[0]}.{versions[1]}:{event_type or '*'}:{is_open}:{limit}:{variant}"
+
+    def event_key(self, event_id: str, variant: str = "") -> Optional[str]:
+        versions = self._versions(["events:all", f"events:event:{event_id}"])
+        if versions is None:
+            return None
+        return f"events:event:{versions[0]}.{versions[1]}:{event_id}:{variant}"
+
+    def get(self, key: Optional[str]) -> Optional[CachedPage]:
+        if key is None:
+            return None
+        try:
+            data = self.backend.get(key)
+        except Exception as e:
+            self._error("read", e)
+            return None
+        if data is None:
+            self.counters["misses"] += 1
+            return None
+        self.counters["hits"] += 1
+        return CachedPage.loads(data)
+
+    def put(self, key: Optional[str], page: CachedPage):
+        if key is None:
+            return
+        try:
+            self.backend.set(key, page.dumps(), self.ttl)
+            self.counters["stores"] += 1
+        except Exception as e:
+            self._error("store", e)
+
+    def _bump(self, names: List[str]):
+        try:
+            # Versions outlive every entry keyed by them
+            self.backend.bump(names, self.ttl * 10)
+            self.counters["invalidations"] += 1
+        except Exception as e:
+            self._error("invalidate", e)
+
+    def invalidate_event(self, event_id, *states: Tuple[Optional[str], Optional[bool]]):
+        """Call after committing a change to an event.
+
+        states are the (type, is_open) values the event had before and after
+        the change; every list page that could contain it in either state is
+        invalidated along with the event itself.
+        """
+        names = {f"events:event:{event_id}"}
+        for event_type, is_open in states:
+            for type_filter in (None, event_type):
+                for open_filter in (None, is_open):
+                    names.add(self._group(type_filter, open_filter))
+        self._bump(sorted(names))
+
+    def invalidate_all(self):
+        """Call after changes that can touch any cached page, e.g. a creator's profile"""
+        self._bump(["events:all"])
+
+    async def offload(self, method, *args, **kwargs):
+        """Call one of this cache's methods from async code.
+
+        A backend that blocks on the network runs in the threadpool so a slow
+        Redis never stalls the event loop; the in-process LRU is called inline.
+        """
+        if getattr(self.backend, "blocking", False):
+            return await run_in_threadpool(method, *args, **kwargs)
+        return method(*args, **kwargs)
+
+    def stats(self) -> dict:
+        return {"backend": self.backend.name, "ttl": self.ttl, **self.counters, **self.backend.stats()}
+
+class DisabledCache(EventCache):
+    """Stand-in when EVENT_CACHE is off: never stores, never hits"""
+
+    def __init__(self):
+        super().__init__(backend=None, ttl=0)
+
+    def _versions(self, names):
+        return None
+
+    def _bump(self, names):
+        pass
+
+    def stats(self) -> dict:
+        return {"backend": None}
+
+def create_event_cache() -> EventCache:
+    if not EVENT_CACHE:
+        return DisabledCache()
+    if EVENT_CACHE_REDIS_URL:
+        try:
+            return EventCache(RedisBackend.from_url(EVENT_CACHE_REDIS_URL))
+        except ImportError:
+            logger.warning("EVENT_CACHE_REDIS_URL is set but the redis package is not installed; caching per process")
+    return EventCache(LocalBackend())
+
+event_cache = create_event_cache()
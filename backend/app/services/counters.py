@@ -0,0 +1,68 @@
+from typing import Dict, Iterable, Optional, Tuple
+from sqlalchemy import case, func, select, update
+from app.models.models import Event, EventResponse
+
+# Event.pending_count / Event.accepted_count, kept in the same transaction as the
+# response writes that move them. Other statuses (rejected) aren't counted.
+
+COUNTER_COLUMNS = {"pending": "pending_count", "accepted": "accepted_count"}
+
+def status_deltas(transitions: Iterable[Tuple[Optional[str], Optional[str]]]) -> Dict[str, int]:
+    """Counter changes for (old status, new status) pairs; None for a created or deleted response"""
+    deltas: Dict[str, int] = {}
+    for old_status, new_status in transitions:
+        if old_status in COUNTER_COLUMNS:
+            deltas[COUNTER_COLUMNS[old_status]] = deltas.get(COUNTER_COLUMNS[old_status], 0) - 1
+        if new_status in COUNTER_COLUMNS:
+            deltas[COUNTER_COLUMNS[new_status]] = deltas.get(COUNTER_COLUMNS[new_status], 0) + 1
+    return {column: delta for column, delta in deltas.items() if delta}
+
+def event_counters_update(event_id, transitions):
+    """One UPDATE applying the transitions to the event's counters, or None if nothing changes.
+
+    Increments happen in SQL, so concurrent responses to the same event don't
+    overwrite each other. updated_at moves too (onupdate), which changes the
+    event's ETag and Last-Modified along with the counts they describe.
+    """
+    deltas = status_deltas(transitions)
+    if not deltas:
+        return None
+    return (
+        update(Event)
+        .where(Event.id == event_id)
+        .values({column: getattr(Event, column) + delta for column, delta in deltas.items()})
+        .execution_options(synchronize_session=False)
+    )
+
+def counted_responses_query():
+    """Actual counts per event that has responses, in one GROUP BY"""
+    return (
+        select(
+            EventResponse.event_id,
+            func.sum(case((EventResponse.status == "pending", 1), else_=0)).label("pending_count"),
+            func.sum(case((EventResponse.status == "accepted", 1), else_=0)).label("accepted_count"),
+        )
+        .group_by(EventResponse.event_id)
+    )
+
+def drifted_counters_query():
+    """(id, pending_count, accepted_count) with the correct values, for events whose stored counters are wrong"""
+    counted = counted_responses_query().subquery()
+    pending = func.coalesce(counted.c.pending_count, 0)
+    accepted = func.coalesce(counted.c.accepted_count, 0)
+    return (
+        select(Event.id, pending.label("pending_count"), accepted.label("accepted_count"))
+        .outerjoin(counted, counted.c.event_id == Event.id)
+        .where((Event.pending_count != pending) | (Event.accepted_count != accepted))
+    )
+
+def repair_event_counters(db) -> int:
+    """Recompute every event's counters from event_responses; returns how many events were fixed.
+
+    One GROUP BY finds the drifted events and one executemany UPDATE fixes
+    them. Call with a Session; the caller commits.
+    """
+    rows = [dict(row._mapping) for row in db.execute(drifted_counters_query())]
+    if rows:
+        db.execute(update(Event), rows)
+    return len(rows)
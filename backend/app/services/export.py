@@ -0,0 +1,119 @@
+import csv
+import io
+import json
+import os
+import zlib
+from datetime import datetime
+from typing import AsyncIterator, Iterator, List
+from uuid import UUID
+from sqlalchemy import select
+from app.models.models import Event, EventResponse, User, USE_SQLITE
+
+# Rows fetched per round trip (server-side cursor on PostgreSQL) and encoded per chunk,
+# so an export holds one batch in memory whatever the table size
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+EXPORT_TABLES = {
+    "events": Event.__table__,
+    "responses": EventResponse.__table__,
+    "users": User.__table__,
+}
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# JSON text on SQLite, arrays on PostgreSQL; exported as lists either way
+JSON_LIST_COLUMNS = {"interests", "photos"}
+
+def export_query(table):
+    """Every row of the table in primary key order, so the walk follows the index"""
+    return select(table).order_by(*table.primary_key.columns)
+
+class RowEncoder:
+    """Turns batches of rows into NDJSON lines or CSV records"""
+
+    def __init__(self, export_format: str, columns: List[str]):
+        self.format = export_format
+        self.columns = columns
+        self.json_lists = [i for i, name in enumerate(columns) if USE_SQLITE and name in JSON_LIST_COLUMNS]
+
+    def _values(self, row) -> list:
+        values = [
+            value.isoformat() if isinstance(value, datetime) else str(value) if isinstance(value, UUID) else value
+            for value in row
+        ]
+        for i in self.json_lists:
+            try:
+                values[i] = json.loads(values[i]) if values[i] else []
+            except json.JSONDecodeError:
+                values[i] = []
+        return values
+
+    def _csv(self, records) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(records)
+        return buffer.getvalue().encode("utf-8")
+
+    def header(self) -> bytes:
+        return self._csv([self.columns]) if self.format == "csv" else b""
+
+    def encode(self, rows) -> bytes:
+        if self.format == "csv":
+            return self._csv(
+                [json.dumps(value, ensure_ascii=False) if isinstance(value, list) else value for value in self._values(row)]
+                for row in rows
+            )
+        return "".join(
+            json.dumps(dict(zip(self.columns, self._values(row))), ensure_ascii=False, separators=(",", ":")) + "\n"
+            for row in rows
+        ).encode("utf-8")
+
+class _Output:
+    """Optional on-the-fly gzip of the encoded chunks"""
+
+    def __init__(self, gzip: bool):
+        self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip else None
+
+    def write(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) if self._compressor else data
+
+    def close(self) -> bytes:
+        return self._compressor.flush() if self._compressor else b""
+
+def export_chunks(engine, table_name: str, export_format: str, gzip: bool = False,
+                  batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[bytes]:
+    """Stream a table as NDJSON or CSV bytes, one chunk per batch of rows, on its own connection"""
+    out = _Output(gzip)
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(
+            export_query(EXPORT_TABLES[table_name])
+        )
+        encoder = RowEncoder(export_format, list(result.keys()))
+        chunk = out.write(encoder.header())
+        if chunk:
+            yield chunk
+        for rows in result.partitions():
+            chunk = out.write(encoder.encode(rows))
+            if chunk:
+                yield chunk
+    chunk = out.close()
+    if chunk:
+        yield chunk
+
+async def export_chunks_async(async_engine, table_name: str, export_format: str, gzip: bool = False,
+                              batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[bytes]:
+    """export_chunks() over an AsyncEngine"""
+    out = _Output(gzip)
+    async with async_engine.connect() as conn:
+        result = await conn.stream(
+            export_query(EXPORT_TABLES[table_name]).execution_options(yield_per=batch_size)
+        )
+        encoder = RowEncoder(export_format, list(result.keys()))
+        chunk = out.write(encoder.header())
+        if chunk:
+            yield chunk
+        async for rows in result.partitions():
+            chunk = out.write(encoder.encode(rows))
+            if chunk:
+                yield chunk
+    chunk = out.close()
+    if chunk:
+        yield chunk
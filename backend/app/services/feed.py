@@ -0,0 +1,211 @@
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import joinedload
+from app.models.models import Event, EventResponse
+from app.services.geo import EARTH_RADIUS_KM
+from app.services.interests import normalize_interest
+
+# How many upcoming events are scored per feed request
+FEED_CANDIDATES = int(os.getenv("FEED_CANDIDATES", "500"))
+# Users whose interest bitsets stay cached, least recently scored dropped first
+FEED_INDEX_USERS = int(os.getenv("FEED_INDEX_USERS", "50000"))
+# Distinct interests the index grows to before it starts over with the interests still in use
+FEED_INDEX_INTERESTS = int(os.getenv("FEED_INDEX_INTERESTS", "4096"))
+
+# Relative weight of each signal in the final score; every signal is scaled to 0..1
+FEED_WEIGHTS = {
+    "interests": 0.45,
+    "type": 0.2,
+    "recency": 0.2,
+    "distance": 0.15,
+}
+RECENCY_HALF_LIFE_HOURS = 72.0
+DISTANCE_SCALE_KM = 5.0
+
+# Number of set bits in every byte value, for popcounts over packed bitsets
+_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+class InterestIndex:
+    """Interest vocabulary plus a bitset of interests per user.
+
+    Each distinct interest gets a bit position the first time it is seen.
+    User bitsets are cached with the user's updated_at, so an entry refreshed by
+    update_user in one worker is simply re-encoded when another worker sees a
+    newer row. The cache keeps the max_users most recently scored users, which
+    lets deleted and inactive users fall out. Once the vocabulary passes
+    max_interests, the next scoring pass starts a fresh one. That pass
+    re-encodes only the users it needs, so interests nobody has any more lose
+    their bits.
+    """
+
+    def __init__(self, max_users: int = FEED_INDEX_USERS, max_interests: int = FEED_INDEX_INTERESTS):
+        self.max_users = max_users
+        self.max_interests = max_interests
+        self._lock = threading.RLock()
+        self._vocabulary: Dict[str, int] = {}
+        self._vectors: "OrderedDict[str, Tuple[Optional[datetime], int]]" = OrderedDict()
+
+    def encode(self, interests: Iterable[str]) -> int:
+        bits = 0
+        with self._lock:
+            for term in interests:
+                key = normalize_interest(term)
+                if not key:
+                    continue
+                position = self._vocabulary.get(key)
+                if position is None:
+                    position = self._vocabulary[key] = len(self._vocabulary)
+                bits |= 1 << position
+        return bits
+
+    def refresh_user(self, user) -> int:
+        """Re-encode a user's interests, e.g. right after update_user changed them"""
+        with self._lock:
+            vector = self.encode(user.interests)
+            key = str(user.id)
+            self._vectors[key] = (user.updated_at, vector)
+            self._vectors.move_to_end(key)
+            while len(self._vectors) > self.max_users:
+                self._vectors.popitem(last=False)
+            return vector
+
+    def vector_for(self, user) -> int:
+        with self._lock:
+            cached = self._vectors.get(str(user.id))
+            if cached is not None and cached[0] == user.updated_at:
+                self._vectors.move_to_end(str(user.id))
+                return cached[1]
+            return self.refresh_user(user)
+
+    def rebuild(self):
+        """Drop the vocabulary and every cached bitset; users are re-encoded as they are scored"""
+        with self._lock:
+            self._vocabulary.clear()
+            self._vectors.clear()
+
+    def bitsets(self, user, creators: List) -> Tuple[np.ndarray, np.ndarray]:
+        """The user's packed bitset and an (n, bytes) matrix with the bitset of each creator.
+
+        Every bitset in one call comes from the same vocabulary. Each distinct
+        creator is encoded once, and its row is repeated for its other events.
+        A missing creator (None) gets an empty row.
+        """
+        with self._lock:
+            if len(self._vocabulary) > self.max_interests:
+                self.rebuild()
+            # Row 0 is empty, row 1 is the user, then one row per distinct creator
+            vectors = [0, self.vector_for(user)]
+            rows: Dict[str, int] = {}
+            index = np.zeros(len(creators), dtype=np.intp)
+            for i, creator in enumerate(creators):
+                if creator is None:
+                    continue
+                row = rows.get(str(creator.id))
+                if row is None:
+                    row = rows[str(creator.id)] = len(vectors)
+                    vectors.append(self.vector_for(creator))
+                index[i] = row
+            width = max(1, (len(self._vocabulary) + 7) // 8)
+        packed = b"".join(vector.to_bytes(width, "little") for vector in vectors)
+        matrix = np.frombuffer(packed, dtype=np.uint8).reshape(len(vectors), width)
+        return matrix[1], matrix[index]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"interests": len(self._vocabulary), "users": len(self._vectors)}
+
+interest_index = InterestIndex()
+
+def feed_candidates_query(user_id: str, now: datetime):
+    """Open, upcoming events by other users that the user hasn't responded to, soonest first"""
+    responded = select(EventResponse.event_id).where(EventResponse.user_id == user_id)
+    return (
+        select(Event)
+        .options(joinedload(Event.creator))
+        .where(
+            Event.is_open == True,
+            Event.datetime >= now,
+            Event.creator_id != user_id,
+            Event.id.not_in(responded),
+        )
+        .order_by(Event.datetime)
+        .limit(FEED_CANDIDATES)
+    )
+
+def type_affinity_query(user_id: str):
+    """How often the user has responded to each event type"""
+    return (
+        select(Event.type, func.count())
+        .join(EventResponse, EventResponse.event_id == Event.id)
+        .where(EventResponse.user_id == user_id)
+        .group_by(Event.type)
+    )
+
+def _haversine_km(latitude: float, longitude: float, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    phi1 = np.radians(latitude)
+    phi2 = np.radians(latitudes)
+    dphi = phi2 - phi1
+    dlambda = np.radians(longitudes - longitude)
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+
+def score_events(
+    user,
+    events: List[Event],
+    type_counts: Iterable[Tuple[str, int]],
+    now: datetime,
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None,
+) -> np.ndarray:
+    """Score candidate events for a user in one pass of array operations"""
+    if not events:
+        return np.zeros(0)
+
+    # One pass over the candidates fills every per-event column. types is the share
+    # of the user's past responses that went to each event's type
+    type_counts = dict(type_counts)
+    total_responses = sum(type_counts.values()) or 1
+    count = len(events)
+    types = np.empty(count)
+    created = np.empty(count)
+    latitudes = np.empty(count)
+    longitudes = np.empty(count)
+    creators = []
+    for i, event in enumerate(events):
+        creators.append(event.creator)
+        types[i] = type_counts.get(event.type, 0) / total_responses
+        created[i] = (event.created_at or now).timestamp()
+        latitudes[i] = event.latitude if event.latitude is not None else np.nan
+        longitudes[i] = event.longitude if event.longitude is not None else np.nan
+
+    # Interest overlap between the user and each event's creator: popcount(user & creator)
+    user_bits, creator_bits = interest_index.bitsets(user, creators)
+    overlap = _POPCOUNT[creator_bits & user_bits].sum(axis=1, dtype=np.float64)
+    interests = overlap / max(int(_POPCOUNT[user_bits].sum()), 1)
+
+    # Newer events float up; score halves every RECENCY_HALF_LIFE_HOURS
+    age_hours = np.maximum(now.timestamp() - created, 0) / 3600
+    recency = np.power(0.5, age_hours / RECENCY_HALF_LIFE_HOURS)
+
+    scores = (
+        FEED_WEIGHTS["interests"] * interests
+        + FEED_WEIGHTS["type"] * types
+        + FEED_WEIGHTS["recency"] * recency
+    )
+
+    # Events without coordinates get no distance bonus
+    if latitude is not None and longitude is not None:
+        distance = np.exp(-_haversine_km(latitude, longitude, latitudes, longitudes) / DISTANCE_SCALE_KM)
+        scores = scores + FEED_WEIGHTS["distance"] * np.nan_to_num(distance, nan=0.0)
+
+    return scores
+
+def rank_events(events: List[Event], scores: np.ndarray, skip: int, limit: int) -> List[Tuple[Event, float]]:
+    """Highest score first; ties keep the soonest-first candidate order"""
+    order = np.argsort(-scores, kind="stable")[skip:skip + limit]
+    return [(events[i], float(scores[i])) for i in order]
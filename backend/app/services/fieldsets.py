@@ -0,0 +1,129 @@
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
+from fastapi import HTTPException, status
+from pydantic import ConfigDict, create_model
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, load_only
+from app.models.models import Event, EventResponse as EventResponseModel, User
+from app.schemas.schemas import EventResponse, EventResponseOut, UserResponse
+
+# Sparse fieldsets: ?fields=title,datetime,creator.name&embed=creator narrows both the
+# columns loaded (load_only) and the JSON sent. Without either parameter the full schema is served.
+
+class SparseResource(NamedTuple):
+    schema: type
+    model: type
+    # The embedded relationship and its schema, e.g. an event's creator
+    embed: str
+    embed_schema: type
+    embed_model: type
+    # Columns loaded whatever was asked for: ids, pagination keys and validators
+    always: Tuple[str, ...]
+    # Columns of the related row loaded even when it isn't embedded (validators)
+    embed_always: Tuple[str, ...] = ()
+
+EVENT_FIELDS = SparseResource(
+    EventResponse, Event, "creator", UserResponse, User,
+    always=("id", "created_at", "updated_at"),
+    embed_always=("id", "updated_at"),
+)
+RESPONSE_FIELDS = SparseResource(
+    EventResponseOut, EventResponseModel, "user", UserResponse, User,
+    always=("id", "responded_at"),
+)
+
+class Fieldset(NamedTuple):
+    # Top-level fields in schema order, without the embed
+    fields: Tuple[str, ...]
+    # Fields of the embedded object, or None when it isn't embedded
+    embed: Optional[Tuple[str, ...]]
+
+    @property
+    def key(self) -> str:
+        """Canonical form, for cache keys and ETags"""
+        embedded = "" if self.embed is None else "+" + ",".join(self.embed)
+        return ",".join(self.fields) + embedded
+
+def _bad_request(detail: str):
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+def _in_schema_order(schema, names) -> Tuple[str, ...]:
+    return tuple(name for name in schema.model_fields if name in names)
+
+def parse_fieldset(resource: SparseResource, fields: Optional[str], embed: Optional[str]) -> Optional[Fieldset]:
+    """The requested shape, or None for the full schema; 400 on unknown names.
+
+    fields lists top-level fields, and embed.field entries for the embedded
+    object (which imply embedding it). embed alone embeds the whole object.
+    id is always included.
+    """
+    if fields is None and embed is None:
+        return None
+    embeds = {name.strip() for name in (embed or "").split(",") if name.strip()}
+    if embeds - {resource.embed}:
+        raise _bad_request(f"Unknown embed: {', '.join(sorted(embeds - {resource.embed}))}; only {resource.embed} is supported")
+    top, nested = {"id"}, set()
+    requested = [name.strip() for name in (fields or "").split(",") if name.strip()]
+    prefix = resource.embed + "."
+    for name in requested:
+        if name.startswith(prefix):
+            nested.add(name[len(prefix):])
+        else:
+            top.add(name)
+    unknown = sorted(
+        [name for name in top if name not in resource.schema.model_fields or name == resource.embed]
+        + [prefix + name for name in nested if name not in resource.embed_schema.model_fields]
+    )
+    if unknown:
+        raise _bad_request(f"Unknown fields: {', '.join(unknown)}")
+    if not requested:
+        # embed only: every field
+        top = set(resource.schema.model_fields) - {resource.embed}
+    embedded = None
+    if nested or resource.embed in embeds:
+        nested = nested or set(resource.embed_schema.model_fields)
+        embedded = _in_schema_order(resource.embed_schema, nested | {"id"})
+    return Fieldset(_in_schema_order(resource.schema, top), embedded)
+
+def fieldset_key(fieldset: Optional[Fieldset]) -> str:
+    return "" if fieldset is None else fieldset.key
+
+def _columns(model, names):
+    """Mapped column attributes behind schema fields; JSON list fields live in "_"-prefixed columns"""
+    columns = inspect(model).column_attrs
+    return [
+        getattr(model, name if name in columns else "_" + name)
+        for name in names if name in columns or "_" + name in columns
+    ]
+
+def fieldset_options(resource: SparseResource, fieldset: Optional[Fieldset], loader=joinedload):
+    """Loader options for the query behind a response in this shape"""
+    relationship = getattr(resource.model, resource.embed)
+    if fieldset is None:
+        return [loader(relationship)]
+    options = [load_only(*_columns(resource.model, set(fieldset.fields) | set(resource.always)))]
+    embedded = set(fieldset.embed or ()) | set(resource.embed_always)
+    if embedded:
+        options.append(loader(relationship).load_only(*_columns(resource.embed_model, embedded)))
+    return options
+
+@lru_cache(maxsize=256)
+def _sparse_schema(schema, names: Tuple[str, ...], embed: Optional[str] = None, embed_schema=None) -> type:
+    definitions = {}
+    for name in names:
+        info = schema.model_fields[name]
+        definitions[name] = (info.annotation, info)
+    if embed_schema is not None:
+        definitions[embed] = (Optional[embed_schema], None)
+    return create_model(
+        f"{schema.__name__}Fields", __config__=ConfigDict(from_attributes=True), **definitions
+    )
+
+def fieldset_schema(resource: SparseResource, fieldset: Optional[Fieldset]) -> type:
+    """Response schema with only the requested fields, for render_json"""
+    if fieldset is None:
+        return resource.schema
+    embed_schema = None
+    if fieldset.embed is not None:
+        embed_schema = _sparse_schema(resource.embed_schema, fieldset.embed)
+    return _sparse_schema(resource.schema, fieldset.fields, resource.embed, embed_schema)
@@ -0,0 +1,126 @@
+import math
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import and_, event
+from app.models.models import Event
+
+# Events are bucketed into geohash cells of this precision (~4.9 x 4.9 km at the equator).
+# The (geohash, datetime) index then answers "these cells, this time window" with one seek per cell.
+GEOHASH_PRECISION = 5
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+EARTH_RADIUS_KM = 6371.0088
+
+def geohash_encode(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        rng, value = (lon_range, longitude) if even else (lat_range, latitude)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            rng[0] = mid
+        else:
+            bits <<= 1
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(chars)
+
+def cell_size_degrees(precision: int) -> Tuple[float, float]:
+    """(latitude span, longitude span) of one geohash cell"""
+    lon_bits = math.ceil(precision * 5 / 2)
+    lat_bits = math.floor(precision * 5 / 2)
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+def _axis_points(low: float, high: float, step: float) -> List[float]:
+    """Points from low to high no more than step apart, so every cell on the axis gets sampled"""
+    points = [low]
+    while points[-1] + step < high:
+        points.append(points[-1] + step)
+    points.append(high)
+    return points
+
+def bounding_box(latitude: float, longitude: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """(lat_low, lat_high, lon_low, lon_high) of the circle; longitudes may run past +-180"""
+    km_per_degree = math.pi * EARTH_RADIUS_KM / 180
+    dlat = radius_km / km_per_degree
+    lat_low = max(latitude - dlat, -90.0)
+    lat_high = min(latitude + dlat, 90.0)
+    widest = max(math.cos(math.radians(max(abs(lat_low), abs(lat_high)))), 1e-6)
+    dlon = min(radius_km / (km_per_degree * widest), 180.0)
+    return lat_low, lat_high, longitude - dlon, longitude + dlon
+
+def covering_cells(latitude: float, longitude: float, radius_km: float) -> List[str]:
+    """Geohash cells whose union covers the bounding box of the circle around the point"""
+    lat_low, lat_high, lon_low, lon_high = bounding_box(latitude, longitude, radius_km)
+    lat_span, lon_span = cell_size_degrees(GEOHASH_PRECISION)
+
+    cells = set()
+    for lat in _axis_points(lat_low, lat_high, lat_span):
+        for lon in _axis_points(lon_low, lon_high, lon_span):
+            cells.add(geohash_encode(lat, (lon + 180.0) % 360.0 - 180.0))
+    return sorted(cells)
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+def nearby_candidates_filter(
+    latitude: float,
+    longitude: float,
+    radius_km: float,
+    starts_after: datetime,
+    starts_before: Optional[datetime] = None,
+):
+    """WHERE clause selecting events in the covering cells, time window and bounding box.
+
+    Every column it touches is in ix_events_geohash_datetime, so candidates are
+    narrowed down inside the index; exact distance is checked afterwards in Python.
+    """
+    lat_low, lat_high, lon_low, lon_high = bounding_box(latitude, longitude, radius_km)
+    clauses = [
+        Event.geohash.in_(covering_cells(latitude, longitude, radius_km)),
+        Event.datetime >= starts_after,
+        Event.latitude.between(lat_low, lat_high),
+    ]
+    if starts_before is not None:
+        clauses.append(Event.datetime <= starts_before)
+    # Skip the longitude bound when the box wraps around the antimeridian
+    if lon_low >= -180.0 and lon_high <= 180.0:
+        clauses.append(Event.longitude.between(lon_low, lon_high))
+    return and_(*clauses)
+
+def nearby_candidates_columns():
+    """Columns needed to rank candidates; full events are only loaded for the winners"""
+    return Event.id, Event.latitude, Event.longitude
+
+def rank_by_distance(candidates, latitude: float, longitude: float, radius_km: float, limit: int) -> List[Tuple[str, float]]:
+    """Drop candidates outside the circle and return (event id, distance_km) pairs, nearest first"""
+    ranked = []
+    for event_id, event_latitude, event_longitude in candidates:
+        distance = haversine_km(latitude, longitude, event_latitude, event_longitude)
+        if distance <= radius_km:
+            ranked.append((event_id, distance))
+    ranked.sort(key=lambda pair: pair[1])
+    return ranked[:limit]
+
+# Keep the stored geohash in step with the coordinates on every ORM write
+
+@event.listens_for(Event, "before_insert")
+@event.listens_for(Event, "before_update")
+def _set_geohash(mapper, connection, target):
+    if target.latitude is not None and target.longitude is not None:
+        target.geohash = geohash_encode(target.latitude, target.longitude)
+    else:
+        target.geohash = None
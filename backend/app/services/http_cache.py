@@ -0,0 +1,107 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable, Optional
+from fastapi import Request, Response
+from sqlalchemy import select
+from app.models.models import Event, User
+
+# Conditional GET for the read endpoints. ETags are weak and derived from
+# updated_at values, so they can be checked with a narrow column query before
+# any ORM object is loaded or serialized.
+
+def compute_etag(*parts) -> str:
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()[:24]
+    return f'W/"{digest}"'
+
+def variant_etag(etag: str, variant: str) -> str:
+    """ETag of another representation of the same data, e.g. a sparse fieldset"""
+    return compute_etag(etag, variant) if variant else etag
+
+def is_conditional(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """If-None-Match (weak comparison) wins over If-Modified-Since, as in RFC 9110.
+
+    Lists pass no last_modified: a deleted item doesn't move the newest
+    updated_at, so only the ETag can tell.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        bare = etag.removeprefix("W/")
+        return any(tag.strip().removeprefix("W/") == bare for tag in if_none_match.split(","))
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return _as_utc(last_modified).replace(microsecond=0) <= since
+    return False
+
+def _as_utc(value: datetime) -> datetime:
+    # Stored timestamps are naive UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+def validator_headers(etag: str, last_modified: Optional[datetime] = None) -> dict:
+    # no-cache: browsers may keep the body but must revalidate before reusing it
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified:
+        headers["Last-Modified"] = format_datetime(_as_utc(last_modified), usegmt=True)
+    return headers
+
+def set_validators(response: Response, etag: str, last_modified: Optional[datetime] = None):
+    response.headers.update(validator_headers(etag, last_modified))
+
+def not_modified(etag: str, last_modified: Optional[datetime] = None) -> Response:
+    return Response(status_code=304, headers=validator_headers(etag, last_modified))
+
+def _latest(*values) -> Optional[datetime]:
+    present = [value for value in values if value is not None]
+    return max(present) if present else None
+
+# Events embed their creator, so both rows' updated_at go into the validators
+
+def event_validator_columns():
+    return (Event.id, Event.updated_at, User.updated_at)
+
+def event_validator_query(event_id):
+    return (
+        select(*event_validator_columns())
+        .outerjoin(User, User.id == Event.creator_id)
+        .where(Event.id == event_id)
+    )
+
+def event_validators(event_id, updated_at, creator_updated_at):
+    """(etag, last_modified) for one event, from a validator row or a loaded event"""
+    return (
+        compute_etag("event", event_id, updated_at, creator_updated_at),
+        _latest(updated_at, creator_updated_at),
+    )
+
+def loaded_event_validators(event: Event):
+    return event_validators(event.id, event.updated_at, event.creator.updated_at if event.creator else None)
+
+def event_list_validators(rows: Iterable):
+    """(etag, last_modified) for a page of (id, updated_at, creator_updated_at) rows.
+
+    Every item goes into the ETag, so a page changes when an item is added,
+    removed or edited, not only when the newest updated_at moves.
+    """
+    rows = list(rows)
+    etag = compute_etag("events", *(part for row in rows for part in row))
+    return etag, _latest(*(value for row in rows for value in row[1:]))
+
+def loaded_event_list_validators(events: Iterable[Event]):
+    return event_list_validators(
+        [(event.id, event.updated_at, event.creator.updated_at if event.creator else None) for event in events]
+    )
+
+def user_validators(user_id, updated_at):
+    return compute_etag("user", user_id, updated_at), updated_at
+
+def user_validator_query(*criteria):
+    return select(User.id, User.updated_at).where(*criteria)
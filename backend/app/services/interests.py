@@ -0,0 +1,85 @@
+import json
+import logging
+from typing import Iterable, List
+from sqlalchemy import event, inspect, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.models.models import Interest, User, UserInterest
+
+logger = logging.getLogger(__name__)
+
+def normalize_interest(term: str) -> str:
+    return " ".join((term or "").split()).lower()
+
+def normalize_interests(terms: Iterable[str]) -> List[str]:
+    """Distinct normalized names, in first-seen order"""
+    seen = {}
+    for term in terms or []:
+        key = normalize_interest(term)
+        if key:
+            seen.setdefault(key, None)
+    return list(seen)
+
+def _decode_interests(raw) -> List[str]:
+    # ARRAY on PostgreSQL, JSON text on SQLite
+    if isinstance(raw, list):
+        return raw
+    try:
+        value = json.loads(raw) if raw else []
+    except json.JSONDecodeError:
+        return []
+    return value if isinstance(value, list) else []
+
+def user_ids_with_interest(name: str):
+    """Subquery of ids of users who listed the interest, served by the user_interests primary key"""
+    return (
+        select(UserInterest.user_id)
+        .join(Interest, Interest.id == UserInterest.interest_id)
+        .where(Interest.name == normalize_interest(name))
+    )
+
+def _interest_ids(connection, names: List[str]) -> List[int]:
+    insert = sqlite_insert if connection.dialect.name == "sqlite" else pg_insert
+    connection.execute(
+        insert(Interest).on_conflict_do_nothing(index_elements=[Interest.name]),
+        [{"name": name} for name in names],
+    )
+    return list(connection.execute(select(Interest.id).where(Interest.name.in_(names))).scalars())
+
+def sync_user_interests(connection, user_id, interests: Iterable[str]):
+    """Replace a user's user_interests rows with the given interests"""
+    connection.execute(UserInterest.__table__.delete().where(UserInterest.user_id == user_id))
+    names = normalize_interests(interests)
+    if names:
+        connection.execute(UserInterest.__table__.insert(), [
+            {"interest_id": interest_id, "user_id": user_id}
+            for interest_id in _interest_ids(connection, names)
+        ])
+
+def backfill_user_interests(connection):
+    """One-off copy of interests stored on users rows into user_interests; run by migration 0002.
+
+    Does nothing once the join table has rows.
+    """
+    if connection.execute(select(UserInterest.user_id).limit(1)).first() is not None:
+        return
+    users = connection.execute(select(User.id, User._interests)).all()
+    migrated = 0
+    for user_id, raw in users:
+        interests = _decode_interests(raw)
+        if interests:
+            sync_user_interests(connection, user_id, interests)
+            migrated += 1
+    logger.info(f"Backfilled user_interests for {migrated} users")
+
+# Keep user_interests in step with ORM writes, in the same transaction as the user row
+
+@event.listens_for(User, "after_insert")
+def _interests_after_insert(mapper, connection, target):
+    if target.interests:
+        sync_user_interests(connection, target.id, target.interests)
+
+@event.listens_for(User, "after_update")
+def _interests_after_update(mapper, connection, target):
+    if inspect(target).attrs._interests.history.has_changes():
+        sync_user_interests(connection, target.id, target.interests)
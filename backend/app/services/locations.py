@@ -0,0 +1,168 @@
+import logging
+from sqlalchemy import and_, event, func, inspect, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.models.models import Event, EventLocation
+
+logger = logging.getLogger(__name__)
+
+# Set by setup_location_search() when the SQLite FTS5 trigram table is in place
+_sqlite_fts_ready = False
+
+# events has a string primary key, so its implicit rowid is not stable (VACUUM may renumber it).
+# events_location_fts_rows gives every event a permanent integer key, which is the FTS rowid.
+SQLITE_FTS_SETUP = [
+    """CREATE TABLE IF NOT EXISTS events_location_fts_rows (
+           rowid INTEGER PRIMARY KEY,
+           event_id VARCHAR(36) NOT NULL UNIQUE
+       )""",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS events_location_fts USING fts5(location, tokenize='trigram')""",
+    """CREATE TRIGGER IF NOT EXISTS events_location_fts_ai AFTER INSERT ON events BEGIN
+           INSERT INTO events_location_fts_rows(event_id) VALUES (new.id);
+           INSERT INTO events_location_fts(rowid, location)
+               SELECT rowid, new.location FROM events_location_fts_rows WHERE event_id = new.id;
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS events_location_fts_ad AFTER DELETE ON events BEGIN
+           DELETE FROM events_location_fts
+               WHERE rowid = (SELECT rowid FROM events_location_fts_rows WHERE event_id = old.id);
+           DELETE FROM events_location_fts_rows WHERE event_id = old.id;
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS events_location_fts_au AFTER UPDATE OF location ON events BEGIN
+           UPDATE events_location_fts SET location = new.location
+               WHERE rowid = (SELECT rowid FROM events_location_fts_rows WHERE event_id = new.id);
+       END""",
+]
+SQLITE_FTS_BACKFILL = [
+    "INSERT INTO events_location_fts_rows(event_id) SELECT id FROM events",
+    """INSERT INTO events_location_fts(rowid, location)
+       SELECT r.rowid, e.location FROM events_location_fts_rows r JOIN events e ON e.id = r.event_id""",
+]
+# The first version indexed events.rowid through an external-content table
+SQLITE_FTS_TEARDOWN = [
+    "DROP TRIGGER IF EXISTS events_location_fts_ai",
+    "DROP TRIGGER IF EXISTS events_location_fts_ad",
+    "DROP TRIGGER IF EXISTS events_location_fts_au",
+    "DROP TABLE IF EXISTS events_location_fts",
+    "DROP TABLE IF EXISTS events_location_fts_rows",
+]
+
+POSTGRES_TRGM_SETUP = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_events_location_trgm ON events USING gin (location gin_trgm_ops)",
+]
+
+def normalize_location(location: str) -> str:
+    """Key used to merge spellings that differ only by case or whitespace"""
+    return " ".join((location or "").split()).lower()
+
+def create_location_search(connection):
+    """Create the index structures behind substring location search; run by migrations 0002 and 0009.
+
+    PostgreSQL gets a pg_trgm GIN index, which serves ILIKE '%...%' directly.
+    SQLite gets an FTS5 trigram table kept in sync with events by triggers.
+    Without either, location_filter() falls back to a plain ILIKE scan.
+    """
+    if connection.dialect.name == "sqlite":
+        current = connection.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE name = 'events_location_fts_rows'"
+        )).first()
+        if current:
+            return
+        # Replace the rowid-keyed table of earlier versions, if any, and index existing events
+        for statement in SQLITE_FTS_TEARDOWN + SQLITE_FTS_SETUP + SQLITE_FTS_BACKFILL:
+            connection.execute(text(statement))
+    elif connection.dialect.name == "postgresql":
+        for statement in POSTGRES_TRGM_SETUP:
+            connection.execute(text(statement))
+
+def setup_location_search(engine):
+    """Use the SQLite FTS5 table for location filters if the migration managed to create it"""
+    global _sqlite_fts_ready
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.connect() as conn:
+        _sqlite_fts_ready = conn.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE name = 'events_location_fts_rows'"
+        )).first() is not None
+
+def location_filter(location: str):
+    """WHERE clause for a case-insensitive substring match on Event.location"""
+    # Trigrams need at least three characters to narrow anything down
+    if _sqlite_fts_ready and len(location) >= 3:
+        return text(
+            "events.id IN (SELECT r.event_id FROM events_location_fts f"
+            " JOIN events_location_fts_rows r ON r.rowid = f.rowid WHERE f.location LIKE :location_pattern)"
+        ).bindparams(location_pattern=f"%{location}%")
+    return Event.location.ilike(f"%{location}%")
+
+def location_suggestions_query(prefix: str, limit: int):
+    """Most popular distinct locations starting with prefix, served by the event_locations primary key"""
+    query = select(EventLocation.name, EventLocation.event_count).where(EventLocation.event_count > 0)
+    key = normalize_location(prefix)
+    if key:
+        # The range bounds let the primary key index do the work; startswith keeps it exact
+        upper = key[:-1] + chr(ord(key[-1]) + 1)
+        query = query.where(and_(
+            EventLocation.normalized >= key,
+            EventLocation.normalized < upper,
+            EventLocation.normalized.startswith(key, autoescape=True),
+        ))
+    return query.order_by(EventLocation.event_count.desc(), EventLocation.name).limit(limit)
+
+def _adjust_location_count(connection, location: str, delta: int):
+    key = normalize_location(location)
+    if not key:
+        return
+    insert = sqlite_insert if connection.dialect.name == "sqlite" else pg_insert
+    statement = insert(EventLocation).values(
+        normalized=key,
+        name=" ".join(location.split()),
+        event_count=max(delta, 0),
+    ).on_conflict_do_update(
+        index_elements=[EventLocation.normalized],
+        set_={"event_count": EventLocation.event_count + delta},
+    )
+    connection.execute(statement)
+
+def release_event_locations(connection, event_filter):
+    """Take the events matching event_filter out of the counts, before a bulk delete that bypasses the ORM hooks"""
+    rows = connection.execute(
+        select(Event.location, func.count()).where(event_filter).group_by(Event.location)
+    ).all()
+    for location, count in rows:
+        _adjust_location_count(connection, location, -count)
+
+def rebuild_location_stats(connection):
+    """Recompute event_locations from scratch, e.g. after bulk deletes that bypass the ORM"""
+    connection.execute(EventLocation.__table__.delete())
+    counts = {}
+    rows = connection.execute(select(Event.location, func.count()).group_by(Event.location))
+    for location, count in rows:
+        key = normalize_location(location)
+        if not key:
+            continue
+        name, total = counts.get(key, (" ".join(location.split()), 0))
+        counts[key] = (name, total + count)
+    if counts:
+        connection.execute(EventLocation.__table__.insert(), [
+            {"normalized": key, "name": name, "event_count": total}
+            for key, (name, total) in counts.items()
+        ])
+
+# Keep popularity counts in step with ORM writes, in the same transaction as the event itself
+
+@event.listens_for(Event, "after_insert")
+def _location_after_insert(mapper, connection, target):
+    _adjust_location_count(connection, target.location, 1)
+
+@event.listens_for(Event, "after_update")
+def _location_after_update(mapper, connection, target):
+    history = inspect(target).attrs.location.history
+    if history.has_changes():
+        for old in history.deleted:
+            _adjust_location_count(connection, old, -1)
+        _adjust_location_count(connection, target.location, 1)
+
+@event.listens_for(Event, "after_delete")
+def _location_after_delete(mapper, connection, target):
+    _adjust_location_count(connection, target.location, -1)
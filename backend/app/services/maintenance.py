@@ -0,0 +1,191 @@
+import logging
+import os
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+from sqlalchemy import DateTime, delete, insert, literal, select, update
+from app.database import LeaderLock, MAINTENANCE_LOCK_ID, SessionLocal
+from app.models.models import Event, EventArchive, EventReminder, EventResponse, EventResponseArchive, Notification
+from app.services.cache import event_cache
+from app.services.counters import repair_event_counters
+from app.services.locations import release_event_locations
+
+logger = logging.getLogger(__name__)
+
+# Periodic cleanup of the hot tables; every statement works on a whole set of rows
+MAINTENANCE = os.getenv("MAINTENANCE", "true").lower() in ("true", "1", "t")
+MAINTENANCE_INTERVAL = float(os.getenv("MAINTENANCE_INTERVAL", "3600"))
+# Events that started more than this many days ago move to events_archive; 0 keeps them in place
+EVENT_RETENTION_DAYS = int(os.getenv("EVENT_RETENTION_DAYS", "180"))
+# Events moved per transaction, so a large backlog never holds the write lock for long
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
+# Sent and failed notifications are kept this long for troubleshooting
+OUTBOX_RETENTION_DAYS = int(os.getenv("OUTBOX_RETENTION_DAYS", "14"))
+# Also recompute drifted response counters on every run (one GROUP BY over event_responses)
+MAINTENANCE_REPAIR_COUNTERS = os.getenv("MAINTENANCE_REPAIR_COUNTERS", "false").lower() in ("true", "1", "t")
+
+RUN_COUNTS = (
+    "closed_events",
+    "archived_events",
+    "archived_responses",
+    "purged_reminders",
+    "purged_notifications",
+    "repaired_counters",
+)
+
+def _archive_select(source, target, where, **extra):
+    """INSERT INTO target SELECT the columns both tables share FROM source WHERE ..."""
+    names = [column.name for column in target.__table__.columns if column.name in source.__table__.columns]
+    columns = [source.__table__.c[name] for name in names]
+    columns += [literal(value, DateTime()).label(name) for name, value in extra.items()]
+    return insert(target).from_select(names + list(extra), select(*columns).where(where))
+
+def close_past_events(db, now: datetime) -> int:
+    """Flip is_open off for every open event that has started; returns how many were closed"""
+    result = db.execute(
+        update(Event)
+        .where(Event.is_open == True, Event.datetime < now)
+        .values(is_open=False)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+def archive_events(db, cutoff: datetime, limit: int) -> Tuple[int, int]:
+    """Move up to limit events that started before cutoff, with their responses, to the archive tables.
+
+    Returns (events, responses) moved. Rows are copied with INSERT ... SELECT and
+    removed with one DELETE per table; the caller commits. Their reminder
+    records are past and go with purge_reminders().
+    """
+    ids = db.execute(
+        select(Event.id).where(Event.datetime < cutoff).order_by(Event.datetime).limit(limit)
+    ).scalars().all()
+    if not ids:
+        return 0, 0
+    in_batch = Event.id.in_(ids)
+    responses_in_batch = EventResponse.event_id.in_(ids)
+    db.execute(_archive_select(Event, EventArchive, in_batch, archived_at=datetime.utcnow()))
+    db.execute(_archive_select(EventResponse, EventResponseArchive, responses_in_batch))
+    responses = db.execute(
+        delete(EventResponse).where(responses_in_batch).execution_options(synchronize_session=False)
+    ).rowcount
+    # The ORM hook that maintains event_locations doesn't see bulk deletes
+    release_event_locations(db.connection(), in_batch)
+    db.execute(delete(Event).where(in_batch).execution_options(synchronize_session=False))
+    return len(ids), responses
+
+def purge_reminders(db, now: datetime) -> int:
+    """Forget queued-reminder records of events that have started; the scheduler never looks them up again"""
+    return db.execute(delete(EventReminder).where(EventReminder.event_datetime < now)).rowcount
+
+def purge_notifications(db, before: datetime) -> int:
+    """Delete sent and failed outbox rows created before the given time"""
+    return db.execute(
+        delete(Notification).where(Notification.status.in_(("sent", "failed")), Notification.created_at < before)
+    ).rowcount
+
+class MaintenanceJob:
+    """Closes past events, archives old ones and trims bookkeeping tables at a fixed interval.
+
+    Every worker process starts the job, but only the one holding the
+    maintenance lock runs it; the others check again each interval in case
+    the holder stops.
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        interval: float = MAINTENANCE_INTERVAL,
+        retention_days: int = EVENT_RETENTION_DAYS,
+        batch_size: int = ARCHIVE_BATCH_SIZE,
+        outbox_retention_days: int = OUTBOX_RETENTION_DAYS,
+        repair_counters: bool = MAINTENANCE_REPAIR_COUNTERS,
+        lock: Optional[LeaderLock] = None,
+    ):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self.outbox_retention_days = outbox_retention_days
+        self.repair_counters = repair_counters
+        self.lock = lock or LeaderLock("maintenance", MAINTENANCE_LOCK_ID)
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.last_run: Optional[dict] = None
+        self.totals: Dict[str, int] = dict.fromkeys(RUN_COUNTS, 0)
+
+    def run_once(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """One maintenance pass; returns how many rows each step touched"""
+        now = now or datetime.utcnow()
+        started = time.perf_counter()
+        counts = dict.fromkeys(RUN_COUNTS, 0)
+        with self.session_factory() as db:
+            counts["closed_events"] = close_past_events(db, now)
+            db.commit()
+            if self.retention_days > 0:
+                cutoff = now - timedelta(days=self.retention_days)
+                while True:
+                    events, responses = archive_events(db, cutoff, self.batch_size)
+                    db.commit()
+                    counts["archived_events"] += events
+                    counts["archived_responses"] += responses
+                    if events < self.batch_size:
+                        break
+            counts["purged_reminders"] = purge_reminders(db, now)
+            counts["purged_notifications"] = purge_notifications(
+                db, now - timedelta(days=self.outbox_retention_days)
+            )
+            if self.repair_counters:
+                counts["repaired_counters"] = repair_event_counters(db)
+            db.commit()
+        if counts["closed_events"] or counts["archived_events"] or counts["repaired_counters"]:
+            # Reaches the workers when they share the cache through Redis; local caches expire on their own
+            event_cache.invalidate_all()
+        duration_ms = round((time.perf_counter() - started) * 1000, 3)
+        with self._lock:
+            self.runs += 1
+            self.last_run = {"started_at": now.isoformat(), "duration_ms": duration_ms, **counts}
+            for name, count in counts.items():
+                self.totals[name] += count
+        logger.info(f"Maintenance run: {counts} in {duration_ms} ms")
+        return counts
+
+    def run(self):
+        """Run every interval until stop() while holding the maintenance lock"""
+        # Spread the first run of workers started together
+        self._stop.wait(random.uniform(0, min(self.interval, 60)))
+        while not self._stop.is_set():
+            try:
+                if self.lock.acquire():
+                    self.run_once()
+            except Exception as e:
+                logger.error(f"Maintenance error: {str(e)}", exc_info=True)
+            self._stop.wait(self.interval)
+        self.lock.release()
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": MAINTENANCE,
+                "interval": self.interval,
+                "retention_days": self.retention_days,
+                "runs": self.runs,
+                "last_run": self.last_run,
+                "totals": dict(self.totals),
+            }
+
+maintenance_job = MaintenanceJob()
+
+def start_maintenance() -> Optional[threading.Thread]:
+    """Run the maintenance job in a daemon thread, if enabled"""
+    if not MAINTENANCE:
+        return None
+    thread = threading.Thread(target=maintenance_job.run, name="maintenance", daemon=True)
+    thread.start()
+    return thread
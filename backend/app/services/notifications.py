@@ -0,0 +1,267 @@
+import logging
+import os
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, Optional
+from telebot.apihelper import ApiTelegramException
+from app.database import LeaderLock, OUTBOX_LOCK_ID, SessionLocal
+from sqlalchemy import select
+from app.models.models import EventResponse, Notification, User
+from app.services import telegram_bot
+
+logger = logging.getLogger(__name__)
+
+# Delivery worker settings
+OUTBOX_WORKER = os.getenv("OUTBOX_WORKER", "true").lower() in ("true", "1", "t")
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "50"))
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "2"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+# Retry delay doubles with every failed attempt, starting at OUTBOX_RETRY_BASE seconds
+OUTBOX_RETRY_BASE = float(os.getenv("OUTBOX_RETRY_BASE", "5"))
+OUTBOX_RETRY_MAX = float(os.getenv("OUTBOX_RETRY_MAX", "3600"))
+
+# Telegram allows about 30 messages per second overall and about one per second to the same chat
+TELEGRAM_GLOBAL_RATE = float(os.getenv("TELEGRAM_GLOBAL_RATE", "25"))
+TELEGRAM_CHAT_INTERVAL = float(os.getenv("TELEGRAM_CHAT_INTERVAL", "1"))
+
+# Queueing. These only add rows to the session; they are sent once the caller commits.
+
+def queue_notification(db, chat_id: int, kind: str, message):
+    text, button_text, button_url = message
+    db.add(Notification(
+        chat_id=chat_id,
+        kind=kind,
+        text=text,
+        button_text=button_text,
+        button_url=button_url
+    ))
+
+def queue_response_notification(db, creator, responder, event):
+    """Tell the creator that someone responded to their event"""
+    queue_notification(db, creator.telegram_id, "response", telegram_bot.response_message(
+        responder.name, event.title, str(event.id)
+    ))
+
+def queue_event_invitation(db, user, event):
+    """Tell a responder they were accepted"""
+    queue_notification(db, user.telegram_id, "invitation", telegram_bot.event_invitation_message(
+        event.title, str(event.id)
+    ))
+
+def event_invitation_rows(users, event):
+    """queue_event_invitation for many responders, as rows for one executemany INSERT of Notification.
+
+    Rows added one by one are flushed as one INSERT each, since the outbox id is autoincremented.
+    """
+    text, button_text, button_url = telegram_bot.event_invitation_message(event.title, str(event.id))
+    return [
+        {"chat_id": user.telegram_id, "kind": "invitation", "text": text, "button_text": button_text, "button_url": button_url}
+        for user in users
+    ]
+
+def accepted_chat_ids_query(event_id):
+    """Telegram chat ids of everyone accepted to the event"""
+    return (
+        select(User.telegram_id)
+        .join(EventResponse, EventResponse.user_id == User.id)
+        .where(EventResponse.event_id == event_id, EventResponse.status == "accepted")
+        .order_by(EventResponse.responded_at)
+    )
+
+def queue_event_updated(db, chat_ids: Iterable[int], event):
+    """Tell accepted participants that the event changed"""
+    message = telegram_bot.event_updated_message(event.title, str(event.id))
+    for chat_id in chat_ids:
+        queue_notification(db, chat_id, "event_updated", message)
+
+class RateLimiter:
+    """Global token bucket plus a minimum interval between messages to the same chat"""
+
+    def __init__(
+        self,
+        rate: float = TELEGRAM_GLOBAL_RATE,
+        chat_interval: float = TELEGRAM_CHAT_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.rate = rate
+        self.chat_interval = chat_interval
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = rate
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._last_sent: Dict[int, float] = {}
+
+    def chat_ready_in(self, chat_id: int) -> float:
+        """Seconds until the chat may receive another message"""
+        last = self._last_sent.get(chat_id)
+        if last is None:
+            return 0.0
+        return max(0.0, last + self.chat_interval - self._clock())
+
+    def acquire(self):
+        """Block until the global budget allows one more message"""
+        while True:
+            now = self._clock()
+            if now < self._paused_until:
+                self._sleep(self._paused_until - now)
+                continue
+            self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            self._sleep((1 - self._tokens) / self.rate)
+
+    def record(self, chat_id: int):
+        now = self._clock()
+        self._last_sent[chat_id] = now
+        # Forget chats that are ready again so the map stays small
+        if len(self._last_sent) > 10000:
+            cutoff = now - self.chat_interval
+            self._last_sent = {chat: sent for chat, sent in self._last_sent.items() if sent > cutoff}
+
+    def pause(self, seconds: float):
+        """Stop all sends for a while, e.g. after Telegram answered 429"""
+        self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+    def paused_for(self) -> float:
+        return max(0.0, self._paused_until - self._clock())
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with jitter, so failed messages don't retry in lockstep"""
+    delay = min(OUTBOX_RETRY_MAX, OUTBOX_RETRY_BASE * 2 ** max(attempts - 1, 0))
+    return delay * random.uniform(0.5, 1.0)
+
+class OutboxWorker:
+    """Delivers pending notification_outbox rows through the Bot API.
+
+    Each run claims up to OUTBOX_BATCH_SIZE due rows, sends them within the
+    rate limits and writes every outcome back in one commit. Delivery is
+    at-least-once: a crash between sending and committing resends the batch.
+
+    The limits are tracked in memory, so run() only sends while this process
+    holds the outbox LeaderLock; the worker threads of other uvicorn processes
+    stand by and take over if it goes away. Rows are still claimed FOR UPDATE
+    SKIP LOCKED, so a one-off run_once() can't send a row twice.
+    """
+
+    def __init__(
+        self,
+        send: Callable = telegram_bot.send_notification,
+        session_factory=SessionLocal,
+        limiter: Optional[RateLimiter] = None,
+        batch_size: int = OUTBOX_BATCH_SIZE,
+        lock: Optional[LeaderLock] = None,
+    ):
+        self.send = send
+        self.session_factory = session_factory
+        self.limiter = limiter or RateLimiter()
+        self.batch_size = batch_size
+        self.lock = lock or LeaderLock("outbox", OUTBOX_LOCK_ID)
+        self._stop = threading.Event()
+
+    def run_once(self) -> Dict[str, int]:
+        """Process one batch; returns how many rows were sent, retried, failed or deferred"""
+        counts = {"sent": 0, "retried": 0, "failed": 0, "deferred": 0}
+        now = datetime.utcnow()
+        with self.session_factory() as db:
+            rows = (
+                db.query(Notification)
+                .filter(Notification.status == "pending", Notification.next_attempt_at <= now)
+                .order_by(Notification.next_attempt_at, Notification.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+                .all()
+            )
+            for row in rows:
+                if self.limiter.paused_for() > 0:
+                    # Flood control kicked in; leave the rest due for the next run
+                    break
+                wait = self.limiter.chat_ready_in(row.chat_id)
+                if wait > 0:
+                    row.next_attempt_at = datetime.utcnow() + timedelta(seconds=wait)
+                    counts["deferred"] += 1
+                    continue
+                self.limiter.acquire()
+                counts[self._deliver(row)] += 1
+                self.limiter.record(row.chat_id)
+            db.commit()
+        return counts
+
+    def _deliver(self, row: Notification) -> str:
+        try:
+            self.send(row.chat_id, row.text, row.button_text, row.button_url)
+        except ApiTelegramException as e:
+            if e.error_code == 429:
+                # Flood control: wait as long as Telegram asks, without spending an attempt
+                retry_after = (e.result_json.get("parameters") or {}).get("retry_after", 1)
+                self.limiter.pause(retry_after)
+                row.next_attempt_at = datetime.utcnow() + timedelta(seconds=retry_after)
+                row.last_error = e.description
+                return "retried"
+            if e.error_code in (400, 403):
+                # Chat not found, bot blocked by the user, bad markup: retrying won't help
+                row.attempts += 1
+                return self._fail(row, e.description)
+            return self._retry(row, str(e))
+        except Exception as e:
+            return self._retry(row, str(e))
+        row.status = "sent"
+        row.attempts += 1
+        row.sent_at = datetime.utcnow()
+        row.last_error = None
+        return "sent"
+
+    def _retry(self, row: Notification, error: str) -> str:
+        row.attempts += 1
+        if row.attempts >= OUTBOX_MAX_ATTEMPTS:
+            return self._fail(row, error)
+        row.next_attempt_at = datetime.utcnow() + timedelta(seconds=retry_delay(row.attempts))
+        row.last_error = error
+        logger.warning(f"Notification {row.id} to chat {row.chat_id} failed, retry {row.attempts}: {error}")
+        return "retried"
+
+    def _fail(self, row: Notification, error: str) -> str:
+        row.status = "failed"
+        row.last_error = error
+        logger.error(f"Giving up on notification {row.id} to chat {row.chat_id}: {error}")
+        return "failed"
+
+    def run(self):
+        """Poll until stop() while holding the outbox lock; a full batch is followed straight away by the next one"""
+        while not self._stop.is_set():
+            try:
+                if not self.lock.acquire():
+                    # Another process is sending; check again later in case it stops
+                    self._stop.wait(OUTBOX_POLL_INTERVAL)
+                    continue
+                counts = self.run_once()
+            except Exception as e:
+                logger.error(f"Outbox worker error: {str(e)}", exc_info=True)
+                counts = {}
+            pause = self.limiter.paused_for()
+            if pause > 0:
+                self._stop.wait(pause)
+            elif sum(counts.values()) < self.batch_size:
+                self._stop.wait(OUTBOX_POLL_INTERVAL)
+        self.lock.release()
+
+    def stop(self):
+        self._stop.set()
+
+outbox_worker = OutboxWorker()
+
+def start_outbox_worker() -> Optional[threading.Thread]:
+    """Run the delivery worker in a daemon thread, if the bot is configured"""
+    if not OUTBOX_WORKER:
+        return None
+    if not telegram_bot.bot:
+        logger.warning("Outbox worker not started: Bot not initialized, notifications stay queued")
+        return None
+    thread = threading.Thread(target=outbox_worker.run, name="notification-outbox", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,205 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Server-sent events for the Web App: changes are published by the routers after
+# they commit and fanned out to the subscribed streams of this worker.
+REALTIME = os.getenv("REALTIME", "true").lower() in ("true", "1", "t")
+# Messages a subscriber may fall behind by before it is told to resync instead
+REALTIME_MAX_PENDING = int(os.getenv("REALTIME_MAX_PENDING", "64"))
+# Keeps proxies from closing idle streams
+REALTIME_HEARTBEAT = float(os.getenv("REALTIME_HEARTBEAT", "25"))
+# Relays messages between workers; without it a stream only sees changes made through its own worker
+REALTIME_REDIS_URL = os.getenv("REALTIME_REDIS_URL")
+
+FEED_TOPIC = "feed"
+
+def event_responses_topic(event_id) -> str:
+    """Responses to one event; only its creator may subscribe"""
+    return f"event:{event_id}:responses"
+
+def user_responses_topic(user_id) -> str:
+    """Status changes of the user's own responses"""
+    return f"user:{user_id}:responses"
+
+def sse_message(kind: str, data: dict) -> bytes:
+    return f"event: {kind}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
+
+RESYNC = sse_message("resync", {})
+
+class Subscription:
+    """One stream's pending messages.
+
+    Kept small for 10k idle subscribers per worker: slots, a plain list
+    rather than a deque, and a future that only exists while the stream waits.
+    """
+
+    __slots__ = ("topics", "max_pending", "lagged", "_pending", "_waiter")
+
+    def __init__(self, topics: Iterable[str], max_pending: int):
+        self.topics = tuple(topics)
+        self.max_pending = max_pending
+        self.lagged = False
+        self._pending: List[bytes] = []
+        self._waiter: Optional[asyncio.Future] = None
+
+    def push(self, chunk: bytes):
+        # Called on the event loop thread
+        if len(self._pending) >= self.max_pending:
+            # Too slow to keep up: drop the backlog and have the client refetch
+            self._pending.clear()
+            self.lagged = True
+        else:
+            self._pending.append(chunk)
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    async def next_chunk(self, timeout: float) -> Optional[bytes]:
+        """Everything pending as one chunk, or None if nothing arrived within timeout"""
+        if not self._pending and not self.lagged:
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await asyncio.wait_for(self._waiter, timeout)
+            except asyncio.TimeoutError:
+                return None
+            finally:
+                self._waiter = None
+        if self.lagged:
+            self.lagged = False
+            self._pending.clear()
+            return RESYNC
+        chunk = b"".join(self._pending)
+        self._pending.clear()
+        return chunk
+
+class InProcessHub:
+    """Topic fan-out to the streams of this worker.
+
+    publish() may be called from any thread (the sync routers run in the
+    threadpool); messages are encoded once and handed to the event loop, which
+    appends them to each subscriber of the topic. Subclasses replace
+    publish() to relay through a broker shared by all workers.
+    """
+
+    def __init__(self, max_pending: int = REALTIME_MAX_PENDING):
+        self.max_pending = max_pending
+        self._topics: Dict[str, Set[Subscription]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def subscribe(self, topics: Iterable[str]) -> Subscription:
+        """Call on the event loop"""
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(topics, self.max_pending)
+        for topic in subscription.topics:
+            self._topics.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        for topic in subscription.topics:
+            subscribers = self._topics.get(topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._topics[topic]
+
+    def publish(self, topic: str, kind: str, data: dict):
+        self.deliver(topic, sse_message(kind, data))
+
+    def deliver(self, topic: str, chunk: bytes):
+        """Hand an encoded message to this worker's subscribers"""
+        loop = self._loop
+        if loop is None or topic not in self._topics:
+            return
+        try:
+            loop.call_soon_threadsafe(self._dispatch, topic, chunk)
+        except RuntimeError:
+            # Loop closed during shutdown
+            pass
+
+    def _dispatch(self, topic: str, chunk: bytes):
+        for subscription in list(self._topics.get(topic, ())):
+            subscription.push(chunk)
+
+    def stats(self) -> dict:
+        return {
+            "topics": len(self._topics),
+            "subscriptions": sum(len(subscribers) for subscribers in self._topics.values()),
+        }
+
+class RedisHub(InProcessHub):
+    """Relays every message through a Redis channel, so streams on any worker receive it.
+
+    A listener thread feeds messages from the channel back into the
+    in-process fan-out; publish() only sends to Redis. Takes a redis-py style
+    client, so tests can hand in a stand-in.
+    """
+
+    def __init__(self, client, channel: str = "linkup:realtime", max_pending: int = REALTIME_MAX_PENDING):
+        super().__init__(max_pending)
+        self.client = client
+        self.channel = channel
+        self._listener: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisHub":
+        import redis
+        return cls(redis.Redis.from_url(url))
+
+    def publish(self, topic: str, kind: str, data: dict):
+        try:
+            self.client.publish(self.channel, topic.encode() + b"\n" + sse_message(kind, data))
+        except Exception as e:
+            logger.warning(f"Could not publish {kind} to {topic}: {str(e)}")
+
+    def start(self):
+        self._listener = threading.Thread(target=self._listen, name="realtime-relay", daemon=True)
+        self._listener.start()
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                for message in pubsub.listen():
+                    topic, chunk = message["data"].split(b"\n", 1)
+                    self.deliver(topic.decode(), chunk)
+            except Exception as e:
+                logger.error(f"Realtime relay lost Redis: {str(e)}; reconnecting", exc_info=True)
+                threading.Event().wait(5)
+
+def create_hub() -> InProcessHub:
+    if REALTIME_REDIS_URL:
+        try:
+            hub = RedisHub.from_url(REALTIME_REDIS_URL)
+            hub.start()
+            return hub
+        except ImportError:
+            logger.warning("REALTIME_REDIS_URL is set but the redis package is not installed; streaming per process")
+    return InProcessHub()
+
+hub = create_hub()
+
+# What the routers publish. Payloads are small: clients fetch the full objects they
+# need, and GET /events/{id} is cached.
+
+def publish_event_change(kind: str, event):
+    """kind is event_created, event_updated or event_deleted"""
+    if REALTIME:
+        hub.publish(FEED_TOPIC, kind, {
+            "id": str(event.id),
+            "type": event.type,
+            "is_open": event.is_open,
+            "updated_at": event.updated_at.isoformat() if event.updated_at else None,
+        })
+
+def publish_response_change(kind: str, response_id, event_id, user_id, status: str):
+    """kind is response_created or response_updated; goes to the event's creator and the responder"""
+    if REALTIME:
+        data = {"id": str(response_id), "event_id": str(event_id), "user_id": str(user_id), "status": status}
+        hub.publish(event_responses_topic(event_id), kind, data)
+        hub.publish(user_responses_topic(user_id), kind, data)
@@ -0,0 +1,184 @@
+import heapq
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.database import SessionLocal
+from app.models.models import Event, EventReminder
+from app.services import telegram_bot
+from app.services.notifications import accepted_chat_ids_query, queue_notification
+
+logger = logging.getLogger(__name__)
+
+REMINDERS = os.getenv("REMINDERS", "true").lower() in ("true", "1", "t")
+# Minutes before the start at which accepted participants are reminded, e.g. "1440,60"
+REMINDER_LEAD_MINUTES = sorted(
+    {int(value) for value in os.getenv("REMINDER_LEAD_MINUTES", "60").split(",") if value.strip()},
+    reverse=True,
+)
+# How far ahead reminders are loaded into memory at a time
+REMINDER_WINDOW_MINUTES = int(os.getenv("REMINDER_WINDOW_MINUTES", "60"))
+
+def reminder_times(event_datetime: datetime, now: datetime, leads: List[int]) -> List[Tuple[datetime, int]]:
+    """(fire_at, lead_minutes) pairs for an event that hasn't started yet.
+
+    Reminders whose time has already passed (event created or moved at short
+    notice, or the app was down) are dropped while a later one is still to
+    come; if none is, the shortest overdue lead time is sent right away.
+    """
+    if event_datetime <= now:
+        return []
+    times = []
+    overdue = None
+    for lead in sorted(leads, reverse=True):
+        fire_at = event_datetime - timedelta(minutes=lead)
+        if fire_at > now:
+            times.append((fire_at, lead))
+        else:
+            overdue = (now, lead)
+    return times or ([overdue] if overdue else [])
+
+class ReminderScheduler:
+    """Min-heap of the reminders due in the next REMINDER_WINDOW_MINUTES.
+
+    Each window is loaded with one range query on ix_events_datetime, so the
+    cost follows the number of upcoming reminders rather than the size of the
+    events table. Routers call schedule()/cancel() after committing; heap
+    entries are invalidated lazily by comparing against the event's current
+    start time. Before sending, the event is re-read and the reminder recorded
+    in event_reminders, so moved or deleted events are skipped and several
+    workers never queue the same reminder twice.
+    """
+
+    def __init__(self, leads: List[int] = REMINDER_LEAD_MINUTES, window_minutes: int = REMINDER_WINDOW_MINUTES, session_factory=SessionLocal):
+        self.leads = leads
+        self.window = timedelta(minutes=window_minutes)
+        self.session_factory = session_factory
+        self._lock = threading.Lock()
+        self._heap: List[Tuple[datetime, int, object, datetime]] = []
+        # Event id -> start time its heap entries were made for
+        self._scheduled: Dict[object, datetime] = {}
+        self._loaded_until: Optional[datetime] = None
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+
+    def _push(self, event_id, event_datetime: datetime, now: datetime, not_before: Optional[datetime] = None):
+        # Caller holds the lock
+        for fire_at, lead in reminder_times(event_datetime, now, self.leads):
+            if fire_at < self._loaded_until and (not_before is None or fire_at >= not_before):
+                heapq.heappush(self._heap, (fire_at, lead, event_id, event_datetime))
+                self._scheduled[event_id] = event_datetime
+
+    def schedule(self, event_id, event_datetime: datetime):
+        """Call after an event is created or its start time changes"""
+        # Stored start times are naive; match what fire() will read back
+        event_datetime = event_datetime.replace(tzinfo=None)
+        with self._lock:
+            # Drops entries made for the previous start time
+            self._scheduled.pop(event_id, None)
+            if self._loaded_until is None:
+                # Not running yet; the first window load will pick the event up
+                return
+            self._push(event_id, event_datetime, datetime.utcnow())
+        self._wakeup.set()
+
+    def cancel(self, event_id):
+        """Call after an event is deleted"""
+        with self._lock:
+            self._scheduled.pop(event_id, None)
+
+    def load_window(self, now: datetime):
+        """Load reminders due between the end of the previous window and now + window"""
+        with self._lock:
+            start = self._loaded_until
+        end = now + self.window
+        # First load also looks for overdue reminders of events that haven't started
+        lower = now if start is None else start + timedelta(minutes=min(self.leads))
+        upper = end + timedelta(minutes=max(self.leads))
+        with self.session_factory() as db:
+            rows = db.execute(
+                select(Event.id, Event.datetime)
+                .where(Event.datetime >= lower, Event.datetime < upper)
+                .order_by(Event.datetime)
+            ).all()
+        with self._lock:
+            self._loaded_until = end
+            # Forget events that have started; their last reminder is behind them
+            self._scheduled = {event_id: at for event_id, at in self._scheduled.items() if at > now}
+            for event_id, event_datetime in rows:
+                self._push(event_id, event_datetime, now, not_before=start)
+        logger.info(f"Loaded reminders for {len(rows)} events up to {end.isoformat()}")
+
+    def pop_due(self, now: datetime) -> List[Tuple[object, int, datetime]]:
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                _, lead, event_id, event_datetime = heapq.heappop(self._heap)
+                # Skip entries for events that were moved or deleted since
+                if self._scheduled.get(event_id) == event_datetime:
+                    due.append((event_id, lead, event_datetime))
+        return due
+
+    def fire(self, event_id, lead: int, event_datetime: datetime) -> int:
+        """Queue the reminder for every accepted participant; returns how many were queued"""
+        with self.session_factory() as db:
+            event = db.get(Event, event_id)
+            if not event or event.datetime != event_datetime:
+                # Moved or deleted through another worker
+                return 0
+            insert = sqlite_insert if db.bind.dialect.name == "sqlite" else pg_insert
+            result = db.execute(insert(EventReminder).values(
+                event_id=event.id,
+                lead_minutes=lead,
+                event_datetime=event_datetime,
+                queued_at=datetime.utcnow()
+            ).on_conflict_do_nothing())
+            if result.rowcount == 0:
+                # Already queued by another worker or before a restart
+                db.rollback()
+                return 0
+            message = telegram_bot.event_reminder_message(event.title, str(event.id))
+            chat_ids = db.execute(accepted_chat_ids_query(event.id)).scalars().all()
+            for chat_id in chat_ids:
+                queue_notification(db, chat_id, "reminder", message)
+            db.commit()
+        return len(chat_ids)
+
+    def run(self):
+        while not self._stop.is_set():
+            now = datetime.utcnow()
+            try:
+                if self._loaded_until is None or now >= self._loaded_until:
+                    self.load_window(now)
+                for event_id, lead, event_datetime in self.pop_due(now):
+                    self.fire(event_id, lead, event_datetime)
+            except Exception as e:
+                logger.error(f"Reminder scheduler error: {str(e)}", exc_info=True)
+                self._stop.wait(5)
+                continue
+            # Sleep until the next reminder, the end of the window, or a schedule() call
+            self._wakeup.clear()
+            with self._lock:
+                next_at = min(self._heap[0][0], self._loaded_until) if self._heap else self._loaded_until
+            self._wakeup.wait(max((next_at - datetime.utcnow()).total_seconds(), 0))
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+
+reminder_scheduler = ReminderScheduler()
+
+def start_reminder_scheduler() -> Optional[threading.Thread]:
+    """Run the scheduler in a daemon thread, if reminders are enabled and the bot is configured"""
+    if not REMINDERS or not REMINDER_LEAD_MINUTES:
+        return None
+    if not telegram_bot.bot:
+        logger.warning("Reminder scheduler not started: Bot not initialized")
+        return None
+    thread = threading.Thread(target=reminder_scheduler.run, name="event-reminders", daemon=True)
+    thread.start()
+    return thread
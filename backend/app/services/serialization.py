@@ -0,0 +1,137 @@
+import json
+import os
+import re
+from datetime import datetime
+from functools import lru_cache
+from operator import attrgetter
+from typing import Any, Callable, Dict, Optional, Union, get_args, get_origin
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Opt-in fast path: encode with orjson and build response dicts straight from ORM rows,
+# skipping the pydantic validate/dump round trip. Output is byte-identical either way.
+FAST_JSON = os.getenv("FAST_JSON", "false").lower() in ("true", "1", "t") and orjson is not None
+
+# orjson writes exponents as 1e-5 / 1e16 where json writes 1e-05 / 1e+16. Such floats are rare
+# (the schemas hold coordinates, distances and scores), so bodies that may contain one are re-encoded.
+# Inside a quoted string the digits run into the closing quote, so ids like "...3e4" don't match.
+_ORJSON_EXPONENT = re.compile(rb"e-?\d+[,\]}]")
+
+def _stdlib_dumps(content) -> bytes:
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+def dumps(content) -> bytes:
+    """The bytes JSONResponse would render for content, through orjson when FAST_JSON is on"""
+    if FAST_JSON:
+        try:
+            body = orjson.dumps(content)
+        except orjson.JSONEncodeError:
+            # Integers beyond 64 bits, lone surrogates
+            return _stdlib_dumps(content)
+        if not _ORJSON_EXPONENT.search(body):
+            return body
+    return _stdlib_dumps(content)
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered through dumps(); the app's default response class"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+# Direct serializers for response models, built once per model from their field annotations.
+# They produce what orjson encodes the way pydantic's JSON mode would: UUIDs and naive
+# datetimes are left to orjson, floats are checked so no exponent notation reaches it.
+
+class _NotExact(Exception):
+    """The value would not encode exactly like the default path; use that path instead"""
+
+def _same(value):
+    return value
+
+def _float(value):
+    if value.__class__ is not float:
+        value = float(value)
+    if value and not 1e-4 <= abs(value) < 1e16:
+        raise _NotExact
+    return value
+
+def _value_serializer(annotation) -> Optional[Callable]:
+    """Converter from an ORM attribute to its JSON value, or None if the fast path doesn't handle the type"""
+    origin = get_origin(annotation)
+    if origin is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        inner = _value_serializer(args[0]) if len(args) == 1 else None
+        if inner is None or inner is _same:
+            return inner
+        return lambda value: None if value is None else inner(value)
+    if origin is list:
+        inner = _value_serializer(get_args(annotation)[0])
+        if inner is None or inner is _same:
+            return inner
+        return lambda values: [inner(value) for value in values]
+    if annotation is float:
+        return _float
+    if annotation in (str, int, bool, datetime):
+        return _same
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return row_serializer(annotation)
+    return None
+
+@lru_cache(maxsize=None)
+def row_serializer(model) -> Optional[Callable[[Any], Dict[str, Any]]]:
+    """Function turning a trusted ORM object or row into the content model would dump, or None if unsupported.
+
+    Attributes are read as they are, without validation: only use it for rows
+    loaded from the database, which already match the schema.
+    """
+    names, converters = [], []
+    for name, info in model.model_fields.items():
+        convert = _value_serializer(info.annotation)
+        if info.alias or convert is None:
+            return None
+        if convert is not _same:
+            converters.append((len(names), convert))
+        names.append(name)
+    # One C-level call reads every attribute
+    get = attrgetter(*names) if len(names) > 1 else (lambda obj: (getattr(obj, names[0]),))
+
+    def serialize(obj):
+        values = list(get(obj))
+        for index, convert in converters:
+            values[index] = convert(values[index])
+        return dict(zip(names, values))
+    return serialize
+
+@lru_cache(maxsize=None)
+def _adapter(model) -> TypeAdapter:
+    return TypeAdapter(model)
+
+@lru_cache(maxsize=None)
+def _fast_serializer(model) -> Optional[Callable]:
+    if get_origin(model) is list:
+        serialize = row_serializer(get_args(model)[0])
+        return None if serialize is None else (lambda values: [serialize(value) for value in values])
+    if isinstance(model, type) and issubclass(model, BaseModel):
+        return row_serializer(model)
+    return None
+
+def render_json(model, value) -> bytes:
+    """Serialize ORM objects through a response model, matching FastAPI's own JSON output"""
+    serialize = _fast_serializer(model) if FAST_JSON else None
+    if serialize is not None:
+        try:
+            return orjson.dumps(serialize(value))
+        except (_NotExact, orjson.JSONEncodeError):
+            pass
+    adapter = _adapter(model)
+    return dumps(adapter.dump_python(adapter.validate_python(value, from_attributes=True), mode="json"))
+
+def json_response(model, value, headers: Optional[Dict[str, str]] = None) -> Response:
+    """Return from a route instead of the ORM objects, so they are serialized once by render_json"""
+    return Response(content=render_json(model, value), media_type="application/json", headers=headers)
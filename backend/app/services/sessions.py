@@ -0,0 +1,150 @@
+import base64
+import hashlib
+import hmac
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+from fastapi import Header, HTTPException, Query, status
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+# Session tokens are "<user id>.<expiry unix time>.<signature>", signed with HMAC-SHA256.
+# Checking one is a string split and one HMAC, with no database round trip.
+SESSION_TTL = int(os.getenv("SESSION_TTL", "3600"))
+# While the frontend rolls out tokens, requests without one may still identify themselves with ?user_id=
+SESSION_REQUIRED = os.getenv("SESSION_REQUIRED", "false").lower() in ("true", "1", "t")
+
+def _session_secret() -> bytes:
+    secret = os.getenv("SESSION_SECRET")
+    if secret:
+        return secret.encode()
+    bot_token = os.getenv("TELEGRAM_BOT_TOKEN")
+    if bot_token:
+        # Same secret in every worker without extra configuration
+        return hmac.new(bot_token.encode(), b"linkup-session", hashlib.sha256).digest()
+    logger.warning("SESSION_SECRET not set; session tokens will not survive a restart")
+    return secrets.token_bytes(32)
+
+SESSION_SECRET = _session_secret()
+
+def _sign(payload: str) -> str:
+    digest = hmac.new(SESSION_SECRET, payload.encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+def issue_session_token(user_id, ttl: int = SESSION_TTL) -> Tuple[str, int]:
+    """Signed token for the user and its expiry as a unix timestamp"""
+    expires_at = int(time.time()) + ttl
+    payload = f"{user_id}.{expires_at}"
+    return f"{payload}.{_sign(payload)}", expires_at
+
+def verify_session_token(token: str) -> Optional[str]:
+    """User id carried by a valid, unexpired token, otherwise None"""
+    try:
+        user_id, expires_at, signature = token.rsplit(".", 2)
+        if int(expires_at) < time.time():
+            return None
+    except ValueError:
+        return None
+    if not hmac.compare_digest(signature, _sign(f"{user_id}.{expires_at}")):
+        return None
+    return user_id
+
+def current_user_id(
+    authorization: Optional[str] = Header(None),
+    user_id: Optional[str] = Query(None)
+) -> str:
+    """Id of the calling user: from the session token, or the legacy user_id parameter"""
+    if authorization:
+        scheme, _, token = authorization.partition(" ")
+        token_user_id = verify_session_token(token) if scheme.lower() == "bearer" else None
+        if not token_user_id:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid or expired session token",
+                headers={"WWW-Authenticate": "Bearer"}
+            )
+        if user_id and user_id != token_user_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="user_id does not match the session"
+            )
+        return token_user_id
+    if SESSION_REQUIRED or not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    return user_id
+
+def stream_user_id(
+    authorization: Optional[str] = Header(None),
+    access_token: Optional[str] = Query(None),
+    user_id: Optional[str] = Query(None)
+) -> Optional[str]:
+    """current_user_id for EventSource, which can't send headers: the token may come as ?access_token=.
+
+    None for callers that identify themselves neither way; the public feed needs no user.
+    """
+    if access_token and not authorization:
+        authorization = f"Bearer {access_token}"
+    if not authorization and not user_id:
+        return None
+    return current_user_id(authorization, user_id)
+
+# Shared secret for the /admin and /internal endpoints, sent as X-Admin-Token; they don't exist while it is unset
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+def admin_access(x_admin_token: Optional[str] = Header(None)):
+    """Dependency guarding the /admin endpoints and the /internal ops endpoints"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Admin endpoints are not enabled"
+        )
+    if not x_admin_token or not hmac.compare_digest(x_admin_token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid admin token"
+        )
+
+class VerifiedInitDataCache:
+    """Bounded LRU of initData strings that already passed verify_telegram_auth.
+
+    The Mini App sends the same initData on every open until Telegram issues a
+    new one, so repeats skip parsing and the HMAC check. Entries are only
+    served while the auth_date is within the validity window.
+    """
+
+    def __init__(self, max_size: int = 10000, max_age: int = 86400):
+        self.max_size = max_size
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, object]" = OrderedDict()
+
+    def get(self, init_data: str):
+        with self._lock:
+            auth_data = self._entries.get(init_data)
+            if auth_data is None:
+                return None
+            if time.time() - auth_data.auth_date > self.max_age:
+                del self._entries[init_data]
+                return None
+            self._entries.move_to_end(init_data)
+            return auth_data
+
+    def put(self, init_data: str, auth_data):
+        with self._lock:
+            self._entries[init_data] = auth_data
+            self._entries.move_to_end(init_data)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+verified_init_data = VerifiedInitDataCache(int(os.getenv("INIT_DATA_CACHE_SIZE", "10000")))
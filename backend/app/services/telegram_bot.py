@@ -1,9 +1,12 @@
 import telebot
 import os
+import hashlib
+import hmac
 from dotenv import load_dotenv
 from sqlalchemy.orm import Session
 from app.models.models import User, Event
 import sys
+import threading
 import traceback
 import logging
 
@@ -14,6 +17,20 @@ logger = logging.getLogger('telegram_bot')
 load_dotenv()
 BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 WEB_APP_URL = os.getenv("WEB_APP_URL")
+# Bot API server; point at a local telegram-bot-api instance or a fake server in tests
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL")
+if TELEGRAM_API_URL:
+    telebot.apihelper.API_URL = TELEGRAM_API_URL.rstrip("/") + "/bot{0}/{1}"
+
+# Webhook mode: set TELEGRAM_WEBHOOK_URL to the public base URL of the API and Telegram will POST
+# updates to /telegram/webhook instead of every worker long-polling getUpdates.
+TELEGRAM_WEBHOOK_URL = os.getenv("TELEGRAM_WEBHOOK_URL")
+WEBHOOK_PATH = "/telegram/webhook"
+# Telegram echoes this in X-Telegram-Bot-Api-Secret-Token; derived from the bot token unless set,
+# so every worker agrees on it without extra configuration
+TELEGRAM_WEBHOOK_SECRET = os.getenv("TELEGRAM_WEBHOOK_SECRET") or (
+    hmac.new(BOT_TOKEN.encode(), b"linkup-webhook", hashlib.sha256).hexdigest() if BOT_TOKEN else None
+)
 
 # Validate essential variables
 if not BOT_TOKEN:
@@ -33,121 +50,89 @@ if BOT_TOKEN:
 else:
     logger.warning("Bot not initialized due to missing token")
 
-def send_event_invitation(user_telegram_id: int, event_title: str, event_id: str):
-    """Send invitation to a user when they are accepted to an event"""
-    if not bot:
-        logger.warning("Cannot send invitation: Bot not initialized")
-        return False
-        
-    try:
-        message = f"🎉 You've been invited to join the event: *{event_title}*!\n\nClick below to view details."
-        
-        # Create inline keyboard with button to open event details
+# Message builders shared by the send_* helpers and the notification outbox.
+# Each returns (text, button_text, button_url).
+
+def event_invitation_message(event_title: str, event_id: str):
+    text = f"🎉 You've been invited to join the event: *{event_title}*!\n\nClick below to view details."
+    return text, "View Event Details", f"{WEB_APP_URL}/events/{event_id}"
+
+def event_reminder_message(event_title: str, event_id: str):
+    text = f"⏰ Reminder: Event *{event_title}* is starting soon!\n\nClick below to view details."
+    return text, "View Event Details", f"{WEB_APP_URL}/events/{event_id}"
+
+def event_updated_message(event_title: str, event_id: str):
+    text = f"📝 Event update: *{event_title}* has been modified by the organizer.\n\nClick below to view the updated details."
+    return text, "View Updated Event", f"{WEB_APP_URL}/events/{event_id}"
+
+def response_message(responder_name: str, event_title: str, event_id: str):
+    text = f"👋 *{responder_name}* has responded to your event: *{event_title}*\n\nCheck out their profile and decide if you want to accept!"
+    return text, "View Responses", f"{WEB_APP_URL}/events/{event_id}/responses"
+
+def send_notification(chat_id: int, text: str, button_text: str = None, button_url: str = None):
+    """Send one message, raising telebot's ApiException on failure"""
+    markup = None
+    if button_text and button_url:
+        # Inline keyboard with a button that opens the Web App page
         markup = telebot.types.InlineKeyboardMarkup()
         markup.add(telebot.types.InlineKeyboardButton(
-            "View Event Details", 
-            web_app=telebot.types.WebAppInfo(url=f"{WEB_APP_URL}/events/{event_id}")
+            button_text,
+            web_app=telebot.types.WebAppInfo(url=button_url)
         ))
-        
-        bot.send_message(
-            chat_id=user_telegram_id,
-            text=message,
-            parse_mode="Markdown",
-            reply_markup=markup
-        )
-        return True
-    except Exception as e:
-        print(f"Error sending invitation: {str(e)}")
-        return False
+    bot.send_message(
+        chat_id=chat_id,
+        text=text,
+        parse_mode="Markdown",
+        reply_markup=markup
+    )
 
-def send_event_reminder(user_telegram_id: int, event_title: str, event_id: str):
-    """Send reminder to a user about upcoming event"""
+def _send_now(chat_id: int, message, description: str) -> bool:
     if not bot:
-        logger.warning("Cannot send reminder: Bot not initialized")
+        logger.warning(f"Cannot send {description}: Bot not initialized")
         return False
-        
     try:
-        message = f"⏰ Reminder: Event *{event_title}* is starting soon!\n\nClick below to view details."
-        
-        # Create inline keyboard with button to open event details
-        markup = telebot.types.InlineKeyboardMarkup()
-        markup.add(telebot.types.InlineKeyboardButton(
-            "View Event Details", 
-            web_app=telebot.types.WebAppInfo(url=f"{WEB_APP_URL}/events/{event_id}")
-        ))
-        
-        bot.send_message(
-            chat_id=user_telegram_id,
-            text=message,
-            parse_mode="Markdown",
-            reply_markup=markup
-        )
+        send_notification(chat_id, *message)
         return True
     except Exception as e:
-        print(f"Error sending reminder: {str(e)}")
+        logger.error(f"Error sending {description}: {str(e)}")
         return False
 
+# Immediate sends. Request handlers should queue through app.services.notifications instead,
+# so they never wait on Telegram.
+
+def send_event_invitation(user_telegram_id: int, event_title: str, event_id: str):
+    """Send invitation to a user when they are accepted to an event"""
+    return _send_now(user_telegram_id, event_invitation_message(event_title, event_id), "invitation")
+
+def send_event_reminder(user_telegram_id: int, event_title: str, event_id: str):
+    """Send reminder to a user about upcoming event"""
+    return _send_now(user_telegram_id, event_reminder_message(event_title, event_id), "reminder")
+
 def send_event_updated_notification(user_telegram_id: int, event_title: str, event_id: str):
     """Notify user when an event they're part of has been updated"""
-    if not bot:
-        logger.warning("Cannot send update notification: Bot not initialized")
-        return False
-        
-    try:
-        message = f"📝 Event update: *{event_title}* has been modified by the organizer.\n\nClick below to view the updated details."
-        
-        # Create inline keyboard with button to open event details
-        markup = telebot.types.InlineKeyboardMarkup()
-        markup.add(telebot.types.InlineKeyboardButton(
-            "View Updated Event", 
-            web_app=telebot.types.WebAppInfo(url=f"{WEB_APP_URL}/events/{event_id}")
-        ))
-        
-        bot.send_message(
-            chat_id=user_telegram_id,
-            text=message,
-            parse_mode="Markdown",
-            reply_markup=markup
-        )
-        return True
-    except Exception as e:
-        print(f"Error sending update notification: {str(e)}")
-        return False
+    return _send_now(user_telegram_id, event_updated_message(event_title, event_id), "update notification")
 
 def send_response_notification(creator_telegram_id: int, responder_name: str, event_title: str, event_id: str):
     """Notify event creator when someone responds to their event"""
-    if not bot:
-        logger.warning("Cannot send response notification: Bot not initialized")
-        return False
-        
-    try:
-        message = f"👋 *{responder_name}* has responded to your event: *{event_title}*\n\nCheck out their profile and decide if you want to accept!"
-        
-        # Create inline keyboard with button to open event responses
-        markup = telebot.types.InlineKeyboardMarkup()
-        markup.add(telebot.types.InlineKeyboardButton(
-            "View Responses", 
-            web_app=telebot.types.WebAppInfo(url=f"{WEB_APP_URL}/events/{event_id}/responses")
-        ))
-        
-        bot.send_message(
-            chat_id=creator_telegram_id,
-            text=message,
-            parse_mode="Markdown",
-            reply_markup=markup
-        )
-        return True
-    except Exception as e:
-        print(f"Error sending response notification: {str(e)}")
-        return False
+    return _send_now(creator_telegram_id, response_message(responder_name, event_title, event_id), "response notification")
 
 # Configure start command only if bot is available
+_handlers_registered = False
+_handlers_lock = threading.Lock()
+
 def setup_bot_handlers():
-    """Setup bot handlers only if bot is initialized"""
+    """Setup bot handlers only if bot is initialized; safe to call from any thread, registers once"""
+    global _handlers_registered
     if not bot:
         logger.warning("Cannot setup handlers: Bot not initialized")
         return
-        
+    with _handlers_lock:
+        if _handlers_registered:
+            return
+        _register_handlers()
+        _handlers_registered = True
+
+def _register_handlers():
     @bot.message_handler(commands=['start'])
     def handle_start(message):
         # Create a button that opens the web app
@@ -173,6 +158,27 @@ def setup_bot_handlers():
             reply_markup=markup
         )
 
+def setup_webhook():
+    """Register handlers and point Telegram at this deployment's webhook route"""
+    if not bot:
+        logger.error("Cannot set webhook: Bot not initialized")
+        return
+    setup_bot_handlers()
+    url = TELEGRAM_WEBHOOK_URL.rstrip("/") + WEBHOOK_PATH
+    try:
+        # Always sent, even when the URL is unchanged: the secret may have been rotated
+        bot.set_webhook(url=url, secret_token=TELEGRAM_WEBHOOK_SECRET)
+        logger.info(f"Telegram webhook set to {url}")
+    except Exception as e:
+        logger.error(f"Failed to set Telegram webhook: {str(e)}")
+
+def process_update(payload: dict):
+    """Dispatch one Update received on the webhook to the registered handlers"""
+    # Handlers must be in place before the first update, whichever thread gets there first
+    setup_bot_handlers()
+    update = telebot.types.Update.de_json(payload)
+    bot.process_new_updates([update])
+
 def run_bot():
     """Run the Telegram bot"""
     if not bot:
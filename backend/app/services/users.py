@@ -0,0 +1,42 @@
+from sqlalchemy import inspect
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.models.models import User, generate_uuid
+
+# Concurrent first logins can collide on SQLite's write lock or a PostgreSQL serialization failure
+UPSERT_ATTEMPTS = 5
+UPSERT_RETRY_DELAY = 0.05
+
+def retryable_write_error(error: DBAPIError) -> bool:
+    """Lock and serialization failures that a fresh transaction gets past"""
+    code = getattr(error.orig, "sqlstate", None) or getattr(error.orig, "pgcode", None)
+    return code in ("40001", "40P01") or "database is locked" in str(error.orig)
+
+def upsert_retry_delay(attempt: int) -> float:
+    """Seconds to wait before retry number attempt (from 0), doubling each time"""
+    return UPSERT_RETRY_DELAY * 2 ** attempt
+
+def upsert_user_statement(dialect_name: str, **fields):
+    """INSERT ... ON CONFLICT (telegram_id) DO UPDATE ... RETURNING for one user.
+
+    Creates the user or returns the existing row in a single statement, so
+    concurrent first logins can't race into the unique constraint. The conflict
+    branch only rewrites telegram_id with itself: profile fields the user may
+    have edited are left alone, but RETURNING still yields the row. The id is
+    generated here, so callers can tell a new row by comparing it.
+    """
+    # Build a transient User so the interests/photos setters encode the values for this dialect
+    user = User(id=generate_uuid(), **fields)
+    values = {
+        attr.key: getattr(user, attr.key)
+        for attr in inspect(User).column_attrs
+        if attr.key in user.__dict__
+    }
+    insert = sqlite_insert if dialect_name == "sqlite" else pg_insert
+    statement = insert(User).values(**values)
+    statement = statement.on_conflict_do_update(
+        index_elements=[User.telegram_id],
+        set_={"telegram_id": statement.excluded.telegram_id}
+    )
+    return statement.returning(User), values["id"]
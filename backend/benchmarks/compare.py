@@ -0,0 +1,80 @@
+"""Compare two benchmarks.load reports request by request.
+
+Usage (from backend/):
+    python -m benchmarks.compare baseline.json candidate.json [--threshold 10] [--fail-on-regression]
+
+Prints p50/p95/p99 latency, throughput and queries per request side by side
+with the relative change, and marks latencies more than --threshold percent
+slower (or throughput that dropped as much) and requests that run half a
+query or more per request than before.
+"""
+import argparse
+import json
+import sys
+
+METRICS = ("p50_ms", "p95_ms", "p99_ms", "throughput_rps", "queries_per_request")
+
+def change(before, after):
+    if before is None or after is None:
+        return None
+    if before == 0:
+        return 0.0 if after == 0 else float("inf")
+    return (after - before) / before * 100
+
+def regressed(metric: str, before, after, threshold: float) -> bool:
+    if metric == "queries_per_request":
+        # Averages drift a little with cache hits; half a query more per request is a real change
+        return before is not None and after is not None and after - before >= 0.5
+    delta = change(before, after)
+    if delta is None:
+        return False
+    # Throughput regresses downwards, latencies upwards
+    return delta < -threshold if metric == "throughput_rps" else delta > threshold
+
+def compare(baseline: dict, candidate: dict, threshold: float):
+    """Rows of (request, metric, before, after, change %, regressed)"""
+    rows = []
+    names = ["totals"] + sorted(set(baseline["requests"]) | set(candidate["requests"]))
+    for name in names:
+        before = baseline["totals"] if name == "totals" else baseline["requests"].get(name, {})
+        after = candidate["totals"] if name == "totals" else candidate["requests"].get(name, {})
+        for metric in METRICS:
+            a, b = before.get(metric), after.get(metric)
+            rows.append((name, metric, a, b, change(a, b), regressed(metric, a, b, threshold)))
+    return rows
+
+def _describe(report: dict) -> str:
+    environment = report["environment"]
+    return (f"{report.get('label') or environment['mode']} @ {(report.get('git_commit') or '?')[:10]} "
+            f"({environment.get('dialect') or environment['target']}, {report['dataset']})")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10, help="percent change that counts as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit with status 1 if anything regressed")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+    print(f"baseline:  {_describe(baseline)}")
+    print(f"candidate: {_describe(candidate)}")
+    if baseline["dataset"] != candidate["dataset"] or baseline["config"] != candidate["config"]:
+        print("warning: the runs used different datasets or settings")
+
+    rows = compare(baseline, candidate, args.threshold)
+    print(f"\n{'request':<20} {'metric':<20} {'baseline':>10} {'candidate':>10} {'change':>9}")
+    for name, metric, before, after, delta, regressed in rows:
+        shown = "" if delta is None else f"{delta:+.1f}%"
+        print(f"{name:<20} {metric:<20} {'-' if before is None else before:>10} {'-' if after is None else after:>10} "
+              f"{shown:>9}{'  <-- regression' if regressed else ''}")
+    regressed = [row for row in rows if row[5]]
+    print(f"\n{len(regressed)} regression(s) beyond {args.threshold:g}%")
+    if regressed and args.fail_on_regression:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""Load test the API with a weighted mix of user journeys and write latency percentiles as JSON.
+
+Usage (from backend/):
+    # In-process through the ASGI app, on a throwaway SQLite database seeded first
+    python -m benchmarks.load --users 10000 --events 10000 --responses 100000 --duration 60
+
+    # In-process against a database already filled by benchmarks.seed
+    DATABASE_URL=postgresql://... python -m benchmarks.load --skip-seed --users 100000 --output pg.json
+
+    # Over HTTP against a running server (DEBUG_MODE=false, QUERY_BUDGET>0 for query counts)
+    python -m benchmarks.load --url http://localhost:8000 --users 100000 --bot-token $TELEGRAM_BOT_TOKEN
+
+--users must match the seeded scale so the virtual users sign in as seeded
+accounts. The report holds p50/p95/p99 latency, throughput, status codes and
+SQL queries per request (from X-Query-Count) for every request name and
+overall; compare two reports with benchmarks.compare. In-process runs share
+the CPU between the app and the load generator, so use them to compare
+changes and HTTP runs for absolute numbers.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+import httpx
+
+from benchmarks.scenarios import DEFAULT_MIX, SCENARIOS, VirtualUser
+
+BENCH_BOT_TOKEN = "123456:benchmark"
+
+class Results:
+    """Latencies, statuses and query counts per request name, plus completed scenarios"""
+
+    def __init__(self):
+        self.recording = False
+        self.latencies: Dict[str, list] = {}
+        self.statuses: Dict[str, Dict[str, int]] = {}
+        self.errors: Dict[str, int] = {}
+        self.queries: Dict[str, list] = {}
+        self.scenarios: Dict[str, int] = {}
+
+    def record(self, name: str, elapsed: float, status, queries: Optional[int], ok: bool):
+        if not self.recording:
+            return
+        self.latencies.setdefault(name, []).append(elapsed * 1000)
+        statuses = self.statuses.setdefault(name, {})
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+        self.errors[name] = self.errors.get(name, 0) + (not ok)
+        if queries is not None:
+            self.queries.setdefault(name, []).append(queries)
+
+    def completed(self, scenario: str):
+        if self.recording:
+            self.scenarios[scenario] = self.scenarios.get(scenario, 0) + 1
+
+def summarize(latencies: list, duration: float, errors: int, queries: list) -> dict:
+    timings = sorted(latencies)
+    pick = lambda q: round(timings[min(len(timings) - 1, int(q * len(timings)))], 3)
+    return {
+        "count": len(timings),
+        "errors": errors,
+        "throughput_rps": round(len(timings) / duration, 2),
+        "mean_ms": round(sum(timings) / len(timings), 3),
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+        "max_ms": round(timings[-1], 3),
+        "queries_per_request": round(sum(queries) / len(queries), 2) if queries else None,
+    }
+
+def report(results: Results, duration: float) -> dict:
+    requests = {}
+    for name in sorted(results.latencies):
+        requests[name] = summarize(
+            results.latencies[name], duration, results.errors[name], results.queries.get(name, [])
+        )
+        requests[name]["statuses"] = results.statuses[name]
+    everything = [latency for latencies in results.latencies.values() for latency in latencies]
+    totals = summarize(
+        everything, duration, sum(results.errors.values()),
+        [count for counts in results.queries.values() for count in counts]
+    ) if everything else {"count": 0}
+    return {"totals": totals, "requests": requests, "scenarios": dict(sorted(results.scenarios.items()))}
+
+def parse_mix(text: Optional[str]) -> Dict[str, float]:
+    if not text:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario {name.strip()!r}; choose from {', '.join(SCENARIOS)}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+async def virtual_user(vu: VirtualUser, mix: Dict[str, float], results: Results, deadline: float):
+    names, weights = list(mix), list(mix.values())
+    while time.perf_counter() < deadline:
+        scenario = vu.rng.choices(names, weights)[0]
+        await SCENARIOS[scenario](vu)
+        results.completed(scenario)
+
+async def drive(client: httpx.AsyncClient, args, mix: Dict[str, float], bot_token: Optional[str]) -> dict:
+    """Run the virtual users through the warmup and the measured period"""
+    results = Results()
+    start = time.perf_counter()
+    deadline = start + args.warmup + args.duration
+    users = [
+        VirtualUser(client, random.Random(args.seed * 1000 + n), args.users, bot_token, results.record)
+        for n in range(args.concurrency)
+    ]
+    tasks = [asyncio.create_task(virtual_user(vu, mix, results, deadline)) for vu in users]
+    await asyncio.sleep(args.warmup)
+    results.recording = True
+    measured_from = time.perf_counter()
+    await asyncio.gather(*tasks)
+    return report(results, time.perf_counter() - measured_from)
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True, timeout=5
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def prepare_in_process(args) -> dict:
+    """Configure and seed the database for an in-process run; returns dataset details for the report"""
+    if not os.getenv("DATABASE_URL"):
+        os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/load_bench.db"
+        args.skip_seed = False
+    # Real initData verification instead of the shared debug user, and X-Query-Count on every response
+    os.environ["DEBUG_MODE"] = "false"
+    os.environ.setdefault("TELEGRAM_BOT_TOKEN", BENCH_BOT_TOKEN)
+    os.environ.setdefault("QUERY_BUDGET", "100000")
+
+    from benchmarks.seed import scale, seed
+    from app.database import engine
+    from sqlalchemy.engine import make_url
+
+    if not args.skip_seed:
+        start = time.perf_counter()
+        seed(args.users, args.events, args.responses, args.seed)
+        print(f"seeded in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    with engine.connect() as conn:
+        dataset = scale(conn)
+    dataset["seed"] = None if args.skip_seed else args.seed
+    url = make_url(os.environ["DATABASE_URL"])
+    return {
+        "target": url.render_as_string(hide_password=True),
+        "dialect": url.get_backend_name(),
+        "dataset": dataset,
+    }
+
+async def run_in_process(args, mix: Dict[str, float]) -> dict:
+    import logging
+    from app.main import app
+
+    # Per-request INFO logs would dominate the profile
+    logging.disable(logging.INFO)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=args.timeout) as client:
+        return await drive(client, args, mix, os.environ["TELEGRAM_BOT_TOKEN"])
+
+async def run_over_http(args, mix: Dict[str, float]) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        server = (await client.get("/users/debug/environment")).json()
+        if server.get("DEBUG_MODE"):
+            raise SystemExit("The server runs with DEBUG_MODE on, which signs everyone in as one test user")
+        return await drive(client, args, mix, args.bot_token)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="base URL of a running server; in-process through the ASGI app when omitted")
+    parser.add_argument("--users", type=int, default=10_000, help="seeded users (must match the database)")
+    parser.add_argument("--events", type=int, default=10_000, help="events to seed (in-process only)")
+    parser.add_argument("--responses", type=int, default=100_000, help="responses to seed (in-process only)")
+    parser.add_argument("--skip-seed", action="store_true", help="reuse the data already in DATABASE_URL")
+    parser.add_argument("--seed", type=int, default=42, help="seed for the dataset and the virtual users")
+    parser.add_argument("--duration", type=float, default=30, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="seconds run before measuring")
+    parser.add_argument("--concurrency", type=int, default=16, help="virtual users")
+    parser.add_argument("--mix", help="scenario weights, e.g. app_open=15,feed_scroll=45 (default: %s)" % ",".join(
+        f"{name}={weight}" for name, weight in DEFAULT_MIX.items()))
+    parser.add_argument("--bot-token", default=os.getenv("TELEGRAM_BOT_TOKEN"),
+                        help="the server's bot token, to sign initData (HTTP runs)")
+    parser.add_argument("--timeout", type=float, default=30, help="per-request timeout in seconds")
+    parser.add_argument("--label", help="free-form name of this run, e.g. postgres-async")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+    mix = parse_mix(args.mix)
+
+    started_at = datetime.utcnow().isoformat()
+    if args.url:
+        environment = {"mode": "http", "target": args.url, "dialect": None, "dataset": {"users": args.users}}
+        results = asyncio.run(run_over_http(args, mix))
+    else:
+        environment = {"mode": "asgi", **prepare_in_process(args)}
+        results = asyncio.run(run_in_process(args, mix))
+        from app.database import ASYNC_DB
+        from app.services import serialization
+        environment.update(async_db=ASYNC_DB, fast_json=serialization.FAST_JSON)
+
+    dataset = environment.pop("dataset")
+    output = {
+        "label": args.label,
+        "started_at": started_at,
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "environment": environment,
+        "dataset": dataset,
+        "config": {
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "mix": mix,
+        },
+        **results,
+    }
+    text = json.dumps(output, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    totals = results["totals"]
+    if totals["count"]:
+        print(f"{totals['count']} requests, {totals['throughput_rps']} req/s, p50={totals['p50_ms']}ms "
+              f"p95={totals['p95_ms']}ms p99={totals['p99_ms']}ms, {totals['errors']} errors", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
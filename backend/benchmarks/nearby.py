@@ -0,0 +1,108 @@
+"""Benchmark /events/nearby candidate search on a synthetic city.
+
+Usage (from backend/):
+    python -m benchmarks.nearby --events 1000000 --queries 1000
+
+Uses DATABASE_URL when set, otherwise a throwaway SQLite file.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/nearby_bench.db"
+
+from sqlalchemy import insert, select
+from app.database import engine, SessionLocal
+from app.models.models import Base, Event, User, USE_SQLITE
+from app.services.geo import geohash_encode, nearby_candidates_columns, nearby_candidates_filter, rank_by_distance
+
+# Roughly Moscow: events cluster around a handful of districts inside ~25 km
+CITY_CENTER = (55.7558, 37.6173)
+DISTRICTS = 12
+EVENT_TYPES = ["custom", "city", "business"]
+
+def seed(count: int, batch_size: int = 20000):
+    rng = random.Random(42)
+    Base.metadata.create_all(bind=engine)
+    creator_id = str(uuid.uuid4())
+    districts = [
+        (CITY_CENTER[0] + rng.gauss(0, 0.08), CITY_CENTER[1] + rng.gauss(0, 0.14))
+        for _ in range(DISTRICTS)
+    ]
+    now = datetime.utcnow()
+    # JSON text on SQLite, arrays on PostgreSQL
+    empty = "[]" if USE_SQLITE else []
+    with engine.begin() as conn:
+        conn.execute(insert(User.__table__), [{"id": creator_id, "telegram_id": rng.randint(1, 10 ** 9), "name": "bench", "interests": empty, "photos": empty}])
+        for start in range(0, count, batch_size):
+            rows = []
+            for _ in range(min(batch_size, count - start)):
+                district_lat, district_lon = rng.choice(districts)
+                lat = district_lat + rng.gauss(0, 0.02)
+                lon = district_lon + rng.gauss(0, 0.035)
+                rows.append({
+                    "id": str(uuid.uuid4()),
+                    "creator_id": creator_id,
+                    "title": "Bench event",
+                    "description": "",
+                    "location": "Bench",
+                    "latitude": lat,
+                    "longitude": lon,
+                    "geohash": geohash_encode(lat, lon),
+                    "datetime": now + timedelta(minutes=rng.randint(-30 * 24 * 60, 60 * 24 * 60)),
+                    "is_open": rng.random() < 0.8,
+                    "type": rng.choice(EVENT_TYPES),
+                    "created_at": now,
+                    "updated_at": now,
+                })
+            conn.execute(Event.__table__.insert(), rows)
+
+def run(queries: int, radius_km: float, window_hours: int):
+    rng = random.Random(7)
+    timings = []
+    found = []
+    db = SessionLocal()
+    try:
+        for _ in range(queries):
+            lat = CITY_CENTER[0] + rng.uniform(-0.15, 0.15)
+            lon = CITY_CENTER[1] + rng.uniform(-0.25, 0.25)
+            starts_after = datetime.utcnow()
+            start = time.perf_counter()
+            candidates = db.query(*nearby_candidates_columns()).filter(
+                nearby_candidates_filter(lat, lon, radius_km, starts_after, starts_after + timedelta(hours=window_hours)),
+                Event.is_open == True,
+            ).all()
+            ranked = rank_by_distance(candidates, lat, lon, radius_km, 50)
+            timings.append((time.perf_counter() - start) * 1000)
+            found.append(len(ranked))
+    finally:
+        db.close()
+    timings.sort()
+    pick = lambda q: timings[min(len(timings) - 1, int(q * len(timings)))]
+    print(f"queries={queries} radius_km={radius_km} window_hours={window_hours}")
+    print(f"p50={pick(0.50):.2f}ms p95={pick(0.95):.2f}ms p99={pick(0.99):.2f}ms max={timings[-1]:.2f}ms")
+    print(f"mean results={statistics.mean(found):.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--radius-km", type=float, default=3.0)
+    parser.add_argument("--window-hours", type=int, default=48)
+    parser.add_argument("--skip-seed", action="store_true", help="reuse events already in DATABASE_URL")
+    args = parser.parse_args()
+
+    if not args.skip_seed:
+        start = time.perf_counter()
+        seed(args.events)
+        print(f"seeded {args.events} events in {time.perf_counter() - start:.1f}s")
+    run(args.queries, args.radius_km, args.window_hours)
+
+if __name__ == "__main__":
+    main()
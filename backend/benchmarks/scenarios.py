@@ -0,0 +1,182 @@
+"""User journeys the load generator replays against the API.
+
+Every scenario is an async function of a VirtualUser, which signs in as
+seeded users (see benchmarks.seed) and times each request under a stable
+name such as "events.list" or "responses.batch".
+"""
+import hashlib
+import hmac
+import json
+import random
+import time
+from collections import deque
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import quote, urlencode
+
+import httpx
+
+# Roughly where the seeded events are, for the feed's distance term
+FEED_ORIGIN = (55.7558, 37.6173)
+PAGE_SIZE = 20
+# Seeded user n has telegram_id TELEGRAM_ID_BASE + n: clear of real Telegram ids in a dev
+# database, and within the 32-bit telegram_id column
+TELEGRAM_ID_BASE = 1_900_000_000
+
+def creator_count(users: int) -> int:
+    """How many of the first seeded users create events"""
+    return max(1, users // 10)
+
+def init_data(telegram_id: int, first_name: str, bot_token: Optional[str], auth_date: int) -> str:
+    """Telegram Mini App initData for a user, signed the way Telegram signs Telegram.WebApp.initData"""
+    pairs = {
+        "auth_date": str(auth_date),
+        "user": json.dumps({"id": telegram_id, "first_name": first_name}, separators=(",", ":")),
+    }
+    signature = ""
+    if bot_token:
+        key = hmac.new(b"WebAppData", bot_token.encode(), hashlib.sha256).digest()
+        data_check_string = "\n".join(f"{name}={value}" for name, value in sorted(pairs.items()))
+        signature = hmac.new(key, data_check_string.encode(), hashlib.sha256).hexdigest()
+    return urlencode({**pairs, "hash": signature}, quote_via=quote)
+
+class VirtualUser:
+    """One simulated client: its own random stream, sessions and recently seen events"""
+
+    def __init__(self, client: httpx.AsyncClient, rng: random.Random, users: int, bot_token: Optional[str],
+                 record: Callable):
+        self.client = client
+        self.rng = rng
+        self.users = users
+        self.creators = creator_count(users)
+        self.bot_token = bot_token
+        self.record = record
+        self.auth_date = int(time.time())
+        # seeded user index -> (user id, session token)
+        self.sessions: Dict[int, Tuple[str, str]] = {}
+        self.open_events = deque(maxlen=200)
+
+    async def request(self, name: str, method: str, url: str, token: Optional[str] = None,
+                      expected=(200,), **kwargs) -> Optional[httpx.Response]:
+        """Send and time one request; None if it failed or returned an unexpected status"""
+        headers = {"Authorization": f"Bearer {token}"} if token else None
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=headers, **kwargs)
+        except httpx.HTTPError as e:
+            self.record(name, time.perf_counter() - start, type(e).__name__, None, False)
+            return None
+        elapsed = time.perf_counter() - start
+        queries = response.headers.get("X-Query-Count")
+        ok = response.status_code in expected
+        self.record(name, elapsed, response.status_code, int(queries) if queries else None, ok)
+        return response if ok else None
+
+    async def sign_in(self, index: int) -> Optional[Tuple[str, str]]:
+        """POST /users/auth as seeded user index, as the Mini App does when it opens"""
+        telegram_id = TELEGRAM_ID_BASE + index
+        payload = {"initData": init_data(telegram_id, f"Bench User {index}", self.bot_token, self.auth_date)}
+        response = await self.request("users.auth", "POST", "/users/auth", json=payload)
+        if response is None:
+            return None
+        body = response.json()
+        self.sessions[index] = (body["id"], body["session_token"])
+        return self.sessions[index]
+
+    async def session(self, creator: bool = False) -> Optional[Tuple[str, str]]:
+        """(user id, token) of a random user, or of a random event creator; signs in on first use"""
+        index = self.rng.randrange(self.creators if creator else self.users)
+        return self.sessions.get(index) or await self.sign_in(index)
+
+    def remember(self, events):
+        self.open_events.extend(event["id"] for event in events if event.get("is_open"))
+
+async def app_open(vu: VirtualUser):
+    """Open the Mini App: sign in, then load the personalised feed"""
+    signed_in = await vu.sign_in(vu.rng.randrange(vu.users))
+    if signed_in is None:
+        return
+    lat, lon = FEED_ORIGIN[0] + vu.rng.gauss(0, 0.05), FEED_ORIGIN[1] + vu.rng.gauss(0, 0.08)
+    response = await vu.request(
+        "events.feed", "GET", "/events/feed", signed_in[1], params={"limit": PAGE_SIZE, "lat": lat, "lon": lon}
+    )
+    if response is not None:
+        vu.remember(response.json())
+
+async def feed_scroll(vu: VirtualUser):
+    """Scroll one to four pages of open events, following X-Next-Cursor"""
+    params = {"limit": PAGE_SIZE, "is_open": "true"}
+    for _ in range(vu.rng.randint(1, 4)):
+        response = await vu.request("events.list", "GET", "/events/", params=params)
+        if response is None:
+            return
+        vu.remember(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return
+        params = {"limit": PAGE_SIZE, "is_open": "true", "cursor": cursor}
+
+async def respond(vu: VirtualUser):
+    """Open an event from the feed and ask to join it"""
+    signed_in = await vu.session()
+    if signed_in is None:
+        return
+    if not vu.open_events:
+        await feed_scroll(vu)
+        if not vu.open_events:
+            return
+    event_id = vu.rng.choice(vu.open_events)
+    if await vu.request("events.get", "GET", f"/events/{event_id}") is None:
+        return
+    # 400 is the API refusing a second response or one to the user's own event
+    await vu.request("responses.create", "POST", "/responses/", signed_in[1], expected=(200, 400),
+                     json={"event_id": event_id})
+
+async def _pending_queue(vu: VirtualUser):
+    """As a creator: list my events, then the pending respondents of one of them"""
+    signed_in = await vu.session(creator=True)
+    if signed_in is None:
+        return None
+    user_id, token = signed_in
+    response = await vu.request(
+        "events.user", "GET", f"/events/user/{user_id}", params={"fields": "title,is_open,pending_count"}
+    )
+    if response is None:
+        return None
+    waiting = [event for event in response.json() if event["pending_count"] > 0]
+    if not waiting:
+        return None
+    event_id = vu.rng.choice(waiting)["id"]
+    response = await vu.request(
+        "responses.queue", "GET", f"/responses/event/{event_id}/queue", token,
+        params={"status": "pending", "limit": PAGE_SIZE}
+    )
+    if response is None:
+        return None
+    return token, event_id, response.json()
+
+async def creator_review(vu: VirtualUser):
+    """A creator looks through who wants to join one of their events"""
+    await _pending_queue(vu)
+
+async def accept(vu: VirtualUser):
+    """A creator accepts most of the first few pending respondents and rejects the rest, in one batch"""
+    queue = await _pending_queue(vu)
+    if queue is None or not queue[2]:
+        return
+    token, event_id, cards = queue
+    decisions = [
+        {"id": card["id"], "status": "accepted" if vu.rng.random() < 0.8 else "rejected"}
+        for card in cards[:vu.rng.randint(1, 5)]
+    ]
+    await vu.request("responses.batch", "PUT", "/responses/batch", token,
+                     json={"event_id": event_id, "decisions": decisions})
+
+SCENARIOS = {
+    "app_open": app_open,
+    "feed_scroll": feed_scroll,
+    "respond": respond,
+    "creator_review": creator_review,
+    "accept": accept,
+}
+# Relative weights: browsing dominates, creators' screens are a minority of traffic
+DEFAULT_MIX = {"app_open": 15, "feed_scroll": 45, "respond": 20, "creator_review": 12, "accept": 8}
@@ -0,0 +1,207 @@
+"""Fill an empty database with a reproducible synthetic LinkUp dataset.
+
+Usage (from backend/):
+    DATABASE_URL=postgresql://... python -m benchmarks.seed --users 100000 --events 100000 --responses 1000000
+
+Without DATABASE_URL the app's default SQLite file is used; the database must
+have no users yet. The same --seed and scale always produce the same rows
+(dates relative to the time of seeding). User n gets telegram_id
+TELEGRAM_ID_BASE + n and the first creator_count() users create all the
+events, so the load generator (benchmarks.load) can sign in as any of them
+knowing only the scale.
+"""
+import argparse
+import json
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+from sqlalchemy import func, insert, select
+from app.database import engine, run_migrations
+from app.models.models import Event, EventResponse, Interest, User, UserInterest, USE_SQLITE
+from app.services.geo import geohash_encode
+from app.services.locations import rebuild_location_stats
+from benchmarks.scenarios import TELEGRAM_ID_BASE, creator_count
+
+BATCH_SIZE = 5000
+
+CITY_CENTER = (55.7558, 37.6173)
+DISTRICTS = [
+    "Арбат", "Тверской", "Замоскворечье", "Хамовники", "Басманный", "Пресненский",
+    "Таганский", "Сокольники", "Марьина Роща", "Раменки", "Измайлово", "Чертаново",
+]
+VENUE_KINDS = ["Парк", "Кофейня", "Антикафе", "Бар", "Коворкинг", "Стадион", "Клуб", "Библиотека", "Набережная"]
+VENUES = 400
+INTERESTS = [
+    "music", "sport", "games", "travel", "movies", "books", "food", "coffee", "running", "yoga",
+    "hiking", "photography", "art", "theatre", "tech", "startups", "dancing", "cycling", "football",
+    "basketball", "tennis", "chess", "board games", "languages", "cooking", "wine", "jazz", "rock",
+    "volunteering", "pets", "fashion", "design", "science", "history", "meditation", "climbing",
+    "swimming", "karaoke", "anime", "standup",
+]
+# Weighted like the production mix: mostly user-made meetups
+EVENT_TYPES = {"custom": 70, "city": 20, "business": 10}
+TITLES = {
+    "custom": ["Настолки", "Пробежка", "Кофе и разговоры", "Кино вечером", "Прогулка", "Языковой клуб"],
+    "city": ["Фестиваль", "Ярмарка", "Концерт в парке", "Экскурсия", "Субботник"],
+    "business": ["Нетворкинг", "Митап", "Питч-сессия", "Воркшоп", "Завтрак основателей"],
+}
+
+def zipf_weights(count: int, exponent: float = 1.0):
+    """Cumulative weights of ranks 1..count, for rng.choices(cum_weights=...)"""
+    return list(accumulate(1.0 / (rank + 1) ** exponent for rank in range(count)))
+
+def _id(rng: random.Random):
+    value = uuid.UUID(int=rng.getrandbits(128), version=4)
+    return str(value) if USE_SQLITE else value
+
+def _list(values):
+    return json.dumps(values) if USE_SQLITE else values
+
+def _venues(rng: random.Random):
+    districts = [
+        (name, CITY_CENTER[0] + rng.gauss(0, 0.08), CITY_CENTER[1] + rng.gauss(0, 0.14))
+        for name in DISTRICTS
+    ]
+    venues = []
+    for n in range(VENUES):
+        name, lat, lon = rng.choice(districts)
+        venues.append((f"{rng.choice(VENUE_KINDS)} {n + 1}, {name}", lat + rng.gauss(0, 0.02), lon + rng.gauss(0, 0.035)))
+    return venues
+
+def _insert(conn, table, rows):
+    for start in range(0, len(rows), BATCH_SIZE):
+        conn.execute(insert(table), rows[start:start + BATCH_SIZE])
+
+def seed_users(conn, rng: random.Random, count: int, now: datetime):
+    """Users with zipf-distributed interests; returns their ids in telegram_id order"""
+    conn.execute(insert(Interest.__table__), [{"name": name} for name in INTERESTS])
+    interest_ids = dict(conn.execute(select(Interest.name, Interest.id)).all())
+    interest_weights = zipf_weights(len(INTERESTS), 0.8)
+    ids = []
+    for start in range(0, count, BATCH_SIZE):
+        users, links = [], []
+        for n in range(start, min(start + BATCH_SIZE, count)):
+            user_id = _id(rng)
+            picked = sorted(set(rng.choices(range(len(INTERESTS)), cum_weights=interest_weights, k=rng.randint(0, 6))))
+            created_at = now - timedelta(days=rng.uniform(0, 365))
+            users.append({
+                "id": user_id,
+                "telegram_id": TELEGRAM_ID_BASE + n,
+                "name": f"Bench User {n}",
+                "avatar_url": None,
+                "bio": None,
+                "interests": _list([INTERESTS[i] for i in picked]),
+                "photos": _list([]),
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+            links.extend({"interest_id": interest_ids[INTERESTS[i]], "user_id": user_id} for i in picked)
+            ids.append(user_id)
+        conn.execute(insert(User.__table__), users)
+        if links:
+            conn.execute(insert(UserInterest.__table__), links)
+    return ids
+
+def _status(rng: random.Random, started: bool) -> str:
+    if started:
+        return rng.choices(("accepted", "rejected", "pending"), (55, 25, 20))[0]
+    return rng.choices(("pending", "accepted", "rejected"), (65, 25, 10))[0]
+
+def seed_events(conn, rng: random.Random, user_ids, count: int, responses: int, now: datetime):
+    """Events from zipf-weighted creators and venues, each with a heavy-tailed share of the responses"""
+    creators = creator_count(len(user_ids))
+    creator_weights = zipf_weights(creators, 0.7)
+    venues = _venues(rng)
+    venue_weights = zipf_weights(len(venues), 0.9)
+    types, type_weights = list(EVENT_TYPES), list(EVENT_TYPES.values())
+    # Popularity follows a Pareto tail: most events get a few responses, a handful get fifty times more
+    popularity = [min(rng.paretovariate(1.5), 50.0) for _ in range(count)]
+    per_popularity = responses / sum(popularity) if count else 0
+    created_events = created_responses = 0
+    for start in range(0, count, BATCH_SIZE):
+        events, rows = [], []
+        for n in range(start, min(start + BATCH_SIZE, count)):
+            event_id = _id(rng)
+            creator = rng.choices(range(creators), cum_weights=creator_weights)[0]
+            event_type = rng.choices(types, type_weights)[0]
+            location, lat, lon = rng.choices(venues, cum_weights=venue_weights)[0]
+            lat, lon = lat + rng.gauss(0, 0.002), lon + rng.gauss(0, 0.003)
+            created_at = now - timedelta(days=rng.uniform(0, 60))
+            starts_at = created_at + timedelta(hours=rng.uniform(2, 45 * 24))
+            started = starts_at <= now
+            # Stochastic rounding keeps the total close to the requested count
+            expected = popularity[n] * per_popularity
+            wanted = min(int(expected) + (rng.random() < expected - int(expected)), len(user_ids) - 1)
+            respondents = [u for u in rng.sample(range(len(user_ids)), min(wanted + 1, len(user_ids))) if u != creator][:wanted]
+            counts = {"pending": 0, "accepted": 0, "rejected": 0}
+            window = max((min(starts_at, now) - created_at).total_seconds(), 1)
+            for respondent in respondents:
+                status = _status(rng, started)
+                counts[status] += 1
+                rows.append({
+                    "id": _id(rng),
+                    "event_id": event_id,
+                    "user_id": user_ids[respondent],
+                    "status": status,
+                    "responded_at": created_at + timedelta(seconds=rng.uniform(0, window)),
+                })
+            events.append({
+                "id": event_id,
+                "creator_id": user_ids[creator],
+                "title": f"{rng.choice(TITLES[event_type])} #{n}",
+                "description": "Synthetic benchmark event",
+                "location": location,
+                "latitude": lat,
+                "longitude": lon,
+                "geohash": geohash_encode(lat, lon),
+                "datetime": starts_at,
+                "is_open": not started and rng.random() < 0.9,
+                "type": event_type,
+                "created_at": created_at,
+                "updated_at": created_at,
+                "pending_count": counts["pending"],
+                "accepted_count": counts["accepted"],
+            })
+        conn.execute(insert(Event.__table__), events)
+        _insert(conn, EventResponse.__table__, rows)
+        created_events += len(events)
+        created_responses += len(rows)
+    return created_events, created_responses
+
+def seed(users: int, events: int, responses: int, seed_value: int = 42, now: datetime = None) -> dict:
+    """Create the schema and insert the dataset; returns the row counts"""
+    rng = random.Random(seed_value)
+    now = now or datetime.utcnow()
+    run_migrations()
+    with engine.begin() as conn:
+        if conn.execute(select(func.count()).select_from(User.__table__)).scalar():
+            raise SystemExit("The database already has users; seed an empty database")
+        user_ids = seed_users(conn, rng, users, now)
+        created_events, created_responses = seed_events(conn, rng, user_ids, events, responses, now)
+        # Bulk inserts bypass the ORM hook that keeps location popularity counts
+        rebuild_location_stats(conn)
+    return {"users": users, "events": created_events, "responses": created_responses, "seed": seed_value}
+
+def scale(conn) -> dict:
+    """Row counts of a seeded database, for benchmark reports"""
+    count = lambda table: conn.execute(select(func.count()).select_from(table)).scalar()
+    return {"users": count(User.__table__), "events": count(Event.__table__), "responses": count(EventResponse.__table__)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--events", type=int, default=10_000)
+    parser.add_argument("--responses", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = seed(args.users, args.events, args.responses, args.seed)
+    print(f"seeded {counts['users']} users, {counts['events']} events and {counts['responses']} responses "
+          f"in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
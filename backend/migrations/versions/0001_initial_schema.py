@@ -0,0 +1,65 @@
+"""Initial schema, as previously created by Base.metadata.create_all
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-05-24 12:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.models.models import ID_TYPE, ARRAY_TYPE, USE_SQLITE
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    array_default = "[]" if USE_SQLITE else None
+    op.create_table(
+        "users",
+        sa.Column("id", ID_TYPE, primary_key=True),
+        sa.Column("telegram_id", sa.Integer(), nullable=False, unique=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("avatar_url", sa.String(), nullable=True),
+        sa.Column("bio", sa.String(), nullable=True),
+        sa.Column("interests", ARRAY_TYPE, nullable=False, server_default=array_default),
+        sa.Column("photos", ARRAY_TYPE, nullable=False, server_default=array_default),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+    op.create_table(
+        "events",
+        sa.Column("id", ID_TYPE, primary_key=True),
+        sa.Column("creator_id", ID_TYPE, sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("description", sa.String(), nullable=False),
+        sa.Column("location", sa.String(), nullable=False),
+        sa.Column("datetime", sa.DateTime(), nullable=False),
+        sa.Column("is_open", sa.Boolean(), nullable=True),
+        sa.Column("type", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+    op.create_table(
+        "badges",
+        sa.Column("id", ID_TYPE, primary_key=True),
+        sa.Column("user_id", ID_TYPE, sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("badge_type", sa.String(), nullable=False),
+        sa.Column("awarded_at", sa.DateTime(), nullable=True),
+    )
+    op.create_table(
+        "event_responses",
+        sa.Column("id", ID_TYPE, primary_key=True),
+        sa.Column("event_id", ID_TYPE, sa.ForeignKey("events.id"), nullable=False),
+        sa.Column("user_id", ID_TYPE, sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("responded_at", sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade():
+    op.drop_table("event_responses")
+    op.drop_table("badges")
+    op.drop_table("events")
+    op.drop_table("users")
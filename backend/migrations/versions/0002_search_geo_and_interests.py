@@ -0,0 +1,199 @@
+"""Feed pagination, location search, geo and interest tables
+
+Schema added alongside keyset pagination, location search/autocomplete,
+/events/nearby and the interest index. Databases that ran those versions
+got it from create_all, so every step checks what already exists.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 09:00:00
+"""
+import json
+import logging
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+# Substring location search as of this revision; 0009 rekeys the SQLite table
+SQLITE_FTS_SETUP = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS events_location_fts
+       USING fts5(location, content='events', content_rowid='rowid', tokenize='trigram')""",
+    """CREATE TRIGGER IF NOT EXISTS events_location_fts_ai AFTER INSERT ON events BEGIN
+           INSERT INTO events_location_fts(rowid, location) VALUES (new.rowid, new.location);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS events_location_fts_ad AFTER DELETE ON events BEGIN
+           INSERT INTO events_location_fts(events_location_fts, rowid, location) VALUES ('delete', old.rowid, old.location);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS events_location_fts_au AFTER UPDATE OF location ON events BEGIN
+           INSERT INTO events_location_fts(events_location_fts, rowid, location) VALUES ('delete', old.rowid, old.location);
+           INSERT INTO events_location_fts(rowid, location) VALUES (new.rowid, new.location);
+       END""",
+]
+SQLITE_FTS_TEARDOWN = [
+    "DROP TRIGGER IF EXISTS events_location_fts_ai",
+    "DROP TRIGGER IF EXISTS events_location_fts_ad",
+    "DROP TRIGGER IF EXISTS events_location_fts_au",
+    "DROP TABLE IF EXISTS events_location_fts",
+]
+POSTGRES_TRGM_SETUP = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_events_location_trgm ON events USING gin (location gin_trgm_ops)",
+]
+
+events = sa.table("events", sa.column("location", sa.String))
+users = sa.table("users", sa.column("id"), sa.column("interests"))
+event_locations = sa.table(
+    "event_locations", sa.column("normalized", sa.String), sa.column("name", sa.String), sa.column("event_count", sa.Integer)
+)
+interests = sa.table("interests", sa.column("id", sa.Integer), sa.column("name", sa.String))
+user_interests = sa.table("user_interests", sa.column("interest_id", sa.Integer), sa.column("user_id"))
+
+
+def _normalize(term):
+    """Lowercase with runs of whitespace collapsed, the key for both locations and interests"""
+    return " ".join((term or "").split()).lower()
+
+
+def _decode_interests(raw):
+    # ARRAY on PostgreSQL, JSON text on SQLite
+    if isinstance(raw, list):
+        return raw
+    try:
+        value = json.loads(raw) if raw else []
+    except json.JSONDecodeError:
+        return []
+    return value if isinstance(value, list) else []
+
+
+def _create_location_search(bind):
+    """pg_trgm GIN index on PostgreSQL, FTS5 trigram table kept in sync by triggers on SQLite"""
+    if bind.dialect.name == "sqlite":
+        exists = bind.exec_driver_sql("SELECT 1 FROM sqlite_master WHERE name = 'events_location_fts'").first()
+        for statement in SQLITE_FTS_SETUP:
+            bind.exec_driver_sql(statement)
+        if not exists:
+            # Index events that were created before the table existed
+            bind.exec_driver_sql("INSERT INTO events_location_fts(events_location_fts) VALUES ('rebuild')")
+    elif bind.dialect.name == "postgresql":
+        for statement in POSTGRES_TRGM_SETUP:
+            bind.exec_driver_sql(statement)
+
+
+def _rebuild_location_stats(bind):
+    """Popularity of each distinct location, merging spellings that differ by case or whitespace"""
+    bind.execute(event_locations.delete())
+    counts = {}
+    for location, count in bind.execute(sa.select(events.c.location, sa.func.count()).group_by(events.c.location)):
+        key = _normalize(location)
+        if not key:
+            continue
+        name, total = counts.get(key, (" ".join(location.split()), 0))
+        counts[key] = (name, total + count)
+    if counts:
+        bind.execute(event_locations.insert(), [
+            {"normalized": key, "name": name, "event_count": total} for key, (name, total) in counts.items()
+        ])
+
+
+def _backfill_user_interests(bind):
+    """Copy the interests stored on users rows into interests / user_interests, unless already done"""
+    if bind.execute(sa.select(user_interests.c.user_id).limit(1)).first() is not None:
+        return
+    names_by_user = {}
+    for user_id, raw in bind.execute(sa.select(users.c.id, users.c.interests)):
+        names = list(dict.fromkeys(key for key in map(_normalize, _decode_interests(raw)) if key))
+        if names:
+            names_by_user[user_id] = names
+    if not names_by_user:
+        return
+    ids = dict(bind.execute(sa.select(interests.c.name, interests.c.id)).all())
+    new_names = list(dict.fromkeys(name for names in names_by_user.values() for name in names if name not in ids))
+    if new_names:
+        bind.execute(interests.insert(), [{"name": name} for name in new_names])
+        ids = dict(bind.execute(sa.select(interests.c.name, interests.c.id)).all())
+    bind.execute(user_interests.insert(), [
+        {"interest_id": ids[name], "user_id": user_id}
+        for user_id, names in names_by_user.items()
+        for name in names
+    ])
+    logger.info(f"Backfilled user_interests for {len(names_by_user)} users")
+
+
+def _create_index(inspector, name, table, columns, **kwargs):
+    if name not in {index["name"] for index in inspector.get_indexes(table)}:
+        op.create_index(name, table, columns, **kwargs)
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    id_type = sa.String(36) if bind.dialect.name == "sqlite" else postgresql.UUID(as_uuid=True)
+    tables = set(inspector.get_table_names())
+
+    event_columns = {column["name"] for column in inspector.get_columns("events")}
+    for name, column_type in (("latitude", sa.Float()), ("longitude", sa.Float()), ("geohash", sa.String(12))):
+        if name not in event_columns:
+            op.add_column("events", sa.Column(name, column_type, nullable=True))
+
+    _create_index(inspector, "ix_events_created_at_id", "events", ["created_at", "id"])
+    _create_index(
+        inspector, "ix_events_geohash_datetime", "events",
+        ["geohash", "datetime", "latitude", "longitude", "is_open", "id"],
+    )
+
+    if "event_locations" not in tables:
+        op.create_table(
+            "event_locations",
+            sa.Column("normalized", sa.String(), primary_key=True),
+            sa.Column("name", sa.String(), nullable=False),
+            sa.Column("event_count", sa.Integer(), nullable=False),
+        )
+        op.create_index("ix_event_locations_count", "event_locations", ["event_count"])
+    if "interests" not in tables:
+        op.create_table(
+            "interests",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("name", sa.String(), nullable=False, unique=True),
+        )
+    if "user_interests" not in tables:
+        op.create_table(
+            "user_interests",
+            sa.Column("interest_id", sa.Integer(), sa.ForeignKey("interests.id"), primary_key=True),
+            sa.Column("user_id", id_type, sa.ForeignKey("users.id"), primary_key=True),
+        )
+        op.create_index("ix_user_interests_user_id", "user_interests", ["user_id"])
+
+    # pg_trgm / FTS5 are optional: without them location search falls back to ILIKE scans
+    try:
+        with bind.begin_nested():
+            _create_location_search(bind)
+    except Exception as e:
+        logger.warning(f"Indexed location search unavailable, falling back to ILIKE scans: {str(e)}")
+
+    _rebuild_location_stats(bind)
+    _backfill_user_interests(bind)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == "sqlite":
+        for statement in SQLITE_FTS_TEARDOWN:
+            op.execute(statement)
+    elif bind.dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_events_location_trgm")
+    op.drop_table("user_interests")
+    op.drop_table("interests")
+    op.drop_table("event_locations")
+    op.drop_index("ix_events_geohash_datetime", table_name="events")
+    op.drop_index("ix_events_created_at_id", table_name="events")
+    with op.batch_alter_table("events") as batch:
+        batch.drop_column("geohash")
+        batch.drop_column("longitude")
+        batch.drop_column("latitude")
@@ -0,0 +1,46 @@
+"""Indexes for per-user lookups, the filtered feed and duplicate responses
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 10:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_events_creator_id", "events", ["creator_id"])
+    op.create_index("ix_events_is_open_type_created_at", "events", ["is_open", "type", "created_at"])
+    op.create_index("ix_events_datetime", "events", ["datetime"])
+    op.create_index("ix_event_responses_user_id", "event_responses", ["user_id"])
+
+    # Racing requests could insert the same response twice; keep the earliest before enforcing uniqueness
+    op.execute(sa.text("""
+        DELETE FROM event_responses
+        WHERE EXISTS (
+            SELECT 1 FROM event_responses AS earlier
+            WHERE earlier.event_id = event_responses.event_id
+              AND earlier.user_id = event_responses.user_id
+              AND (earlier.responded_at < event_responses.responded_at
+                   OR (earlier.responded_at IS NOT NULL AND event_responses.responded_at IS NULL)
+                   OR (earlier.responded_at = event_responses.responded_at AND earlier.id < event_responses.id)
+                   OR (earlier.responded_at IS NULL AND event_responses.responded_at IS NULL
+                       AND earlier.id < event_responses.id))
+        )
+    """))
+    op.create_index(
+        "uq_event_responses_event_id_user_id", "event_responses", ["event_id", "user_id"], unique=True
+    )
+
+
+def downgrade():
+    op.drop_index("uq_event_responses_event_id_user_id", table_name="event_responses")
+    op.drop_index("ix_event_responses_user_id", table_name="event_responses")
+    op.drop_index("ix_events_datetime", table_name="events")
+    op.drop_index("ix_events_is_open_type_created_at", table_name="events")
+    op.drop_index("ix_events_creator_id", table_name="events")
@@ -0,0 +1,28 @@
+"""Record of queued event reminders
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 14:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.models.models import ID_TYPE
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "event_reminders",
+        sa.Column("event_id", ID_TYPE, primary_key=True),
+        sa.Column("lead_minutes", sa.Integer(), primary_key=True),
+        sa.Column("event_datetime", sa.DateTime(), primary_key=True),
+        sa.Column("queued_at", sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade():
+    op.drop_table("event_reminders")
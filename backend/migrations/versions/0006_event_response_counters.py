@@ -0,0 +1,31 @@
+"""Pending/accepted response counters on events
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 16:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("events", sa.Column("pending_count", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("events", sa.Column("accepted_count", sa.Integer(), nullable=False, server_default="0"))
+    # Backfill existing events; services/counters.py keeps them current from here on
+    for status in ("pending", "accepted"):
+        op.execute(
+            f"UPDATE events SET {status}_count = ("
+            f"SELECT COUNT(*) FROM event_responses "
+            f"WHERE event_responses.event_id = events.id AND event_responses.status = '{status}')"
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("events") as batch:
+        batch.drop_column("accepted_count")
+        batch.drop_column("pending_count")
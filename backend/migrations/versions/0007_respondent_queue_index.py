@@ -0,0 +1,24 @@
+"""Index for the per-status respondent queue
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 18:00:00
+"""
+from alembic import op
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_event_responses_event_id_status_responded_at",
+        "event_responses",
+        ["event_id", "status", "responded_at", "id"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_event_responses_event_id_status_responded_at", table_name="event_responses")
@@ -0,0 +1,53 @@
+"""Archive tables for events past the retention window
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 20:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.models.models import ID_TYPE
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "events_archive",
+        sa.Column("id", ID_TYPE, primary_key=True),
+        sa.Column("creator_id", ID_TYPE, nullable=False),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("description", sa.String(), nullable=False),
+        sa.Column("location", sa.String(), nullable=False),
+        sa.Column("latitude", sa.Float(), nullable=True),
+        sa.Column("longitude", sa.Float(), nullable=True),
+        sa.Column("geohash", sa.String(12), nullable=True),
+        sa.Column("datetime", sa.DateTime(), nullable=False),
+        sa.Column("is_open", sa.Boolean(), nullable=True),
+        sa.Column("type", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("pending_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("accepted_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("archived_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_events_archive_creator_id", "events_archive", ["creator_id"])
+    op.create_index("ix_events_archive_datetime", "events_archive", ["datetime"])
+    op.create_table(
+        "event_responses_archive",
+        sa.Column("id", ID_TYPE, primary_key=True),
+        sa.Column("event_id", ID_TYPE, nullable=False),
+        sa.Column("user_id", ID_TYPE, nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("responded_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_event_responses_archive_event_id", "event_responses_archive", ["event_id"])
+    op.create_index("ix_event_responses_archive_user_id", "event_responses_archive", ["user_id"])
+
+
+def downgrade():
+    op.drop_table("event_responses_archive")
+    op.drop_table("events_archive")
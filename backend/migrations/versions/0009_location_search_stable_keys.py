@@ -0,0 +1,61 @@
+"""Key the SQLite location search index on a stable integer id
+
+The FTS5 table indexed events.rowid, which VACUUM may renumber because
+events has a string primary key. It is rebuilt on events_location_fts_rows,
+which assigns each event a permanent integer key. PostgreSQL is unaffected.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 10:00:00
+"""
+import logging
+from alembic import op
+from app.services.locations import SQLITE_FTS_TEARDOWN, create_location_search
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+# The rowid-keyed version this revision replaces
+LEGACY_FTS_SETUP = [
+    """CREATE VIRTUAL TABLE events_location_fts
+       USING fts5(location, content='events', content_rowid='rowid', tokenize='trigram')""",
+    """CREATE TRIGGER events_location_fts_ai AFTER INSERT ON events BEGIN
+           INSERT INTO events_location_fts(rowid, location) VALUES (new.rowid, new.location);
+       END""",
+    """CREATE TRIGGER events_location_fts_ad AFTER DELETE ON events BEGIN
+           INSERT INTO events_location_fts(events_location_fts, rowid, location) VALUES ('delete', old.rowid, old.location);
+       END""",
+    """CREATE TRIGGER events_location_fts_au AFTER UPDATE OF location ON events BEGIN
+           INSERT INTO events_location_fts(events_location_fts, rowid, location) VALUES ('delete', old.rowid, old.location);
+           INSERT INTO events_location_fts(rowid, location) VALUES (new.rowid, new.location);
+       END""",
+    "INSERT INTO events_location_fts(events_location_fts) VALUES ('rebuild')",
+]
+
+
+def _has_table(bind, name):
+    return bind.exec_driver_sql("SELECT 1 FROM sqlite_master WHERE name = ?", (name,)).first() is not None
+
+
+def upgrade():
+    bind = op.get_bind()
+    # Only databases where FTS5 was available have the old table to replace
+    if bind.dialect.name != "sqlite" or not _has_table(bind, "events_location_fts"):
+        return
+    try:
+        with bind.begin_nested():
+            create_location_search(bind)
+    except Exception as e:
+        logger.warning(f"Indexed location search unavailable, falling back to ILIKE scans: {str(e)}")
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != "sqlite" or not _has_table(bind, "events_location_fts_rows"):
+        return
+    for statement in SQLITE_FTS_TEARDOWN + LEGACY_FTS_SETUP:
+        op.execute(statement)
@@ -0,0 +1,76 @@
+"""Compare the default and FAST_JSON serialization of list responses.
+
+Usage (from backend/):
+    python -m scripts.bench_serialization [--items 100] [--rounds 200]
+
+Builds in-memory events with their creators (no database), renders them as
+List[EventResponse] through the pydantic path and through the direct row
+serializer with orjson, checks the bodies are byte-identical and prints the
+time per page for both.
+"""
+import argparse
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+
+def sample_events(count: int):
+    from app.models.models import Event, User
+
+    now = datetime.utcnow().replace(microsecond=123456)
+    creators = [
+        User(
+            id=str(uuid.uuid4()), telegram_id=1000 + i, name=f"Организатор {i}", avatar_url=None,
+            bio="Loves board games", interests=["music", "sport", "games"], photos=[],
+            created_at=now, updated_at=now,
+        )
+        for i in range(max(count // 5, 1))
+    ]
+    return [
+        Event(
+            id=str(uuid.uuid4()), creator_id=creators[i % len(creators)].id, creator=creators[i % len(creators)],
+            title=f"Event {i}", description="Board games and tea, bring a friend", location="Moscow, Gorky Park",
+            latitude=55.7298 + i / 10000, longitude=37.6011, datetime=now + timedelta(days=i % 30),
+            is_open=True, type="custom", created_at=now - timedelta(minutes=i), updated_at=now,
+            pending_count=i % 7, accepted_count=i % 3,
+        )
+        for i in range(count)
+    ]
+
+def per_call(render, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        render()
+    return (time.perf_counter() - start) / rounds
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=100, help="events per page")
+    parser.add_argument("--rounds", type=int, default=200, help="pages rendered per path")
+    args = parser.parse_args()
+
+    from app.schemas.schemas import EventResponse
+    from app.services import serialization
+
+    if serialization.orjson is None:
+        sys.exit("orjson is not installed")
+    events = sample_events(args.items)
+    model = List[EventResponse]
+
+    def render(fast: bool) -> bytes:
+        serialization.FAST_JSON = fast
+        return serialization.render_json(model, events)
+
+    default_body, fast_body = render(False), render(True)
+    if default_body != fast_body:
+        sys.exit("FAST_JSON output differs from the default path")
+
+    default_time = per_call(lambda: render(False), args.rounds)
+    fast_time = per_call(lambda: render(True), args.rounds)
+    print(f"{args.items} events, {len(default_body)} bytes per page")
+    print(f"default:   {default_time * 1000:.3f} ms")
+    print(f"FAST_JSON: {fast_time * 1000:.3f} ms ({default_time / fast_time:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""Print the query plan of every SQL statement the API routes run.
+
+Usage (from backend/):
+    python -m scripts.explain_queries [--fail-on-scan] [--database-url URL]
+
+Each route is called once through the app against a scratch database (a
+throwaway SQLite file unless --database-url is given; the script writes sample
+rows, so never point it at real data). Every SELECT/UPDATE/DELETE it issues is
+then run through EXPLAIN QUERY PLAN (SQLite) or EXPLAIN with sequential scans
+discouraged (PostgreSQL). Full table scans are marked with "!!"; with
+--fail-on-scan the script exits non-zero when there are any, so it can gate CI.
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+EXPLAINED = ("SELECT", "UPDATE", "DELETE")
+
+# "SCAN events" is a table scan; "SCAN events USING INDEX ..." walks an index instead
+SQLITE_TABLE_SCAN = re.compile(r"^SCAN \S+$")
+POSTGRES_TABLE_SCAN = re.compile(r"Seq Scan on")
+
+def route_calls(client):
+    """Call every route once, in an order where each call has the rows it needs"""
+    def call(method, url, **kwargs):
+        response = client.request(method, url, **kwargs)
+        assert response.status_code < 400, f"{method} {url} -> {response.status_code}: {response.text}"
+        return response.json() if response.content else None
+
+    start = (datetime.utcnow() + timedelta(days=2)).isoformat()
+    event_body = {
+        "title": "Board games",
+        "description": "Explain plan sample",
+        "location": "Moscow, Gorky Park",
+        "datetime": start,
+        "type": "custom",
+        "latitude": 55.7298,
+        "longitude": 37.6011,
+    }
+
+    yield "POST /users/"
+    creator = call("POST", "/users/", json={"telegram_id": 9000001, "name": "Creator", "interests": ["games"]})
+    guest = call("POST", "/users/", json={"telegram_id": 9000002, "name": "Guest", "interests": ["games"]})
+    yield "GET /users/{user_id}"
+    call("GET", f"/users/{creator['id']}")
+    yield "GET /users/telegram/{telegram_id}"
+    call("GET", "/users/telegram/9000001")
+    yield "GET /users/batch"
+    call("GET", "/users/batch", params={"ids": f"{creator['id']},{guest['id']}"})
+    yield "GET /users/by-interest"
+    call("GET", "/users/by-interest", params={"interest": "games"})
+    yield "PUT /users/{user_id}"
+    call("PUT", f"/users/{guest['id']}", json={"interests": ["games", "music"]})
+
+    yield "POST /events/"
+    event = call("POST", "/events/", params={"user_id": creator["id"]}, json=event_body)
+    call("POST", "/events/", params={"user_id": creator["id"]}, json=dict(event_body, title="Chess"))
+    yield "GET /events/"
+    call("GET", "/events/")
+    yield "GET /events/?event_type&is_open"
+    call("GET", "/events/", params={"event_type": "custom", "is_open": True})
+    yield "GET /events/?location"
+    call("GET", "/events/", params={"location": "gorky"})
+    yield "GET /events/?interest"
+    call("GET", "/events/", params={"interest": "games"})
+    yield "GET /events/?cursor"
+    cursor = client.get("/events/", params={"limit": 1}).headers["X-Next-Cursor"]
+    call("GET", "/events/", params={"limit": 1, "cursor": cursor})
+    yield "GET /events/feed"
+    call("GET", "/events/feed", params={"user_id": guest["id"], "lat": 55.75, "lon": 37.61})
+    yield "GET /events/nearby"
+    call("GET", "/events/nearby", params={"lat": 55.75, "lon": 37.61, "radius_km": 5})
+    yield "GET /events/locations"
+    call("GET", "/events/locations", params={"q": "mos"})
+    yield "GET /events/{event_id}"
+    call("GET", f"/events/{event['id']}")
+    yield "GET /events/user/{user_id}"
+    call("GET", f"/events/user/{creator['id']}")
+    yield "PUT /events/{event_id}"
+    call("PUT", f"/events/{event['id']}", params={"user_id": creator["id"]}, json={"location": "Moscow, VDNKh"})
+
+    yield "POST /responses/"
+    response = call("POST", "/responses/", params={"user_id": guest["id"]}, json={"event_id": event["id"]})
+    yield "GET /responses/event/{event_id}"
+    call("GET", f"/responses/event/{event['id']}", params={"user_id": creator["id"]})
+    yield "GET /responses/event/{event_id}/queue"
+    queue_url = f"/responses/event/{event['id']}/queue"
+    cursor = client.get(queue_url, params={"user_id": creator["id"], "status": "pending", "limit": 1}).headers["X-Next-Cursor"]
+    call("GET", queue_url, params={"user_id": creator["id"], "status": "pending", "cursor": cursor})
+    yield "GET /responses/user/{user_id}"
+    call("GET", f"/responses/user/{guest['id']}")
+    yield "PUT /responses/{response_id}"
+    call("PUT", f"/responses/{response['id']}", params={"user_id": creator["id"]}, json={"status": "accepted"})
+    yield "PUT /responses/batch"
+    call("PUT", "/responses/batch", params={"user_id": creator["id"]}, json={
+        "event_id": event["id"], "decisions": [{"id": response["id"], "status": "rejected"}]
+    })
+
+    yield "DELETE /events/{event_id}"
+    call("DELETE", f"/events/{event['id']}", params={"user_id": creator["id"]})
+    yield None
+
+def capture_statements(engine, client):
+    """(route, statement, parameters) for every statement worth explaining, in call order"""
+    from sqlalchemy import event
+
+    captured = []
+    current = [None]
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if current[0] and not executemany and statement.lstrip().upper().startswith(EXPLAINED):
+            captured.append((current[0], statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        for route in route_calls(client):
+            current[0] = route
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return captured
+
+def explain(engine, statement, parameters):
+    """Plan lines for the statement and whether any of them is a full table scan"""
+    with engine.connect() as conn:
+        if engine.dialect.name == "postgresql":
+            conn.exec_driver_sql("SET enable_seqscan = off")
+            lines = [row[0] for row in conn.exec_driver_sql(f"EXPLAIN {statement}", parameters)]
+            scans = [line for line in lines if POSTGRES_TABLE_SCAN.search(line)]
+        else:
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+            lines = [row[-1] for row in rows]
+            scans = [line for line in lines if SQLITE_TABLE_SCAN.match(line.strip())]
+        conn.rollback()
+    return lines, scans
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="scratch database to run against (default: temporary SQLite file)")
+    parser.add_argument("--fail-on-scan", action="store_true", help="exit with status 1 if any statement scans a whole table")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/explain.db"
+    # Plans come from the sync engine, so always mount the sync routers
+    os.environ["ASYNC_DB"] = "false"
+    os.environ["QUERY_BUDGET"] = "0"
+
+    from fastapi.testclient import TestClient
+    from app.database import engine
+    from app.main import app
+
+    statements = capture_statements(engine, TestClient(app))
+
+    total_scans = 0
+    last_route = None
+    seen = set()
+    for route, statement, parameters in statements:
+        if route != last_route:
+            print(f"\n=== {route}")
+            last_route = route
+            seen.clear()
+        key = " ".join(statement.split())
+        if key in seen:
+            continue
+        seen.add(key)
+        lines, scans = explain(engine, statement, parameters)
+        total_scans += len(scans)
+        print(f"\n{key}")
+        for line in lines:
+            print(f"  {'!!' if line in scans else '  '} {line}")
+
+    print(f"\n{len(statements)} statements, {total_scans} full table scans")
+    if args.fail_on_scan and total_scans:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""Export a table as NDJSON or CSV, streamed in primary key order.
+
+Usage (from backend/):
+    python -m scripts.export_data {events,responses,users} [--format ndjson|csv] [--gzip] [--output FILE]
+
+Reads DATABASE_URL through a server-side cursor in batches of
+EXPORT_BATCH_SIZE rows (or --batch-size) and writes each batch as it
+arrives, so memory use stays flat however large the table is. Writes to
+stdout unless --output is given. Same output as GET /admin/export/{table}.
+"""
+import argparse
+import sys
+
+def main():
+    from app.services.export import EXPORT_BATCH_SIZE, EXPORT_FORMATS, EXPORT_TABLES
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("table", choices=list(EXPORT_TABLES))
+    parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="ndjson")
+    parser.add_argument("--gzip", action="store_true", help="compress the output")
+    parser.add_argument("--output", help="file to write instead of stdout")
+    parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE, help="rows fetched per round trip")
+    args = parser.parse_args()
+
+    from app.database import engine
+    from app.services.export import export_chunks
+
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        for chunk in export_chunks(engine, args.table, args.format, args.gzip, args.batch_size):
+            out.write(chunk)
+    finally:
+        if args.output:
+            out.close()
+
+if __name__ == "__main__":
+    main()
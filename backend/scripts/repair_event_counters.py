@@ -0,0 +1,40 @@
+"""Recompute every event's pending/accepted response counters.
+
+Usage (from backend/):
+    python -m scripts.repair_event_counters [--dry-run]
+
+The counters are kept current by the response routes, so this only matters
+after writes that bypass them (manual SQL, restored backups) or to check for
+drift. Runs against DATABASE_URL with one GROUP BY over event_responses and
+one bulk UPDATE of the events that differ.
+"""
+import argparse
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="report drifted events without fixing them")
+    args = parser.parse_args()
+
+    from app.database import SessionLocal
+    from app.services.cache import event_cache
+    from app.services.counters import drifted_counters_query, repair_event_counters
+
+    db = SessionLocal()
+    try:
+        if args.dry_run:
+            rows = db.execute(drifted_counters_query()).all()
+            for row in rows:
+                print(f"{row.id}: pending={row.pending_count} accepted={row.accepted_count}")
+            print(f"{len(rows)} events with drifted counters")
+        else:
+            fixed = repair_event_counters(db)
+            db.commit()
+            if fixed:
+                # Reaches the workers when they share the cache through Redis; local caches expire on their own
+                event_cache.invalidate_all()
+            print(f"{fixed} events repaired")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""Close past events, archive old ones and purge stale bookkeeping rows once.
+
+Usage (from backend/):
+    python -m scripts.run_maintenance [--retention-days N] [--repair-counters]
+
+The API workers run the same pass every MAINTENANCE_INTERVAL seconds; this
+runs it on demand (cron, after a restore) against DATABASE_URL and prints
+how many rows each step touched.
+"""
+import argparse
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--retention-days", type=int, help="archive events older than this (default EVENT_RETENTION_DAYS, 0 skips archiving)")
+    parser.add_argument("--repair-counters", action="store_true", help="also recompute drifted response counters")
+    args = parser.parse_args()
+
+    from app.services.maintenance import MaintenanceJob, EVENT_RETENTION_DAYS, MAINTENANCE_REPAIR_COUNTERS
+
+    job = MaintenanceJob(
+        retention_days=EVENT_RETENTION_DAYS if args.retention_days is None else args.retention_days,
+        repair_counters=args.repair_counters or MAINTENANCE_REPAIR_COUNTERS,
+    )
+    for name, count in job.run_once().items():
+        print(f"{name}: {count}")
+
+if __name__ == "__main__":
+    main()
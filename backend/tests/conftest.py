@@ -0,0 +1,52 @@
+import os
+import tempfile
+
+# The app reads its settings at import time: point it at a scratch database,
+# verify initData with a known bot token and report X-Query-Count on every response
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/test.db"
+os.environ["DEBUG_MODE"] = "false"
+os.environ["TELEGRAM_BOT_TOKEN"] = "123456:test-token"
+os.environ["QUERY_BUDGET"] = "100"
+os.environ.pop("EVENT_CACHE_REDIS_URL", None)
+os.environ.pop("REALTIME_REDIS_URL", None)
+
+import itertools
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from tests.fake_bot_api import FakeBotAPI
+
+_telegram_ids = itertools.count(1000)
+
+@pytest.fixture(scope="session")
+def client():
+    return TestClient(app)
+
+@pytest.fixture
+def make_user(client):
+    def make(name="Test User", interests=("music", "sport")):
+        response = client.post("/users/", json={"telegram_id": next(_telegram_ids), "name": name, "interests": list(interests)})
+        assert response.status_code == 200, response.text
+        return response.json()
+    return make
+
+@pytest.fixture
+def make_event(client):
+    def make(user, title="Board games", location="Moscow, Gorky Park", **fields):
+        body = {"title": title, "description": "Bring a friend", "location": location, "datetime": "2030-01-01T10:00:00", **fields}
+        response = client.post("/events/", params={"user_id": user["id"]}, json=body)
+        assert response.status_code == 200, response.text
+        return response.json()
+    return make
+
+@pytest.fixture
+def fake_bot_api(monkeypatch):
+    """Send Bot API calls to a local FakeBotAPI for the duration of a test"""
+    import telebot
+
+    api = FakeBotAPI()
+    monkeypatch.setattr(telebot.apihelper, "API_URL", api.url + "/bot{0}/{1}")
+    yield api
+    api.close()
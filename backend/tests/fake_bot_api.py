@@ -0,0 +1,76 @@
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+class FakeBotAPI:
+    """A local stand-in for api.telegram.org: records calls and answers from a script.
+
+    Queue (http status, json body) replies with reply(); calls without a
+    scripted reply succeed. Each call is recorded as (time, method, params).
+    """
+
+    def __init__(self):
+        self.calls = []
+        self._replies = deque()
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0)).decode()
+                path, _, query = self.path.partition("?")
+                # telebot sends parameters in the query string, files and JSON in the body
+                params = {key: values[0] for key, values in parse_qs(query).items()}
+                if "json" in (self.headers.get("Content-Type") or ""):
+                    params.update(json.loads(body or "{}"))
+                else:
+                    params.update({key: values[0] for key, values in parse_qs(body).items()})
+                method = path.rsplit("/", 1)[-1]
+                api.calls.append((time.monotonic(), method, params))
+                status, payload = api._replies.popleft() if api._replies else (200, None)
+                payload = payload or api.ok(method, params)
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            # telebot uses GET for calls without a body
+            do_GET = do_POST
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @staticmethod
+    def ok(method, params):
+        if method == "sendMessage":
+            chat_id = int(params.get("chat_id", 0))
+            return {"ok": True, "result": {
+                "message_id": 1, "date": int(time.time()), "chat": {"id": chat_id, "type": "private"},
+                "text": params.get("text", ""),
+            }}
+        return {"ok": True, "result": True}
+
+    def reply(self, status: int, error_code: int = None, description: str = "", **parameters):
+        """Script the next reply; a non-200 status becomes a Bot API error"""
+        if status == 200:
+            self._replies.append((200, None))
+            return
+        payload = {"ok": False, "error_code": error_code or status, "description": description}
+        if parameters:
+            payload["parameters"] = parameters
+        self._replies.append((status, payload))
+
+    def sent(self, method="sendMessage"):
+        return [params for _, name, params in self.calls if name == method]
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,71 @@
+import threading
+import time
+
+class FakeRedis:
+    """A local stand-in for the redis-py client, covering the commands RedisBackend sends.
+
+    Values are bytes and keys expire like in Redis. latency makes every
+    command sleep first, standing in for a slow network round trip.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.commands = 0
+        self._lock = threading.Lock()
+        self._data = {}
+
+    def _call(self):
+        self.commands += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _live(self, key):
+        value, expires_at = self._data.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    def get(self, key):
+        self._call()
+        with self._lock:
+            return self._live(key)
+
+    def mget(self, keys):
+        self._call()
+        with self._lock:
+            return [self._live(key) for key in keys]
+
+    def set(self, key, value, px=None):
+        self._call()
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + px / 1000 if px else None)
+
+    def info(self, section):
+        return {"evicted_keys": 0}
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+class FakePipeline:
+    def __init__(self, redis: FakeRedis):
+        self.redis = redis
+        self._queued = []
+
+    def incr(self, key):
+        self._queued.append(("incr", key, None))
+
+    def pexpire(self, key, ms):
+        self._queued.append(("pexpire", key, ms))
+
+    def execute(self):
+        self.redis._call()
+        with self.redis._lock:
+            for command, key, ms in self._queued:
+                value = self.redis._live(key)
+                if command == "incr":
+                    expires_at = self.redis._data.get(key, (None, None))[1]
+                    self.redis._data[key] = (str(int(value or 0) + 1).encode(), expires_at)
+                elif value is not None:
+                    self.redis._data[key] = (value, time.monotonic() + ms / 1000)
+        self._queued = []
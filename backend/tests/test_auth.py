@@ -0,0 +1,81 @@
+import hashlib
+import hmac
+import time
+
+import pytest
+
+from app.database import SessionLocal
+from app.models.models import User
+from app.routers import users, users_async
+from benchmarks.scenarios import init_data
+
+BOT_TOKEN = "123456:test-token"
+# Telegram.WebApp.initData as Telegram signed it for this bot token (a published test vector)
+REAL_BOT_TOKEN = "5768337691:AAH5YkoiEuPk8-FZa32hStHTqXiLPtAEhx8"
+REAL_INIT_DATA = (
+    "query_id=AAHdF6IQAAAAAN0XohDhrOrc&user=%7B%22id%22%3A279058397%2C%22first_name%22%3A%22Vladislav%22%2C"
+    "%22last_name%22%3A%22Kibenko%22%2C%22username%22%3A%22vdkfrost%22%2C%22language_code%22%3A%22ru%22%2C"
+    "%22is_premium%22%3Atrue%7D&auth_date=1662771648&hash=c501b71e775f74ce10e377dea85a7ea24ecd640b223ea86dfe453e0eaed2e2b2"
+)
+
+def web_app_key(bot_token):
+    return hmac.new(b"WebAppData", bot_token.encode(), hashlib.sha256).digest()
+
+def login_widget_signed(telegram_id, name="Anna"):
+    """initData signed with the Login Widget scheme, which Mini App data must not pass"""
+    auth_date = int(time.time())
+    data_check_string = f"auth_date={auth_date}\nfirst_name={name}\nid={telegram_id}"
+    signature = hmac.new(hashlib.sha256(BOT_TOKEN.encode()).digest(), data_check_string.encode(), hashlib.sha256).hexdigest()
+    return signed(telegram_id, name).rsplit("hash=", 1)[0] + f"hash={signature}"
+
+def signed(telegram_id, name="Anna", bot_token=BOT_TOKEN, auth_date=None):
+    return init_data(telegram_id, name, bot_token, auth_date or int(time.time()))
+
+def user_rows(telegram_id):
+    with SessionLocal() as db:
+        return db.query(User).filter(User.telegram_id == telegram_id).count()
+
+def test_signed_init_data_gets_a_session(client):
+    response = client.post("/users/auth", json={"initData": signed(2_000_001)})
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["telegram_id"] == 2_000_001 and body["session_token"]
+    me = client.get(f"/users/{body['id']}", headers={"Authorization": f"Bearer {body['session_token']}"})
+    assert me.status_code == 200
+
+def test_real_telegram_init_data_verifies():
+    assert users.init_data_signature_valid(REAL_INIT_DATA, web_app_key(REAL_BOT_TOKEN))
+    assert not users.init_data_signature_valid(REAL_INIT_DATA.replace("Vladislav", "Vladimir"), web_app_key(REAL_BOT_TOKEN))
+    assert not users.init_data_signature_valid(REAL_INIT_DATA, web_app_key(BOT_TOKEN))
+
+def test_real_telegram_init_data_signs_in(client, monkeypatch):
+    monkeypatch.setattr(users, "TELEGRAM_AUTH_KEY", web_app_key(REAL_BOT_TOKEN))
+    # The vector is from 2022; only the signature is under test here
+    monkeypatch.setattr(users, "INIT_DATA_MAX_AGE", float("inf"))
+    response = client.post("/users/auth", json={"initData": REAL_INIT_DATA})
+    assert response.status_code == 200, response.text
+    assert response.json()["telegram_id"] == 279058397 and response.json()["name"] == "Vladislav"
+
+@pytest.mark.parametrize("payload", [
+    {"initData": signed(2_000_002, bot_token="654321:someone-else")},
+    {"initData": signed(2_000_002).replace("hash=", "hash=0")},
+    {"initData": signed(2_000_002).replace("Anna", "Eve")},
+    {"initData": login_widget_signed(2_000_002)},
+    {"initData": signed(2_000_002, auth_date=int(time.time()) - 2 * 86400)},
+    {"initData": ""},
+    {"initData": "not-init-data"},
+    {"initData": "user=%7B%22first_name%22%3A%22Anna%22%7D&auth_date=1&hash=abc"},
+    {"initData": "", "createNewUser": True},
+])
+def test_unverified_init_data_is_rejected(client, payload):
+    response = client.post("/users/auth", json=payload)
+    assert response.status_code == 401, response.text
+    assert "session_token" not in response.json()
+    assert user_rows(2_000_002) == 0
+
+def test_debug_mode_signs_in_the_test_user(client, monkeypatch):
+    monkeypatch.setattr(users, "DEBUG_MODE", True)
+    monkeypatch.setattr(users_async, "DEBUG_MODE", True)
+    response = client.post("/users/auth", json={"initData": ""})
+    assert response.status_code == 200
+    assert response.json()["telegram_id"] == 12345
@@ -0,0 +1,79 @@
+import pytest
+
+def get(client, path, **headers):
+    return client.get(path, headers=headers)
+
+@pytest.fixture
+def event(make_user, make_event):
+    return make_event(make_user("Creator"), title="Conditional", location="Etag Embankment")
+
+def test_reads_carry_validators(client, event):
+    response = get(client, f"/events/{event['id']}")
+    assert response.status_code == 200
+    assert response.headers["ETag"].startswith('W/"')
+    assert response.headers["Last-Modified"].endswith(" GMT")
+    assert response.headers["Cache-Control"] == "private, no-cache"
+
+@pytest.mark.parametrize("path", ["/events/{event_id}", "/users/{creator_id}"])
+def test_matching_etag_gets_304(client, event, path):
+    path = path.format(event_id=event["id"], creator_id=event["creator_id"])
+    etag = get(client, path).headers["ETag"]
+
+    for if_none_match in (etag, etag.removeprefix("W/"), f'W/"other", {etag}', "*"):
+        response = get(client, path, **{"If-None-Match": if_none_match})
+        assert response.status_code == 304, if_none_match
+        assert response.content == b"" and response.headers["ETag"] == etag
+
+    assert get(client, path, **{"If-None-Match": 'W/"other"'}).status_code == 200
+
+def test_user_by_telegram_id_gets_304(client, make_user):
+    user = make_user("Telegram")
+    path = f"/users/telegram/{user['telegram_id']}"
+    etag = get(client, path).headers["ETag"]
+    assert get(client, path, **{"If-None-Match": etag}).status_code == 304
+
+def test_if_modified_since(client, event):
+    path = f"/events/{event['id']}"
+    last_modified = get(client, path).headers["Last-Modified"]
+    assert get(client, path, **{"If-Modified-Since": last_modified}).status_code == 304
+    assert get(client, path, **{"If-Modified-Since": "Sat, 01 Jan 2000 00:00:00 GMT"}).status_code == 200
+    assert get(client, path, **{"If-Modified-Since": "yesterday"}).status_code == 200
+    # If-None-Match wins when both are sent
+    both = {"If-Modified-Since": last_modified, "If-None-Match": 'W/"other"'}
+    assert get(client, path, **both).status_code == 200
+
+def test_edits_change_the_etag(client, event):
+    path = f"/events/{event['id']}"
+    etag = get(client, path).headers["ETag"]
+
+    client.put(path, params={"user_id": event["creator_id"]}, json={"title": "Renamed"})
+    edited = get(client, path, **{"If-None-Match": etag})
+    assert edited.status_code == 200 and edited.json()["title"] == "Renamed"
+
+    # The event embeds its creator, so a profile edit is a new version of the event too
+    etag = edited.headers["ETag"]
+    client.put(f"/users/{event['creator_id']}", json={"name": "Renamed creator"})
+    assert get(client, path, **{"If-None-Match": etag}).status_code == 200
+
+def test_list_etag_follows_its_items(client, make_user, make_event, event):
+    path = "/events/?location=Etag Embankment"
+    listed = get(client, path)
+    etag = listed.headers["ETag"]
+    assert get(client, path, **{"If-None-Match": etag}).status_code == 304
+    # Lists only trust the ETag: a deletion doesn't move the newest updated_at
+    assert get(client, path, **{"If-Modified-Since": listed.headers["Last-Modified"]}).status_code == 200
+
+    make_event(make_user("Another"), title="Added", location="Etag Embankment")
+    assert get(client, path, **{"If-None-Match": etag}).status_code == 200
+
+    etag = get(client, path).headers["ETag"]
+    client.delete(f"/events/{event['id']}", params={"user_id": event["creator_id"]})
+    assert get(client, path, **{"If-None-Match": etag}).status_code == 200
+
+def test_fieldsets_get_their_own_etag(client, event):
+    path = f"/events/{event['id']}"
+    full = get(client, path).headers["ETag"]
+    sparse = get(client, f"{path}?fields=title").headers["ETag"]
+    assert sparse != full
+    assert get(client, f"{path}?fields=title", **{"If-None-Match": full}).status_code == 200
+    assert get(client, f"{path}?fields=title", **{"If-None-Match": sparse}).status_code == 304
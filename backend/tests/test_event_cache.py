@@ -0,0 +1,87 @@
+import asyncio
+import time
+from datetime import datetime
+
+import pytest
+
+from app.services.cache import CachedPage, EventCache, LocalBackend, RedisBackend
+from tests.fake_redis import FakeRedis
+
+PAGE = CachedPage(body=b'{"id": "e1"}', etag='"v1"', last_modified=datetime(2030, 1, 1, 10, 0))
+
+@pytest.fixture(params=["local", "redis"])
+def backend(request):
+    return LocalBackend() if request.param == "local" else RedisBackend(FakeRedis())
+
+def test_entries_round_trip_and_expire(backend):
+    assert backend.get("k") is None
+    backend.set("k", b"value", ttl=0.05)
+    assert backend.get("k") == b"value"
+    time.sleep(0.06)
+    assert backend.get("k") is None
+
+def test_versions_start_at_zero_and_bump(backend):
+    assert backend.versions(["a", "b"]) == [0, 0]
+    backend.bump(["a"], keep_for=60)
+    backend.bump(["a", "b"], keep_for=60)
+    assert backend.versions(["b", "a", "c"]) == [1, 2, 0]
+
+def test_invalidation_moves_keys(backend):
+    cache = EventCache(backend, ttl=60)
+    event_key = cache.event_key("e1")
+    open_custom = cache.list_key(0, 20, "custom", None, None, True, None)
+    open_city = cache.list_key(0, 20, "city", None, None, True, None)
+    cache.put(event_key, PAGE)
+    assert cache.get(cache.event_key("e1")) == PAGE
+
+    cache.invalidate_event("e1", ("custom", True))
+    assert cache.event_key("e1") != event_key and cache.get(cache.event_key("e1")) is None
+    assert cache.list_key(0, 20, "custom", None, None, True, None) != open_custom
+    assert cache.list_key(0, 20, "city", None, None, True, None) == open_city
+
+    cache.invalidate_all()
+    assert cache.list_key(0, 20, "city", None, None, True, None) != open_city
+
+def test_backend_errors_are_misses():
+    def down(*args):
+        raise ConnectionError("Redis is down")
+
+    broken = FakeRedis()
+    broken.mget = broken.get = down
+    cache = EventCache(RedisBackend(broken), ttl=60)
+    assert cache.event_key("e1") is None
+    assert cache.get("events:event:0.0:e1:") is None
+    assert cache.counters["errors"] == 2
+
+def test_offload_keeps_the_event_loop_free():
+    cache = EventCache(RedisBackend(FakeRedis(latency=0.1)), ttl=60)
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticking = asyncio.create_task(ticker())
+        start = time.perf_counter()
+        await asyncio.gather(*(cache.offload(cache.get, f"k{n}") for n in range(5)))
+        elapsed = time.perf_counter() - start
+        ticking.cancel()
+        return elapsed, ticks
+
+    elapsed, ticks = asyncio.run(main())
+    # Five 100 ms round trips overlap in the threadpool, and the loop keeps ticking meanwhile
+    assert elapsed < 0.4
+    assert ticks >= 5
+
+def test_local_backend_is_called_inline():
+    cache = EventCache(LocalBackend(), ttl=60)
+    cache.put("k", PAGE)
+
+    async def main():
+        return await cache.offload(cache.get, "k")
+
+    assert asyncio.run(main()) == PAGE
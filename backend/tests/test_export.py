@@ -0,0 +1,87 @@
+import asyncio
+import csv
+import io
+import json
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.database import DATABASE_URL, SessionLocal, engine, get_async_database_url
+from app.models.models import Event
+from app.services import sessions
+from app.services.export import export_chunks, export_chunks_async
+
+@pytest.fixture
+def admin(monkeypatch):
+    monkeypatch.setattr(sessions, "ADMIN_TOKEN", "export-secret")
+    return {"X-Admin-Token": "export-secret"}
+
+def export(client, admin, table, **params):
+    response = client.get(f"/admin/export/{table}", params=params, headers=admin)
+    assert response.status_code == 200, response.text
+    return response
+
+def test_export_needs_the_admin_token(client, monkeypatch):
+    assert client.get("/admin/export/events").status_code == 404
+    monkeypatch.setattr(sessions, "ADMIN_TOKEN", "export-secret")
+    assert client.get("/admin/export/events", headers={"X-Admin-Token": "guess"}).status_code == 403
+
+def test_events_export_as_ndjson(client, admin, make_user, make_event):
+    event = make_event(make_user("Exporter"), title="Exported")
+
+    response = export(client, admin, "events")
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.headers["content-disposition"] == 'attachment; filename="events.ndjson"'
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    with SessionLocal() as db:
+        assert len(rows) == db.query(Event).count()
+    assert [row["id"] for row in rows] == sorted(row["id"] for row in rows)
+    exported = next(row for row in rows if row["id"] == event["id"])
+    assert exported["title"] == "Exported" and exported["datetime"] == "2030-01-01T10:00:00"
+
+def test_users_export_as_csv_with_lists_as_json(client, admin, make_user):
+    user = make_user("Csv", interests=["music", "chess"])
+
+    response = export(client, admin, "users", format="csv")
+
+    assert response.headers["content-type"].startswith("text/csv")
+    records = list(csv.DictReader(io.StringIO(response.text)))
+    exported = next(record for record in records if record["id"] == user["id"])
+    assert exported["name"] == "Csv"
+    assert json.loads(exported["interests"]) == ["music", "chess"]
+
+def test_gzip_export_has_the_same_rows(client, admin, make_user):
+    make_user("Compressed")
+    plain = export(client, admin, "users")
+    compressed = export(client, admin, "users", gzip=True)
+    assert compressed.headers["content-encoding"] == "gzip"
+    # httpx undoes the Content-Encoding
+    assert compressed.content == plain.content
+
+@pytest.mark.parametrize("table, params, status", [("secrets", {}, 404), ("events", {"format": "xml"}, 400)])
+def test_unknown_table_or_format(client, admin, table, params, status):
+    assert client.get(f"/admin/export/{table}", params=params, headers=admin).status_code == status
+
+def test_small_batches_give_the_same_bytes(make_user):
+    for n in range(5):
+        make_user(f"Batched {n}")
+
+    whole = list(export_chunks(engine, "users", "csv", batch_size=10_000))
+    batched = list(export_chunks(engine, "users", "csv", batch_size=2))
+
+    # The header, then a chunk per batch of two rows
+    assert len(batched) > len(whole)
+    assert b"".join(batched) == b"".join(whole)
+
+def test_async_export_matches_sync(make_user):
+    make_user("Async export")
+
+    async def collect():
+        async_engine = create_async_engine(get_async_database_url(DATABASE_URL))
+        try:
+            return [chunk async for chunk in export_chunks_async(async_engine, "users", "ndjson", batch_size=3)]
+        finally:
+            await async_engine.dispose()
+
+    assert b"".join(asyncio.run(collect())) == b"".join(export_chunks(engine, "users", "ndjson"))
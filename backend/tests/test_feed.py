@@ -0,0 +1,67 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.services.feed import _POPCOUNT, InterestIndex
+
+def user(user_id, *interests, updated_at=datetime(2030, 1, 1)):
+    return SimpleNamespace(id=user_id, interests=list(interests), updated_at=updated_at)
+
+def overlaps(index, viewer, creators):
+    user_bits, creator_bits = index.bitsets(viewer, creators)
+    return _POPCOUNT[creator_bits & user_bits].sum(axis=1).tolist()
+
+def test_bitsets_count_shared_interests():
+    index = InterestIndex()
+    anna = user("anna", "Music", "sport", "chess")
+    boris = user("boris", "music", "Chess")
+    vera = user("vera", "cooking")
+
+    # Repeated creators share a row; a missing creator overlaps with nothing
+    assert overlaps(index, anna, [boris, vera, None, boris]) == [2, 0, 0, 2]
+
+def test_updated_users_are_re_encoded():
+    index = InterestIndex()
+    anna = user("anna", "music")
+    boris = user("boris", "sport")
+    assert overlaps(index, anna, [boris]) == [0]
+    boris = user("boris", "sport", "music", updated_at=datetime(2030, 1, 2))
+    assert overlaps(index, anna, [boris]) == [1]
+
+def test_least_recently_scored_users_are_dropped():
+    index = InterestIndex(max_users=3)
+    viewer = user("viewer", "music")
+    index.bitsets(viewer, [user(f"creator-{n}", "music") for n in range(10)])
+    assert index.stats()["users"] == 3
+
+    index.bitsets(viewer, [user("creator-0", "music")])
+    assert index.stats()["users"] == 3
+
+def test_vocabulary_starts_over_with_the_interests_in_use():
+    index = InterestIndex(max_interests=4)
+    viewer = user("viewer", "music")
+    index.bitsets(viewer, [user(f"creator-{n}", f"interest {n}") for n in range(6)])
+    assert index.stats()["interests"] == 7
+
+    # The next pass finds the vocabulary too big and encodes only the users it scores
+    assert overlaps(index, viewer, [user("boris", "music", "chess")]) == [1]
+    assert index.stats() == {"interests": 2, "users": 2}
+
+def test_bitsets_are_packed_to_the_vocabulary_width():
+    index = InterestIndex()
+    viewer = user("viewer", *[f"interest {n}" for n in range(20)])
+    user_bits, creator_bits = index.bitsets(viewer, [user("boris", "interest 19")])
+    assert user_bits.shape == (3,) and creator_bits.shape == (1, 3)
+    assert creator_bits.dtype == np.uint8
+
+def test_feed_ranks_shared_interests_first(client, make_user, make_event):
+    viewer = make_user("Viewer", interests=["board games"])
+    shared = make_event(make_user("Gamer", interests=["Board Games", "chess"]))
+    other = make_event(make_user("Cook", interests=["cooking"]))
+
+    response = client.get("/events/feed", params={"user_id": viewer["id"], "limit": 100})
+
+    assert response.status_code == 200, response.text
+    scores = {event["id"]: event["score"] for event in response.json()}
+    assert scores[shared["id"]] > scores.get(other["id"], 0)
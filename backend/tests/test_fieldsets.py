@@ -0,0 +1,88 @@
+import json
+from typing import List
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event as sa_event
+
+from app.database import SessionLocal, engine
+from app.models.models import Event
+from app.services.fieldsets import EVENT_FIELDS, Fieldset, fieldset_options, fieldset_schema, parse_fieldset
+from app.services.serialization import render_json
+
+@pytest.mark.parametrize("fields, embed, expected", [
+    (None, None, None),
+    # Schema order, with id always included
+    ("title", None, Fieldset(("title", "id"), None)),
+    (" datetime , title ", None, Fieldset(("title", "datetime", "id"), None)),
+    ("title,creator.name", None, Fieldset(("title", "id"), ("name", "id"))),
+    ("title", "creator", Fieldset(("title", "id"), ("name", "avatar_url", "bio", "interests", "photos", "id", "telegram_id", "created_at", "updated_at"))),
+])
+def test_parse_fieldset(fields, embed, expected):
+    assert parse_fieldset(EVENT_FIELDS, fields, embed) == expected
+
+def test_embed_alone_keeps_every_field():
+    fieldset = parse_fieldset(EVENT_FIELDS, None, "creator")
+    assert set(fieldset.fields) == set(EVENT_FIELDS.schema.model_fields) - {"creator"}
+    assert fieldset.embed is not None
+
+@pytest.mark.parametrize("fields, embed", [("nope", None), ("creator.nope", None), ("creator", None), (None, "user")])
+def test_unknown_names_are_rejected(fields, embed):
+    with pytest.raises(HTTPException) as error:
+        parse_fieldset(EVENT_FIELDS, fields, embed)
+    assert error.value.status_code == 400
+
+def test_sparse_event_has_only_the_requested_fields(client, make_user, make_event):
+    event = make_event(make_user("Creator"))
+    response = client.get(f"/events/{event['id']}", params={"fields": "title,creator.name"})
+    assert response.status_code == 200, response.text
+    assert response.json() == {"id": event["id"], "title": event["title"], "creator": {"id": event["creator_id"], "name": "Creator"}}
+
+    listed = client.get("/events/", params={"fields": "title", "limit": 5})
+    assert {key for item in listed.json() for key in item} == {"id", "title"}
+
+    bad = client.get(f"/events/{event['id']}", params={"fields": "secret"})
+    assert bad.status_code == 400
+
+def test_sparse_response_list(client, make_user, make_event):
+    creator = make_user("Creator")
+    event = make_event(creator)
+    respondent = make_user("Respondent")
+    client.post("/responses/", params={"user_id": respondent["id"]}, json={"event_id": event["id"]})
+
+    response = client.get(f"/responses/event/{event['id']}",
+                          params={"user_id": creator["id"], "fields": "status,user.name"})
+
+    assert response.status_code == 200, response.text
+    assert [{key: item[key] for key in ("status", "user")} for item in response.json()] == [
+        {"status": "pending", "user": {"id": respondent["id"], "name": "Respondent"}}
+    ]
+    assert set(response.json()[0]) == {"id", "status", "user"}
+
+@pytest.fixture
+def statements():
+    """SQL sent by the sync engine while the test runs"""
+    sent = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        sent.append(statement)
+
+    sa_event.listen(engine, "before_cursor_execute", record)
+    yield sent
+    sa_event.remove(engine, "before_cursor_execute", record)
+
+def test_only_requested_columns_load_and_nothing_lazy_loads(make_user, make_event, statements):
+    event = make_event(make_user("Creator"))
+    fieldset = parse_fieldset(EVENT_FIELDS, "title,creator.name", None)
+
+    with SessionLocal() as db:
+        statements.clear()
+        events = db.query(Event).options(*fieldset_options(EVENT_FIELDS, fieldset)).filter(Event.id == event["id"]).all()
+        body = render_json(List[fieldset_schema(EVENT_FIELDS, fieldset)], events)
+
+    # One SELECT with the creator joined in, and serializing it touched nothing unloaded
+    assert len(statements) == 1
+    select_list = statements[0].split(" FROM ")[0]
+    assert "events.title" in select_list and "users_1.name" in select_list
+    assert "events.description" not in select_list and "users_1.bio" not in select_list
+    assert json.loads(body) == [{"id": event["id"], "title": event["title"], "creator": {"id": event["creator_id"], "name": "Creator"}}]
@@ -0,0 +1,21 @@
+import pytest
+
+from app.services import sessions
+
+INTERNAL_ENDPOINTS = ["/internal/db-pool", "/internal/event-cache", "/internal/realtime", "/internal/maintenance"]
+
+@pytest.fixture
+def admin_token(monkeypatch):
+    monkeypatch.setattr(sessions, "ADMIN_TOKEN", "ops-secret")
+    return "ops-secret"
+
+@pytest.mark.parametrize("path", INTERNAL_ENDPOINTS)
+def test_internal_endpoints_need_the_admin_token(client, admin_token, path):
+    assert client.get(path).status_code == 403
+    assert client.get(path, headers={"X-Admin-Token": "guess"}).status_code == 403
+    response = client.get(path, headers={"X-Admin-Token": admin_token})
+    assert response.status_code == 200, response.text
+
+@pytest.mark.parametrize("path", INTERNAL_ENDPOINTS)
+def test_internal_endpoints_are_off_without_an_admin_token(client, path):
+    assert client.get(path).status_code == 404
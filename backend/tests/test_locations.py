@@ -0,0 +1,62 @@
+from sqlalchemy import text
+
+from app.database import engine
+
+def titles(client, location):
+    response = client.get("/events/", params={"location": location, "limit": 100})
+    assert response.status_code == 200, response.text
+    return {event["title"] for event in response.json()}
+
+def test_location_search_survives_vacuum(client, make_user, make_event):
+    user = make_user()
+    doomed = make_event(user, title="Doomed", location="Vacuum Park West")
+    make_event(user, title="Renamed", location="Somewhere else")
+    make_event(user, title="Kept", location="Vacuum Park East")
+    client.delete(f"/events/{doomed['id']}", params={"user_id": user["id"]})
+    renamed = [e for e in client.get(f"/events/user/{user['id']}").json() if e["title"] == "Renamed"][0]
+    client.put(f"/events/{renamed['id']}", params={"user_id": user["id"]}, json={"location": "Vacuum Park North"})
+
+    with engine.connect() as conn:
+        conn.execution_options(isolation_level="AUTOCOMMIT").execute(text("VACUUM"))
+
+    assert titles(client, "vacuum park") == {"Kept", "Renamed"}
+    assert titles(client, "park east") == {"Kept"}
+
+def suggestions(client, prefix, **params):
+    response = client.get("/events/locations", params={"q": prefix, **params})
+    assert response.status_code == 200, response.text
+    return [(item["name"], item["event_count"]) for item in response.json()]
+
+def test_location_search_matches_substrings_case_insensitively(client, make_user, make_event):
+    user = make_user()
+    make_event(user, title="Riverside", location="Zelenograd, Riverside Pier")
+    make_event(user, title="Station", location="Zelenograd Station")
+    make_event(user, title="Elsewhere", location="Tver, Market Square")
+
+    assert titles(client, "RIVERSIDE") == {"Riverside"}
+    assert titles(client, "zelenograd") == {"Riverside", "Station"}
+    # Too short for trigrams: the ILIKE fallback answers
+    assert "Riverside" in titles(client, "Ri")
+
+def test_suggestions_merge_spellings_and_rank_by_use(client, make_user, make_event):
+    user = make_user()
+    for location in ("Yaroslavl Embankment", "yaroslavl  embankment", "Yaroslavl Embankment", "Yaroslavl Kremlin"):
+        make_event(user, location=location)
+
+    assert suggestions(client, "yaroslavl") == [("Yaroslavl Embankment", 3), ("Yaroslavl Kremlin", 1)]
+    assert suggestions(client, "Yaroslavl K") == [("Yaroslavl Kremlin", 1)]
+    assert suggestions(client, "yaroslavl", limit=1) == [("Yaroslavl Embankment", 3)]
+    # Prefix only, and LIKE wildcards are literal
+    assert suggestions(client, "embankment") == []
+    assert suggestions(client, "yaroslav_") == []
+
+def test_suggestion_counts_follow_edits_and_deletes(client, make_user, make_event):
+    user = make_user()
+    moving = make_event(user, location="Vologda Quay")
+    doomed = make_event(user, location="Vologda Quay")
+    assert suggestions(client, "vologda") == [("Vologda Quay", 2)]
+
+    client.put(f"/events/{moving['id']}", params={"user_id": user["id"]}, json={"location": "Vologda Park"})
+    client.delete(f"/events/{doomed['id']}", params={"user_id": user["id"]})
+
+    assert suggestions(client, "vologda") == [("Vologda Park", 1)]
@@ -0,0 +1,129 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+from app.database import LeaderLock, SessionLocal
+from app.models.models import Event, EventArchive, EventReminder, EventResponse, EventResponseArchive, Notification
+from app.services.maintenance import RUN_COUNTS, MaintenanceJob
+
+def job(**options):
+    return MaintenanceJob(retention_days=180, batch_size=2, lock=LeaderLock("maintenance-test", 1), **options)
+
+def days_ago(days):
+    return (datetime.utcnow() - timedelta(days=days)).isoformat(timespec="seconds")
+
+@pytest.fixture
+def respond(client, make_user):
+    def respond(event):
+        response = client.post("/responses/", params={"user_id": make_user("Respondent")["id"]}, json={"event_id": event["id"]})
+        assert response.status_code == 200, response.text
+        return response.json()
+    return respond
+
+def test_past_events_are_closed(make_user, make_event):
+    creator = make_user("Creator")
+    started = make_event(creator, datetime=days_ago(1))
+    upcoming = make_event(creator)
+
+    assert job().run_once()["closed_events"] >= 1
+    with SessionLocal() as db:
+        assert db.get(Event, started["id"]).is_open is False
+        assert db.get(Event, upcoming["id"]).is_open is True
+
+def test_old_events_move_to_the_archive_with_their_responses(make_user, make_event, respond):
+    creator = make_user("Creator")
+    old = [make_event(creator, datetime=days_ago(200 + n)) for n in range(3)]
+    response_ids = [respond(event)["id"] for event in old]
+    recent = make_event(creator, datetime=days_ago(10))
+
+    counts = job().run_once()
+
+    # Three events in batches of two
+    assert counts["archived_events"] >= 3 and counts["archived_responses"] >= 3
+    with SessionLocal() as db:
+        for event, response_id in zip(old, response_ids):
+            assert db.get(Event, event["id"]) is None
+            assert db.get(EventArchive, event["id"]).title == event["title"]
+            assert db.get(EventResponse, response_id) is None
+            assert db.get(EventResponseArchive, response_id).event_id == event["id"]
+        assert db.get(Event, recent["id"]) is not None
+
+def test_past_reminders_and_old_notifications_are_purged():
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        db.add_all([
+            EventReminder(event_id="maintenance-past", lead_minutes=60, event_datetime=now - timedelta(hours=1)),
+            EventReminder(event_id="maintenance-future", lead_minutes=60, event_datetime=now + timedelta(hours=1)),
+        ])
+        notifications = [
+            Notification(chat_id=801, kind="test", text="old sent", status="sent", created_at=now - timedelta(days=30)),
+            Notification(chat_id=802, kind="test", text="old failed", status="failed", created_at=now - timedelta(days=30)),
+            Notification(chat_id=803, kind="test", text="old pending", status="pending", created_at=now - timedelta(days=30)),
+            Notification(chat_id=804, kind="test", text="new sent", status="sent", created_at=now),
+        ]
+        db.add_all(notifications)
+        db.commit()
+        notification_ids = [row.id for row in notifications]
+
+    counts = job(outbox_retention_days=14).run_once()
+
+    assert counts["purged_reminders"] >= 1 and counts["purged_notifications"] >= 2
+    with SessionLocal() as db:
+        assert [row.event_id for row in db.query(EventReminder).filter(EventReminder.event_id.like("maintenance-%"))] == ["maintenance-future"]
+        kept = [row.chat_id for row in db.query(Notification).filter(Notification.id.in_(notification_ids)).order_by(Notification.chat_id)]
+        # Pending rows are still to be delivered, whatever their age
+        assert kept == [803, 804]
+
+def test_drifted_counters_are_repaired(make_user, make_event, respond):
+    event = make_event(make_user("Creator"))
+    respond(event)
+    with SessionLocal() as db:
+        db.execute(update(Event).where(Event.id == event["id"]).values(pending_count=7, accepted_count=3))
+        db.commit()
+
+    assert job(repair_counters=False).run_once()["repaired_counters"] == 0
+    assert job(repair_counters=True).run_once()["repaired_counters"] >= 1
+    with SessionLocal() as db:
+        row = db.get(Event, event["id"])
+        assert (row.pending_count, row.accepted_count) == (1, 0)
+
+def test_a_second_run_finds_nothing_left_to_do(make_user, make_event, respond):
+    creator = make_user("Creator")
+    respond(make_event(creator, datetime=days_ago(300)))
+    make_event(creator, datetime=days_ago(2))
+    maintenance = job(repair_counters=True)
+
+    first = maintenance.run_once()
+    second = maintenance.run_once()
+
+    assert first["archived_events"] >= 1 and first["closed_events"] >= 1
+    assert second == dict.fromkeys(RUN_COUNTS, 0)
+    stats = maintenance.stats()
+    assert stats["runs"] == 2 and stats["totals"] == first
+
+def test_only_the_lock_holder_runs(make_user, make_event):
+    leader = LeaderLock("maintenance-test", 1)
+    assert leader.acquire()
+    standby = MaintenanceJob(interval=0.05, lock=LeaderLock("maintenance-test", 1))
+    thread = threading.Thread(target=standby.run, daemon=True)
+    thread.start()
+    try:
+        time.sleep(0.3)
+        assert standby.runs == 0
+
+        # The standby takes over once the leader lets go
+        leader.release()
+        deadline = time.monotonic() + 5
+        while not standby.runs and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert standby.runs > 0
+    finally:
+        standby.stop()
+        thread.join(5)
+    assert not thread.is_alive()
+    # Released on stop
+    assert leader.acquire()
+    leader.release()
@@ -0,0 +1,82 @@
+import math
+import random
+
+import pytest
+
+from app.database import SessionLocal
+from app.models.models import Event
+from app.services.geo import covering_cells, geohash_encode, haversine_km
+
+# Far from the other tests' events, so every result here was created here
+CAPE_TOWN = (-33.9249, 18.4241)
+
+def offset(origin, north_km, east_km):
+    latitude, longitude = origin
+    return latitude + north_km / 111.2, longitude + east_km / (111.2 * math.cos(math.radians(latitude)))
+
+def nearby(client, origin, **params):
+    response = client.get("/events/nearby", params={"lat": origin[0], "lon": origin[1], **params})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+@pytest.fixture
+def place(make_user, make_event):
+    user = make_user("Local")
+
+    def place(title, point, **fields):
+        return make_event(user, title=title, latitude=point[0], longitude=point[1], **fields)
+    return place
+
+def test_geohash_matches_the_reference_encoding():
+    assert geohash_encode(57.64911, 10.40744, precision=11) == "u4pruydqqvj"
+
+@pytest.mark.parametrize("radius_km", [0.5, 3, 12, 50])
+def test_covering_cells_contain_every_point_in_the_circle(radius_km):
+    rng = random.Random(radius_km)
+    cells = set(covering_cells(*CAPE_TOWN, radius_km))
+    for _ in range(500):
+        distance, bearing = radius_km * math.sqrt(rng.random()), rng.uniform(0, 2 * math.pi)
+        point = offset(CAPE_TOWN, distance * math.cos(bearing), distance * math.sin(bearing))
+        assert geohash_encode(*point) in cells
+
+def test_nearby_returns_events_in_the_radius_nearest_first(client, place):
+    origin = offset(CAPE_TOWN, 40, 0)
+    place("Two km", offset(origin, 0, 2))
+    place("Half a km", offset(origin, -0.5, 0))
+    place("Five km", offset(origin, 3, 4))
+    place("Nine km", offset(origin, 0, -9))
+
+    events = nearby(client, origin, radius_km=6)
+
+    assert [event["title"] for event in events] == ["Half a km", "Two km", "Five km"]
+    assert [round(event["distance_km"]) for event in events] == [0, 2, 5]
+    assert nearby(client, origin, radius_km=6, limit=1)[0]["title"] == "Half a km"
+
+def test_nearby_filters_by_time_window_and_status(client, place):
+    origin = offset(CAPE_TOWN, -40, 0)
+    place("Morning", origin, datetime="2030-01-01T09:00:00")
+    place("Evening", origin, datetime="2030-01-01T19:00:00")
+    place("Closed", origin, datetime="2030-01-01T12:00:00", is_open=False)
+
+    window = {"starts_after": "2030-01-01T08:00:00", "starts_before": "2030-01-01T13:00:00"}
+    assert [event["title"] for event in nearby(client, origin, **window)] == ["Morning"]
+    assert {event["title"] for event in nearby(client, origin, is_open=False)} == {"Closed"}
+
+def test_geohash_follows_the_coordinates(client, place):
+    origin = offset(CAPE_TOWN, 0, 60)
+    event = place("Moving", origin)
+    moved_to = offset(origin, 20, 0)
+    response = client.put(f"/events/{event['id']}", params={"user_id": event["creator_id"]},
+                          json={"latitude": moved_to[0], "longitude": moved_to[1]})
+    assert response.status_code == 200, response.text
+
+    with SessionLocal() as db:
+        assert db.get(Event, event["id"]).geohash == geohash_encode(*moved_to)
+    assert nearby(client, origin) == []
+    assert [event["title"] for event in nearby(client, moved_to)] == ["Moving"]
+
+def test_nearby_crosses_the_antimeridian(client, place):
+    place("East of the line", (-16.5, -179.99))
+    events = nearby(client, (-16.5, 179.99), radius_km=5)
+    assert [event["title"] for event in events] == ["East of the line"]
+    assert events[0]["distance_km"] == pytest.approx(haversine_km(-16.5, 179.99, -16.5, -179.99), abs=0.001)
@@ -0,0 +1,137 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.database import LeaderLock, SessionLocal
+from app.models.models import Notification
+from app.services import notifications
+from app.services.notifications import OutboxWorker, RateLimiter
+
+@pytest.fixture
+def outbox():
+    """An empty outbox; returns a function queueing one message per chat id"""
+    with SessionLocal() as db:
+        db.query(Notification).delete()
+        db.commit()
+
+    def queue(*chat_ids):
+        with SessionLocal() as db:
+            rows = [Notification(chat_id=chat_id, kind="test", text=f"hello {chat_id}") for chat_id in chat_ids]
+            db.add_all(rows)
+            db.commit()
+            return [row.id for row in rows]
+    yield queue
+    with SessionLocal() as db:
+        db.query(Notification).delete()
+        db.commit()
+
+def rows():
+    with SessionLocal() as db:
+        return {row.id: row for row in db.query(Notification).all()}
+
+def make_due(notification_id):
+    with SessionLocal() as db:
+        db.get(Notification, notification_id).next_attempt_at = datetime.utcnow()
+        db.commit()
+
+def worker(rate=1000, chat_interval=0):
+    return OutboxWorker(limiter=RateLimiter(rate=rate, chat_interval=chat_interval))
+
+def test_delivers_queued_messages(fake_bot_api, outbox):
+    outbox(101, 102)
+    assert worker().run_once()["sent"] == 2
+    assert sorted(int(params["chat_id"]) for params in fake_bot_api.sent()) == [101, 102]
+    assert all(row.status == "sent" and row.attempts == 1 and row.sent_at for row in rows().values())
+
+def test_server_errors_retry_with_growing_backoff(fake_bot_api, outbox, monkeypatch):
+    monkeypatch.setattr(notifications, "OUTBOX_RETRY_BASE", 10)
+    [notification_id] = outbox(201)
+    fake_bot_api.reply(500, description="Internal Server Error")
+    fake_bot_api.reply(502, description="Bad Gateway")
+    sender = worker()
+
+    started = datetime.utcnow()
+    assert sender.run_once()["retried"] == 1
+    row = rows()[notification_id]
+    assert (row.status, row.attempts) == ("pending", 1) and "Internal Server Error" in row.last_error
+    # Jittered between half and all of OUTBOX_RETRY_BASE
+    assert 5 <= (row.next_attempt_at - started).total_seconds() <= 11
+
+    # Not due again yet
+    assert sum(sender.run_once().values()) == 0
+    assert len(fake_bot_api.sent()) == 1
+
+    make_due(notification_id)
+    started = datetime.utcnow()
+    assert sender.run_once()["retried"] == 1
+    row = rows()[notification_id]
+    assert row.attempts == 2 and 10 <= (row.next_attempt_at - started).total_seconds() <= 21
+
+    make_due(notification_id)
+    assert sender.run_once()["sent"] == 1
+    assert rows()[notification_id].status == "sent"
+
+def test_flood_control_pauses_without_spending_an_attempt(fake_bot_api, outbox):
+    first, second = outbox(301, 302)
+    fake_bot_api.reply(429, description="Too Many Requests: retry after 3", retry_after=3)
+    sender = worker()
+
+    started = datetime.utcnow()
+    assert sender.run_once() == {"sent": 0, "retried": 1, "failed": 0, "deferred": 0}
+    assert sender.limiter.paused_for() > 2
+    assert len(fake_bot_api.sent()) == 1
+    after = rows()
+    assert after[first].attempts == 0 and 2.5 <= (after[first].next_attempt_at - started).total_seconds() <= 3.5
+    # The rest of the batch waits for the pause to end
+    assert after[second].attempts == 0 and after[second].status == "pending"
+
+def test_permanent_errors_fail_without_retry(fake_bot_api, outbox):
+    [notification_id] = outbox(401)
+    fake_bot_api.reply(403, description="Forbidden: bot was blocked by the user")
+    assert worker().run_once()["failed"] == 1
+    row = rows()[notification_id]
+    assert (row.status, row.attempts) == ("failed", 1)
+
+def test_one_message_per_chat_interval(fake_bot_api, outbox):
+    outbox(501, 501, 502)
+    started = datetime.utcnow()
+    assert worker(chat_interval=60).run_once() == {"sent": 2, "retried": 0, "failed": 0, "deferred": 1}
+    assert sorted(int(params["chat_id"]) for params in fake_bot_api.sent()) == [501, 502]
+    deferred = [row for row in rows().values() if row.status == "pending"]
+    assert 59 <= (deferred[0].next_attempt_at - started).total_seconds() <= 61
+
+def test_global_rate_limit(fake_bot_api, outbox):
+    outbox(*range(601, 611))
+    assert worker(rate=5).run_once()["sent"] == 10
+    times = [at for at, method, _ in fake_bot_api.calls if method == "sendMessage"]
+    # The bucket starts with 5 tokens, the other 5 messages come at 5 per second
+    assert times[-1] - times[0] >= 0.9
+
+def test_only_the_lock_holder_sends(fake_bot_api, outbox, monkeypatch):
+    monkeypatch.setattr(notifications, "OUTBOX_POLL_INTERVAL", 0.05)
+    leader = LeaderLock("outbox-test", 1)
+    assert leader.acquire()
+    assert leader.acquire()
+    standby = OutboxWorker(limiter=RateLimiter(rate=1000, chat_interval=0), lock=LeaderLock("outbox-test", 1))
+    thread = threading.Thread(target=standby.run, daemon=True)
+    thread.start()
+    try:
+        outbox(701)
+        time.sleep(0.3)
+        assert fake_bot_api.sent() == []
+
+        # The standby takes over once the leader lets go
+        leader.release()
+        deadline = time.monotonic() + 5
+        while not fake_bot_api.sent() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert [int(params["chat_id"]) for params in fake_bot_api.sent()] == [701]
+    finally:
+        standby.stop()
+        thread.join(5)
+    assert not thread.is_alive()
+    # Released on stop
+    assert leader.acquire()
+    leader.release()
@@ -0,0 +1,73 @@
+import itertools
+from datetime import datetime
+
+import pytest
+
+from app.services.pagination import decode_cursor, encode_cursor
+
+_streets = itertools.count()
+
+def page(client, location, **params):
+    response = client.get("/events/", params={"location": location, **params})
+    assert response.status_code == 200, response.text
+    return [event["title"] for event in response.json()], response.headers.get("X-Next-Cursor")
+
+def walk(client, location, limit):
+    titles, cursor = page(client, location, limit=limit)
+    pages = [titles]
+    while cursor:
+        titles, cursor = page(client, location, limit=limit, cursor=cursor)
+        pages.append(titles)
+    return pages
+
+@pytest.fixture
+def events(make_user, make_event):
+    """Five events on a street of their own, and the location filter that finds them"""
+    user = make_user("Organizer")
+    location = f"Cursor Lane {next(_streets)}"
+    for n in range(5):
+        make_event(user, title=f"Cursor event {n}", location=f"{location}, {n}")
+    return user, location
+
+def test_cursor_pages_cover_the_list_once(client, events):
+    user, location = events
+    newest_first, _ = page(client, location, limit=100)
+    assert len(newest_first) == 5
+
+    pages = walk(client, location, limit=2)
+
+    # A short last page hands out no cursor
+    assert pages == [newest_first[0:2], newest_first[2:4], newest_first[4:5]]
+
+def test_full_last_page_ends_with_an_empty_one(client, events):
+    user, location = events
+    pages = walk(client, location, limit=5)
+    assert [len(titles) for titles in pages] == [5, 0]
+
+def test_new_events_do_not_shift_later_pages(client, make_event, events):
+    user, location = events
+    newest_first, _ = page(client, location, limit=100)
+    first, cursor = page(client, location, limit=2)
+    make_event(user, title="Cursor event late", location=f"{location}, late")
+
+    second, _ = page(client, location, limit=2, cursor=cursor)
+
+    assert first + second == newest_first[:4]
+
+def test_skip_still_works_without_a_cursor(client, events):
+    user, location = events
+    newest_first, _ = page(client, location, limit=100)
+    assert page(client, location, skip=1, limit=2)[0] == newest_first[1:3]
+
+def test_cursor_round_trips():
+    created_at = datetime(2030, 1, 1, 10, 0, 0, 123456)
+    cursor = encode_cursor(created_at, "e1")
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, "e1")
+
+# Not base64 JSON, a one-item list, an unparseable timestamp
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "WzFd", "WyJub3QgYSBkYXRlIiwiZTEiXQ"])
+def test_invalid_cursor_is_rejected(client, cursor):
+    response = client.get("/events/", params={"cursor": cursor})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
@@ -0,0 +1,39 @@
+import pytest
+
+def query_count(client, url, **params):
+    response = client.get(url, params=params)
+    assert response.status_code == 200, response.text
+    return int(response.headers["X-Query-Count"])
+
+@pytest.fixture
+def crowded_event(make_user, make_event, client):
+    """An event with 30 respondents, from a creator with 30 events"""
+    creator = make_user("Creator")
+    events = [make_event(creator, title=f"Event {n}") for n in range(30)]
+    for n in range(30):
+        user = make_user(f"Respondent {n}")
+        response = client.post("/responses/", params={"user_id": user["id"]}, json={"event_id": events[0]["id"]})
+        assert response.status_code == 200, response.text
+    return creator, events[0], user
+
+def test_event_list_queries_do_not_grow_with_page_size(client, crowded_event):
+    # Distinct filters so neither page is served from the event cache
+    assert query_count(client, "/events/", limit=1, is_open=True) == query_count(client, "/events/", limit=100, is_open=True)
+
+def test_user_events_queries_do_not_grow_with_events(client, crowded_event, make_user, make_event):
+    creator, _, _ = crowded_event
+    single = make_user("Single event")
+    make_event(single)
+    assert query_count(client, f"/events/user/{single['id']}") == query_count(client, f"/events/user/{creator['id']}")
+
+def test_response_list_queries_do_not_grow_with_responses(client, crowded_event, make_user, make_event):
+    creator, event, respondent = crowded_event
+    quiet_creator = make_user("Quiet creator")
+    quiet_event = make_event(quiet_creator)
+    client.post("/responses/", params={"user_id": respondent["id"]}, json={"event_id": quiet_event["id"]})
+    few = query_count(client, f"/responses/event/{quiet_event['id']}", user_id=quiet_creator["id"])
+    many = query_count(client, f"/responses/event/{event['id']}", user_id=creator["id"])
+    assert few == many
+    assert query_count(client, f"/responses/user/{respondent['id']}") == query_count(
+        client, f"/responses/user/{creator['id']}"
+    )
@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.database import SessionLocal
+from app.models.models import Notification
+from app.services.reminders import ReminderScheduler, reminder_times
+
+NOW = datetime(2030, 6, 1, 12, 0)
+
+def at(minutes):
+    return NOW + timedelta(minutes=minutes)
+
+@pytest.mark.parametrize("starts_in, expected", [
+    (180, [(at(120), 60), (at(170), 10)]),
+    # The hour-ahead reminder is already late, the ten-minute one is still to come
+    (30, [(at(20), 10)]),
+    # Both are late: only the shorter one goes, right away
+    (5, [(NOW, 10)]),
+    (0, []),
+    (-5, []),
+])
+def test_reminder_times(starts_in, expected):
+    assert reminder_times(at(starts_in), NOW, [10, 60]) == expected
+
+@pytest.fixture
+def upcoming(client, make_user, make_event):
+    """An event starting in 90 minutes with one accepted and one pending respondent, and the accepted one's chat id"""
+    creator = make_user("Creator")
+    starts_at = (datetime.utcnow() + timedelta(minutes=90)).replace(microsecond=0)
+    event = make_event(creator, title="Soon", datetime=starts_at.isoformat())
+    accepted, pending = make_user("Accepted"), make_user("Pending")
+    for user, decision in ((accepted, "accepted"), (pending, None)):
+        response = client.post("/responses/", params={"user_id": user["id"]}, json={"event_id": event["id"]})
+        assert response.status_code == 200, response.text
+        if decision:
+            decided = client.put(f"/responses/{response.json()['id']}", params={"user_id": creator["id"]},
+                                 json={"status": decision})
+            assert decided.status_code == 200, decided.text
+    return event, starts_at, accepted["telegram_id"]
+
+def reminders_for(chat_id):
+    with SessionLocal() as db:
+        return db.query(Notification).filter(Notification.kind == "reminder", Notification.chat_id == chat_id).count()
+
+def due_for(scheduler, event_id, now):
+    return [(lead, starts_at) for due_id, lead, starts_at in scheduler.pop_due(now) if str(due_id) == event_id]
+
+def test_reminder_is_queued_once_for_accepted_participants(upcoming):
+    event, starts_at, chat_id = upcoming
+    scheduler = ReminderScheduler(leads=[60], window_minutes=60)
+    now = datetime.utcnow()
+    scheduler.load_window(now)
+
+    assert due_for(scheduler, event["id"], now) == []
+    due = due_for(scheduler, event["id"], starts_at - timedelta(minutes=59))
+    assert due == [(60, starts_at)]
+
+    assert scheduler.fire(event["id"], 60, starts_at) == 1
+    # Another worker, or a restart, finds it recorded in event_reminders
+    assert ReminderScheduler(leads=[60]).fire(event["id"], 60, starts_at) == 0
+    assert reminders_for(chat_id) == 1
+
+def test_moved_and_deleted_events_are_skipped(upcoming, make_user, make_event):
+    event, starts_at, _ = upcoming
+    other = make_event(make_user("Other"), title="Cancelled", datetime=starts_at.isoformat())
+    scheduler = ReminderScheduler(leads=[60], window_minutes=60)
+    scheduler.load_window(datetime.utcnow())
+
+    later = starts_at + timedelta(minutes=20)
+    scheduler.schedule(event["id"], later)
+    scheduler.cancel(other["id"])
+
+    assert due_for(scheduler, event["id"], starts_at) == [(60, later)]
+    assert due_for(scheduler, other["id"], starts_at) == []
+
+def test_fire_skips_events_moved_through_another_worker(upcoming):
+    event, starts_at, _ = upcoming
+    assert ReminderScheduler(leads=[60]).fire(event["id"], 60, starts_at + timedelta(minutes=5)) == 0
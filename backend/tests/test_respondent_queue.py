@@ -0,0 +1,68 @@
+import pytest
+
+@pytest.fixture
+def queue(client, make_user, make_event):
+    """An event with five respondents, the second and fourth accepted; returns the creator, event and names in order"""
+    creator = make_user("Creator")
+    event = make_event(creator)
+    names = []
+    for n in range(5):
+        user = make_user(f"Respondent {n}")
+        response = client.post("/responses/", params={"user_id": user["id"]}, json={"event_id": event["id"]})
+        assert response.status_code == 200, response.text
+        if n in (1, 3):
+            decided = client.put(f"/responses/{response.json()['id']}", params={"user_id": creator["id"]},
+                                 json={"status": "accepted"})
+            assert decided.status_code == 200, decided.text
+        names.append(user["name"])
+    return creator, event, names
+
+def read(client, creator, event, **params):
+    response = client.get(f"/responses/event/{event['id']}/queue", params={"user_id": creator["id"], **params})
+    assert response.status_code == 200, response.text
+    return response.json(), response.headers.get("X-Next-Cursor")
+
+def walk(client, creator, event, **params):
+    cards, cursor = read(client, creator, event, **params)
+    pages = [cards]
+    while cursor:
+        cards, cursor = read(client, creator, event, cursor=cursor, **params)
+        pages.append(cards)
+    return pages
+
+def test_cards_come_oldest_first(client, queue):
+    creator, event, names = queue
+    cards, cursor = read(client, creator, event)
+    assert [card["name"] for card in cards] == names and cursor is None
+    assert set(cards[0]) == {"id", "user_id", "status", "responded_at", "name", "avatar_url"}
+
+def test_status_filter(client, queue):
+    creator, event, names = queue
+    accepted, _ = read(client, creator, event, status="accepted")
+    pending, _ = read(client, creator, event, status="pending")
+    assert [card["name"] for card in accepted] == [names[1], names[3]]
+    assert [card["name"] for card in pending] == [names[0], names[2], names[4]]
+
+@pytest.mark.parametrize("status", [None, "pending"])
+def test_pages_cover_the_queue_once(client, queue, status):
+    creator, event, names = queue
+    params = {"status": status} if status else {}
+    expected = [card["id"] for card in read(client, creator, event, **params)[0]]
+
+    pages = walk(client, creator, event, limit=2, **params)
+
+    assert [card["id"] for cards in pages for card in cards] == expected
+    assert all(len(cards) <= 2 for cards in pages)
+
+def test_only_the_creator_sees_the_queue(client, make_user, queue):
+    creator, event, names = queue
+    stranger = make_user("Stranger")
+    response = client.get(f"/responses/event/{event['id']}/queue", params={"user_id": stranger["id"]})
+    assert response.status_code == 403
+    response = client.get("/responses/event/no-such-event/queue", params={"user_id": creator["id"]})
+    assert response.status_code == 404
+
+def test_invalid_cursor_is_rejected(client, queue):
+    creator, event, names = queue
+    response = client.get(f"/responses/event/{event['id']}/queue", params={"user_id": creator["id"], "cursor": "nope"})
+    assert response.status_code == 400
@@ -0,0 +1,81 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import update
+
+from app.database import SessionLocal
+from app.models.models import EventResponse
+from app.routers.responses import decision_rows_query, decision_updates, plan_decisions, settle_decisions
+from app.schemas.schemas import EventResponseBatchUpdate
+from app.services.counters import drifted_counters_query
+
+@pytest.fixture
+def event_with_respondents(client, make_user, make_event):
+    """An event and the ids of its ten pending responses"""
+    creator = make_user("Creator")
+    event = make_event(creator)
+    response_ids = []
+    for n in range(10):
+        user = make_user(f"Respondent {n}")
+        response = client.post("/responses/", params={"user_id": user["id"]}, json={"event_id": event["id"]})
+        assert response.status_code == 200, response.text
+        response_ids.append(response.json()["id"])
+    return creator, event, response_ids
+
+def assert_counters_match(event_id):
+    with SessionLocal() as db:
+        drifted = [row for row in db.execute(drifted_counters_query()) if str(row.id) == event_id]
+        assert drifted == []
+
+def test_overlapping_batches_count_each_change_once(client, event_with_respondents):
+    creator, event, response_ids = event_with_respondents
+    rng = random.Random(7)
+
+    def decide(_):
+        decisions = [{"id": rid, "status": rng.choice(["accepted", "rejected"])} for rid in response_ids]
+        return client.put("/responses/batch", params={"user_id": creator["id"]},
+                          json={"event_id": event["id"], "decisions": decisions})
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        replies = list(pool.map(decide, range(40)))
+
+    assert all(reply.status_code == 200 for reply in replies), [reply.text for reply in replies]
+    assert_counters_match(event["id"])
+
+def test_batch_leaves_responses_changed_since_they_were_read(event_with_respondents):
+    creator, event, response_ids = event_with_respondents
+    batch = EventResponseBatchUpdate(
+        event_id=event["id"], decisions=[{"id": rid, "status": "accepted"} for rid in response_ids[:2]]
+    )
+    with SessionLocal() as db:
+        results, changes = plan_decisions(batch, db.execute(decision_rows_query(batch)).all())
+        # Another request rejects the first response after this one read it as pending
+        with SessionLocal() as other:
+            other.execute(update(EventResponse).where(EventResponse.id == response_ids[0]).values(status="rejected"))
+            other.commit()
+        updated_ids = set()
+        for statement in decision_updates(batch.event_id, changes):
+            updated_ids.update(db.scalars(statement))
+        results, changes = settle_decisions(results, changes, updated_ids)
+        db.commit()
+
+    assert [result.result for result in results] == ["conflict", "updated"]
+    assert [str(row.id) for row, new_status in changes] == [response_ids[1]]
+    with SessionLocal() as db:
+        assert db.get(EventResponse, response_ids[0]).status == "rejected"
+
+def test_concurrent_status_updates_count_each_change_once(client, event_with_respondents):
+    creator, event, response_ids = event_with_respondents
+    statuses = ["accepted", "rejected", "pending"]
+
+    def decide(n):
+        return client.put(f"/responses/{response_ids[n % 2]}", params={"user_id": creator["id"]},
+                          json={"status": statuses[n // 2 % len(statuses)]})
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        replies = list(pool.map(decide, range(60)))
+
+    # 409 is a request whose response another one moved to a different status first
+    assert {reply.status_code for reply in replies} <= {200, 409}, [reply.text for reply in replies]
+    assert_counters_match(event["id"])
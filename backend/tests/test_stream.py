@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+
+from app.routers import stream
+from app.services.realtime import FEED_TOPIC, InProcessHub, event_responses_topic
+
+@pytest.fixture
+def hub(monkeypatch):
+    hub = InProcessHub()
+    monkeypatch.setattr(stream, "hub", hub)
+    return hub
+
+def test_a_stream_that_never_starts_does_not_subscribe(hub):
+    async def main():
+        messages = stream.stream_messages([FEED_TOPIC])
+        # As when the client goes away before the response body is sent
+        await messages.aclose()
+
+    asyncio.run(main())
+    assert hub.stats() == {"topics": 0, "subscriptions": 0}
+
+def test_messages_arrive_and_closing_unsubscribes(hub):
+    async def main():
+        messages = stream.stream_messages([FEED_TOPIC, event_responses_topic("e1")])
+        assert await messages.__anext__() == b"retry: 5000\n\n"
+        assert hub.stats() == {"topics": 2, "subscriptions": 2}
+        hub.publish(FEED_TOPIC, "event_created", {"id": "e1"})
+        chunk = await messages.__anext__()
+        await messages.aclose()
+        return chunk
+
+    assert asyncio.run(main()) == b'event: event_created\ndata: {"id":"e1"}\n\n'
+    assert hub.stats() == {"topics": 0, "subscriptions": 0}
+
+def test_cancelled_stream_unsubscribes(hub):
+    async def main():
+        messages = stream.stream_messages([FEED_TOPIC])
+        await messages.__anext__()
+        # The response task is cancelled while the stream waits for a message
+        waiting = asyncio.create_task(messages.__anext__())
+        await asyncio.sleep(0.01)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        await messages.aclose()
+
+    asyncio.run(main())
+    assert hub.stats() == {"topics": 0, "subscriptions": 0}
@@ -0,0 +1,61 @@
+import time
+
+import pytest
+
+from app.services import telegram_bot
+
+# Recorded from Telegram: a user sending /start to the bot
+START_UPDATE = {
+    "update_id": 812345670,
+    "message": {
+        "message_id": 17,
+        "from": {"id": 424242, "is_bot": False, "first_name": "Anna", "username": "anna", "language_code": "ru"},
+        "chat": {"id": 424242, "first_name": "Anna", "username": "anna", "type": "private"},
+        "date": 1760700000,
+        "text": "/start",
+        "entities": [{"offset": 0, "length": 6, "type": "bot_command"}],
+    },
+}
+
+@pytest.fixture
+def webhook(monkeypatch, fake_bot_api):
+    monkeypatch.setattr(telegram_bot, "TELEGRAM_WEBHOOK_URL", "https://api.example.com")
+    monkeypatch.setattr(telegram_bot, "TELEGRAM_WEBHOOK_SECRET", "current-secret")
+    return fake_bot_api
+
+def post_update(client, payload, secret="current-secret", **kwargs):
+    return client.post("/telegram/webhook", json=payload, headers={"X-Telegram-Bot-Api-Secret-Token": secret}, **kwargs)
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return condition()
+
+def test_start_update_reaches_the_handler(client, webhook):
+    assert post_update(client, START_UPDATE).json() == {"ok": True}
+    assert wait_for(lambda: webhook.sent())
+    [reply] = webhook.sent()
+    assert int(reply["chat_id"]) == 424242 and "Welcome to *LinkUp*" in reply["text"]
+
+def test_wrong_secret_is_rejected(client, webhook):
+    assert post_update(client, START_UPDATE, secret="old-secret").status_code == 403
+    assert client.post("/telegram/webhook", json=START_UPDATE).status_code == 403
+    time.sleep(0.1)
+    assert webhook.sent() == []
+
+def test_malformed_updates_are_acknowledged(client, webhook):
+    # A 2xx stops Telegram from redelivering an update that can never be processed
+    assert post_update(client, {"message": {"text": "no update_id"}}).status_code == 200
+    assert post_update(client, None, content=b"not json").status_code == 200
+    assert post_update(client, [1, 2, 3]).status_code == 200
+    time.sleep(0.1)
+    assert webhook.sent() == []
+
+def test_setup_webhook_always_sends_the_current_secret(webhook):
+    telegram_bot.setup_webhook()
+    telegram_bot.setup_webhook()
+    calls = webhook.sent("setWebhook")
+    assert len(calls) == 2
+    assert all(call["url"] == "https://api.example.com/telegram/webhook" for call in calls)
+    assert all(call["secret_token"] == "current-secret" for call in calls)
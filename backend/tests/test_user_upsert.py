@@ -0,0 +1,110 @@
+import asyncio
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.database import DATABASE_URL, SessionLocal, get_async_database_url, get_async_db
+from app.models.models import User
+from app.routers import users, users_async
+from benchmarks.scenarios import init_data
+
+LOGINS = 500
+FALLBACK_BIOS = ("User created without initData", "User created from unparseable initData", "User created with minimal data")
+
+def login_sync(payload):
+    """LOGINS parallel logins through the sync router, from a thread pool, as FastAPI runs plain def endpoints"""
+    app = FastAPI()
+    app.include_router(users.router)
+    client = TestClient(app)
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        return [(r.status_code, r.json()) for r in pool.map(lambda _: client.post("/users/auth", json=payload), range(LOGINS))]
+
+def login_async(payload):
+    """LOGINS concurrent logins through the ASYNC_DB router on one event loop, as uvicorn serves them"""
+    async def run():
+        engine = create_async_engine(get_async_database_url(DATABASE_URL))
+        sessions = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+        async def get_db():
+            async with sessions() as db:
+                yield db
+
+        app = FastAPI()
+        app.include_router(users_async.router)
+        app.dependency_overrides[get_async_db] = get_db
+        try:
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+                replies = await asyncio.gather(*(http.post("/users/auth", json=payload) for _ in range(LOGINS)))
+        finally:
+            await engine.dispose()
+        return [(r.status_code, r.json()) for r in replies]
+
+    return asyncio.run(run())
+
+# Both routers run whatever ASYNC_DB is, each on its own app
+@pytest.fixture(params=[login_sync, login_async], ids=["sync", "async"])
+def login_in_parallel(request):
+    return request.param
+
+def test_parallel_first_logins_create_one_user(monkeypatch, login_in_parallel):
+    # Every login goes through upsert_user instead of the verified-initData shortcut
+    monkeypatch.setattr(users.verified_init_data, "get", lambda init_data: None)
+    telegram_id = 3_000_001 if login_in_parallel is login_sync else 3_000_002
+    payload = {"initData": init_data(telegram_id, "Anna", "123456:test-token", int(time.time()))}
+
+    replies = login_in_parallel(payload)
+
+    assert [status for status, body in replies] == [200] * LOGINS, {status: body for status, body in replies}
+    assert len({body["id"] for status, body in replies}) == 1
+    with SessionLocal() as db:
+        # No duplicates, and none of the users the auth fallbacks used to create
+        assert db.query(User).filter(User.telegram_id == telegram_id).count() == 1
+        assert db.query(User).filter(User.bio.in_(FALLBACK_BIOS)).count() == 0
+
+def database_locked():
+    return OperationalError("INSERT INTO users ...", {}, sqlite3.OperationalError("database is locked"))
+
+def test_locked_upsert_is_retried():
+    with SessionLocal() as db:
+        execute = db.execute
+        calls = []
+
+        def flaky(*args, **kwargs):
+            calls.append(1)
+            if len(calls) == 1:
+                raise database_locked()
+            return execute(*args, **kwargs)
+
+        db.execute = flaky
+        telegram_id = users.upsert_user(db, telegram_id=3_000_003, name="Anna").telegram_id
+        db.commit()
+    assert len(calls) == 2 and telegram_id == 3_000_003
+
+def test_locked_async_upsert_is_retried():
+    async def run():
+        engine = create_async_engine(get_async_database_url(DATABASE_URL))
+        try:
+            async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+                execute = db.execute
+                calls = []
+
+                async def flaky(*args, **kwargs):
+                    calls.append(1)
+                    if len(calls) == 1:
+                        raise database_locked()
+                    return await execute(*args, **kwargs)
+
+                db.execute = flaky
+                user = await users_async.upsert_user(db, telegram_id=3_000_004, name="Anna")
+                return len(calls), user.telegram_id
+        finally:
+            await engine.dispose()
+
+    assert asyncio.run(run()) == (2, 3_000_004)
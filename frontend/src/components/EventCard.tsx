@@ -52,6 +52,12 @@ const EventCard: React.FC<EventCardProps> = ({ event, onRespond }) => {
           <span>{event.location}</span>
         </div>
         
+        {(event.accepted_count || event.pending_count) ? (
+          <p className="mt-2 text-sm text-gray-500">
+            {event.accepted_count ?? 0} going • {event.pending_count ?? 0} pending
+          </p>
+        ) : null}
+        
         {event.creator && (
           <div className="mt-3 flex items-center">
             <img 
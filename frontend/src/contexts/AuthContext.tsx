@@ -63,6 +63,16 @@ const MOCK_USER: User = {
   updated_at: new Date().toISOString()
 };
 
+// Send the session token from /users/auth with every API request while it is valid
+const applySession = (user: User | null) => {
+  const expiresAt = user?.session_expires_at ? Date.parse(user.session_expires_at + 'Z') : 0;
+  if (user?.session_token && expiresAt > Date.now()) {
+    axios.defaults.headers.common['Authorization'] = `Bearer ${user.session_token}`;
+  } else {
+    delete axios.defaults.headers.common['Authorization'];
+  }
+};
+
 export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
   const [user, setUser] = useState<User | null>(null);
   const [loading, setLoading] = useState(true);
@@ -71,7 +81,9 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
   useEffect(() => {
     const storedUser = localStorage.getItem('user');
     if (storedUser) {
-      setUser(JSON.parse(storedUser));
+      const parsedUser = JSON.parse(storedUser);
+      applySession(parsedUser);
+      setUser(parsedUser);
     }
     setLoading(false);
   }, []);
@@ -106,6 +118,7 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
 
       const userData = response.data;
       console.log('Received user data from backend:', userData);
+      applySession(userData);
       setUser(userData);
       localStorage.setItem('user', JSON.stringify(userData));
     } catch (error) {
@@ -113,6 +126,7 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
       
       // Только в случае ошибки используем fallback к mock user
       console.warn('Authentication failed, using mock data as fallback');
+      applySession(null);
       setUser(MOCK_USER);
       localStorage.setItem('user', JSON.stringify(MOCK_USER));
     } finally {
@@ -121,6 +135,7 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
   };
 
   const logout = (): void => {
+    applySession(null);
     setUser(null);
     localStorage.removeItem('user');
   };
@@ -142,7 +157,12 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
       }
 
       const response = await axios.put(`${API_URL}/users/${user.id}`, userData);
-      const updatedUser = response.data;
+      // Keep the session token, which the profile endpoints don't return
+      const updatedUser = {
+        ...response.data,
+        session_token: user.session_token,
+        session_expires_at: user.session_expires_at
+      };
       setUser(updatedUser);
       localStorage.setItem('user', JSON.stringify(updatedUser));
     } catch (error) {
@@ -156,6 +176,7 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
   const forceReauth = async (): Promise<void> => {
     console.log('Forcing re-authentication...');
     localStorage.clear();
+    applySession(null);
     setUser(null);
     await login();
   };
@@ -1,6 +1,6 @@
-import React, { createContext, useState, useContext, ReactNode, useEffect } from 'react';
+import React, { createContext, useState, useContext, ReactNode, useEffect, useRef } from 'react';
 import axios from 'axios';
-import { Event, EventResponse, EventsContextType, EventFilters } from '../types';
+import { Event, EventResponse, EventsContextType, EventFilters, ResponseDecisionResult, RespondentPage } from '../types';
 import { useAuth } from './AuthContext';
 
 // Create context with default values
@@ -14,6 +14,8 @@ const EventsContext = createContext<EventsContextType>({
   respondToEvent: async () => ({} as EventResponse),
   getEvent: async () => ({} as Event),
   updateEventResponse: async () => ({} as EventResponse),
+  updateEventResponses: async () => [],
+  getRespondentQueue: async () => ({ cards: [], nextCursor: null }),
   userEvents: []
 });
 
@@ -44,12 +46,21 @@ const getApiUrl = () => {
 
 const API_URL = getApiUrl();
 
+// Whether a streamed new event belongs in the list loaded with these filters
+const matchesFilters = (event: Event, filters?: EventFilters): boolean => {
+  if (filters?.type && event.type !== filters.type) return false;
+  if (filters?.location && !event.location.toLowerCase().includes(filters.location.toLowerCase())) return false;
+  return true;
+};
+
 export const EventsProvider: React.FC<EventsProviderProps> = ({ children }) => {
   const [events, setEvents] = useState<Event[]>([]);
   const [userEvents, setUserEvents] = useState<Event[]>([]);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const { user } = useAuth();
+  // Filters of the loaded events list; null until fetchEvents has run
+  const eventsFilters = useRef<EventFilters | undefined | null>(null);
 
   // Fetch user events when user changes
   useEffect(() => {
@@ -58,11 +69,58 @@ export const EventsProvider: React.FC<EventsProviderProps> = ({ children }) => {
     }
   }, [user]);
 
+  // Keep the lists current from the server's event stream instead of refetching them
+  useEffect(() => {
+    if (!user || typeof EventSource === 'undefined') return;
+
+    // EventSource can't send the Authorization header, so the token goes in the URL
+    const params = new URLSearchParams({ feed: 'true' });
+    if (user.session_token) params.append('access_token', user.session_token);
+    const source = new EventSource(`${API_URL}/stream/?${params.toString()}`);
+
+    // Messages only carry ids; fetch the one changed event (cached by the backend)
+    const refreshEvent = async (message: MessageEvent) => {
+      const { id } = JSON.parse(message.data);
+      try {
+        const response = await axios.get(`${API_URL}/events/${id}`);
+        const changed: Event = response.data;
+        const merge = (prevEvents: Event[], include: boolean) =>
+          prevEvents.some(event => event.id === id)
+            ? prevEvents.map(event => event.id === id ? changed : event)
+            : include ? [changed, ...prevEvents] : prevEvents;
+        setEvents(prevEvents => merge(
+          prevEvents,
+          eventsFilters.current !== null && message.type === 'event_created' && matchesFilters(changed, eventsFilters.current)
+        ));
+        setUserEvents(prevEvents => merge(prevEvents, changed.creator_id === user.id));
+      } catch (error) {
+        console.error('Stream event refresh error:', error);
+      }
+    };
+    const removeEvent = (message: MessageEvent) => {
+      const { id } = JSON.parse(message.data);
+      setEvents(prevEvents => prevEvents.filter(event => event.id !== id));
+      setUserEvents(prevEvents => prevEvents.filter(event => event.id !== id));
+    };
+
+    source.addEventListener('event_created', refreshEvent);
+    source.addEventListener('event_updated', refreshEvent);
+    source.addEventListener('event_deleted', removeEvent);
+    // Sent when this client fell too far behind and messages were dropped
+    source.addEventListener('resync', () => {
+      if (eventsFilters.current !== null) fetchEvents(eventsFilters.current);
+      fetchUserEvents();
+    });
+
+    return () => source.close();
+  }, [user?.id, user?.session_token]);
+
   const fetchEvents = async (filters?: EventFilters): Promise<void> => {
     if (!user) return;
 
     setLoading(true);
     setError(null);
+    eventsFilters.current = filters;
     
     try {
       // Build query parameters
@@ -295,6 +353,56 @@ export const EventsProvider: React.FC<EventsProviderProps> = ({ children }) => {
     }
   };
 
+  // Accept or reject many responses to one event in a single request
+  const updateEventResponses = async (eventId: string, decisions: { id: string; status: string }[]): Promise<ResponseDecisionResult[]> => {
+    if (!user) throw new Error('You must be logged in to update responses');
+
+    setLoading(true);
+    setError(null);
+    
+    try {
+      const response = await axios.put(`${API_URL}/responses/batch?user_id=${user.id}`, {
+        event_id: eventId,
+        decisions
+      });
+      return response.data.results;
+    } catch (error: any) {
+      console.error('Update responses error:', error);
+      if (error.response) {
+        setError(`Failed to update responses: ${error.response.status} ${JSON.stringify(error.response.data)}`);
+      } else if (error.request) {
+        setError('Failed to update responses: No response from server');
+      } else {
+        setError(`Failed to update responses: ${error.message}`);
+      }
+      throw error;
+    } finally {
+      setLoading(false);
+    }
+  };
+
+  // One page of an event's respondents with the given status, oldest first
+  const getRespondentQueue = async (eventId: string, status: string, cursor?: string | null): Promise<RespondentPage> => {
+    if (!user) throw new Error('You must be logged in to view responses');
+
+    const params = new URLSearchParams({ user_id: user.id, status });
+    if (cursor) params.append('cursor', cursor);
+    try {
+      const response = await axios.get(`${API_URL}/responses/event/${eventId}/queue?${params.toString()}`);
+      return { cards: response.data, nextCursor: response.headers['x-next-cursor'] || null };
+    } catch (error: any) {
+      console.error('Get respondent queue error:', error);
+      if (error.response) {
+        setError(`Failed to load responses: ${error.response.status} ${JSON.stringify(error.response.data)}`);
+      } else if (error.request) {
+        setError('Failed to load responses: No response from server');
+      } else {
+        setError(`Failed to load responses: ${error.message}`);
+      }
+      throw error;
+    }
+  };
+
   return (
     <EventsContext.Provider 
       value={{ 
@@ -307,6 +415,8 @@ export const EventsProvider: React.FC<EventsProviderProps> = ({ children }) => {
         respondToEvent,
         getEvent,
         updateEventResponse,
+        updateEventResponses,
+        getRespondentQueue,
         userEvents
       }}
     >
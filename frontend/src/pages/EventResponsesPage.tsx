@@ -2,16 +2,35 @@ import React, { useEffect, useState } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import { useAuth } from '../contexts/AuthContext';
 import { useEvents } from '../contexts/EventsContext';
-import { Event } from '../types';
+import { Event, RespondentPage } from '../types';
 import BackButton from '../components/BackButton';
 
 const EventResponsesPage: React.FC = () => {
   const { id } = useParams<{ id: string }>();
   const navigate = useNavigate();
   const { user } = useAuth();
-  const { getEvent, updateEventResponse } = useEvents();
+  const { getEvent, updateEventResponse, updateEventResponses, getRespondentQueue } = useEvents();
   const [event, setEvent] = useState<Event | null>(null);
   const [loading, setLoading] = useState(true);
+  // First pages per status, extended by "Load more"
+  const [queues, setQueues] = useState<Record<string, RespondentPage>>({});
+
+  const loadQueues = async (eventId: string) => {
+    const statuses = ['pending', 'accepted', 'rejected'];
+    const pages = await Promise.all(statuses.map(status => getRespondentQueue(eventId, status)));
+    setQueues(Object.fromEntries(statuses.map((status, i) => [status, pages[i]])));
+  };
+
+  const loadMore = async (status: string) => {
+    const current = queues[status];
+    if (!event || !current?.nextCursor) return;
+    try {
+      const page = await getRespondentQueue(event.id, status, current.nextCursor);
+      setQueues(prev => ({ ...prev, [status]: { cards: [...current.cards, ...page.cards], nextCursor: page.nextCursor } }));
+    } catch (error) {
+      console.error('Error loading responses:', error);
+    }
+  };
 
   useEffect(() => {
     const fetchEvent = async () => {
@@ -29,6 +48,7 @@ const EventResponsesPage: React.FC = () => {
           navigate('/events');
           return;
         }
+        await loadQueues(eventData.id);
       } catch (error) {
         console.error('Error fetching event:', error);
         navigate('/events');
@@ -44,14 +64,25 @@ const EventResponsesPage: React.FC = () => {
     if (!event) return;
     try {
       await updateEventResponse(responseId, { status });
-      // Refresh event data
-      const updatedEvent = await getEvent(event.id);
-      setEvent(updatedEvent);
+      // Refresh the counts and the lists
+      setEvent(await getEvent(event.id));
+      await loadQueues(event.id);
     } catch (error) {
       console.error('Error updating response:', error);
     }
   };
 
+  const handleBulkUpdate = async (responseIds: string[], status: string) => {
+    if (!event || responseIds.length === 0) return;
+    try {
+      await updateEventResponses(event.id, responseIds.map(responseId => ({ id: responseId, status })));
+      setEvent(await getEvent(event.id));
+      await loadQueues(event.id);
+    } catch (error) {
+      console.error('Error updating responses:', error);
+    }
+  };
+
   if (loading) {
     return (
       <div className="flex items-center justify-center h-screen">
@@ -79,9 +110,18 @@ const EventResponsesPage: React.FC = () => {
     );
   }
 
-  const pendingResponses = event.responses?.filter(r => r.status === 'pending') || [];
-  const acceptedResponses = event.responses?.filter(r => r.status === 'accepted') || [];
-  const rejectedResponses = event.responses?.filter(r => r.status === 'rejected') || [];
+  const pendingResponses = queues.pending?.cards || [];
+  const acceptedResponses = queues.accepted?.cards || [];
+  const rejectedResponses = queues.rejected?.cards || [];
+
+  const loadMoreButton = (status: string) => queues[status]?.nextCursor ? (
+    <button
+      onClick={() => loadMore(status)}
+      className="mt-3 w-full py-2 bg-gray-100 text-gray-700 rounded hover:bg-gray-200 text-sm"
+    >
+      Load more
+    </button>
+  ) : null;
 
   return (
     <div className="max-w-2xl mx-auto p-4">
@@ -96,9 +136,27 @@ const EventResponsesPage: React.FC = () => {
         
         {/* Pending Responses */}
         <div className="mb-6">
-          <h3 className="text-lg font-semibold mb-3 text-yellow-700">
-            Pending Responses ({pendingResponses.length})
-          </h3>
+          <div className="flex items-center justify-between mb-3">
+            <h3 className="text-lg font-semibold text-yellow-700">
+              Pending Responses ({event.pending_count ?? pendingResponses.length})
+            </h3>
+            {pendingResponses.length > 1 && (
+              <div className="space-x-2">
+                <button
+                  onClick={() => handleBulkUpdate(pendingResponses.map(r => r.id), 'accepted')}
+                  className="px-3 py-1 bg-green-500 text-white rounded hover:bg-green-600 text-sm"
+                >
+                  Accept all
+                </button>
+                <button
+                  onClick={() => handleBulkUpdate(pendingResponses.map(r => r.id), 'rejected')}
+                  className="px-3 py-1 bg-red-500 text-white rounded hover:bg-red-600 text-sm"
+                >
+                  Reject all
+                </button>
+              </div>
+            )}
+          </div>
           
           {pendingResponses.length === 0 ? (
             <p className="text-gray-500">No pending responses</p>
@@ -109,12 +167,12 @@ const EventResponsesPage: React.FC = () => {
                   <div className="flex items-center justify-between">
                     <div className="flex items-center">
                       <img 
-                        src={response.user?.avatar_url || 'https://via.placeholder.com/40'} 
-                        alt={response.user?.name || 'User'}
+                        src={response.avatar_url || 'https://via.placeholder.com/40'} 
+                        alt={response.name || 'User'}
                         className="w-10 h-10 rounded-full mr-3"
                       />
                       <div>
-                        <p className="font-medium">{response.user?.name || 'Unknown User'}</p>
+                        <p className="font-medium">{response.name || 'Unknown User'}</p>
                         <p className="text-sm text-gray-600">
                           Responded on {new Date(response.responded_at).toLocaleDateString()}
                         </p>
@@ -139,12 +197,13 @@ const EventResponsesPage: React.FC = () => {
               ))}
             </div>
           )}
+          {loadMoreButton('pending')}
         </div>
 
         {/* Accepted Responses */}
         <div className="mb-6">
           <h3 className="text-lg font-semibold mb-3 text-green-700">
-            Accepted Responses ({acceptedResponses.length})
+            Accepted Responses ({event.accepted_count ?? acceptedResponses.length})
           </h3>
           
           {acceptedResponses.length === 0 ? (
@@ -156,12 +215,12 @@ const EventResponsesPage: React.FC = () => {
                   <div className="flex items-center justify-between">
                     <div className="flex items-center">
                       <img 
-                        src={response.user?.avatar_url || 'https://via.placeholder.com/40'} 
-                        alt={response.user?.name || 'User'}
+                        src={response.avatar_url || 'https://via.placeholder.com/40'} 
+                        alt={response.name || 'User'}
                         className="w-10 h-10 rounded-full mr-3"
                       />
                       <div>
-                        <p className="font-medium">{response.user?.name || 'Unknown User'}</p>
+                        <p className="font-medium">{response.name || 'Unknown User'}</p>
                         <p className="text-sm text-gray-600">
                           Accepted on {new Date(response.responded_at).toLocaleDateString()}
                         </p>
@@ -175,6 +234,7 @@ const EventResponsesPage: React.FC = () => {
               ))}
             </div>
           )}
+          {loadMoreButton('accepted')}
         </div>
 
         {/* Rejected Responses */}
@@ -190,12 +250,12 @@ const EventResponsesPage: React.FC = () => {
                   <div className="flex items-center justify-between">
                     <div className="flex items-center">
                       <img 
-                        src={response.user?.avatar_url || 'https://via.placeholder.com/40'} 
-                        alt={response.user?.name || 'User'}
+                        src={response.avatar_url || 'https://via.placeholder.com/40'} 
+                        alt={response.name || 'User'}
                         className="w-10 h-10 rounded-full mr-3"
                       />
                       <div>
-                        <p className="font-medium">{response.user?.name || 'Unknown User'}</p>
+                        <p className="font-medium">{response.name || 'Unknown User'}</p>
                         <p className="text-sm text-gray-600">
                           Rejected on {new Date(response.responded_at).toLocaleDateString()}
                         </p>
@@ -208,6 +268,7 @@ const EventResponsesPage: React.FC = () => {
                 </div>
               ))}
             </div>
+            {loadMoreButton('rejected')}
           </div>
         )}
       </div>
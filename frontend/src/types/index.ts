@@ -8,6 +8,9 @@ export interface User {
   photos: string[];
   created_at: string;
   updated_at: string;
+  // Returned by /users/auth only
+  session_token?: string;
+  session_expires_at?: string;
 }
 
 export interface Event {
@@ -22,6 +25,8 @@ export interface Event {
   type: 'custom' | 'city' | 'business';
   created_at: string;
   updated_at: string;
+  pending_count?: number;
+  accepted_count?: number;
   responses?: EventResponse[];
 }
 
@@ -34,6 +39,27 @@ export interface EventResponse {
   responded_at: string;
 }
 
+// Compact respondent entry from GET /responses/event/{id}/queue
+export interface RespondentCard {
+  id: string;
+  user_id: string;
+  status: EventResponse['status'];
+  responded_at: string;
+  name: string;
+  avatar_url?: string;
+}
+
+export interface RespondentPage {
+  cards: RespondentCard[];
+  nextCursor: string | null;
+}
+
+export interface ResponseDecisionResult {
+  id: string;
+  result: 'updated' | 'unchanged' | 'not_found' | 'conflict';
+  status?: EventResponse['status'];
+}
+
 export interface Badge {
   id: string;
   user_id: string;
@@ -60,6 +86,8 @@ export interface EventsContextType {
   respondToEvent: (eventId: string) => Promise<EventResponse>;
   getEvent: (id: string) => Promise<Event>;
   updateEventResponse: (responseId: string, data: { status: string }) => Promise<EventResponse>;
+  updateEventResponses: (eventId: string, decisions: { id: string; status: string }[]) => Promise<ResponseDecisionResult[]>;
+  getRespondentQueue: (eventId: string, status: string, cursor?: string | null) => Promise<RespondentPage>;
   userEvents: Event[];
 }
 